@@ -0,0 +1,109 @@
+"""
+Limits of an anytime solve - wall-clock budget, cancellation and the discrepancy limit of iterative deepening -
+and the result reported when the solve ends, whether it finished or not.
+
+Every winning strategy of a board is (nearly) equally long - all marbles have to go - so deepening the search
+by depth would only re-enumerate the shallow levels of the tree. The search is deepened by discrepancies instead
+(limited discrepancy search): a discrepancy is a move other than the first one in the move order, iteration with
+limit `k` searches all move sequences deviating from the move order at most `k` times. Iteration 0 is a single
+dive along the move order, the last iteration is unlimited - the complete search.
+"""
+from threading import Event
+from time import perf_counter
+
+
+class CancellationToken:
+    """
+    Thread-safe flag to stop a running solve from the outside (another thread, a signal handler...). Pass
+    a multiprocessing Event to share the token between processes.
+    """
+
+    def __init__(self, event=None):
+        self.__event = event if event is not None else Event()
+
+    def cancel(self):
+        self.__event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__event.is_set()
+
+
+class SolveResult:
+    """
+    Outcome of SmallSigmarGame.solve_anytime.
+
+    - status: COMPLETE when the search finished (solvable is then True or False), TIMEOUT or CANCELLED when it
+      was stopped early (solvable is None - unknown)
+    - moves: winning strategy, None unless the board was solved
+    - best_partial: the deepest sequence of moves cleared so far, the winning strategy itself once solved
+    - nodes: nodes searched over all deepening iterations
+    - discrepancy_limit: discrepancy limit of the last deepening iteration, None for the complete search
+    """
+    COMPLETE = "complete"
+    TIMEOUT = "timeout"
+    CANCELLED = "cancelled"
+
+    def __init__(self, status: str, solvable: bool | None, moves: list[list] | None, best_partial: list[list],
+                 nodes: int, elapsed: float, discrepancy_limit: int | None):
+        self.status = status
+        self.solvable = solvable
+        self.moves = moves
+        self.best_partial = best_partial
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.discrepancy_limit = discrepancy_limit
+
+    def __repr__(self):
+        return (
+            f"SolveResult(status={self.status!r}, solvable={self.solvable}, nodes={self.nodes}, "
+            f"best_partial={len(self.best_partial)} moves, elapsed={self.elapsed:.3f}s)"
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status, "solvable": self.solvable, "moves": self.moves,
+            "best_partial": self.best_partial, "nodes": self.nodes, "elapsed": self.elapsed,
+            "discrepancy_limit": self.discrepancy_limit,
+        }
+
+
+class SearchLimits:
+    """
+    Checked by the search before expanding a node. Deadline and cancellation are polled every CHECK_INTERVAL
+    nodes only, a clock read per node would cost more than the check is worth.
+    """
+    CHECK_INTERVAL = 64
+
+    def __init__(self, deadline: float | None = None, cancellation_token: CancellationToken | None = None):
+        self.deadline = deadline
+        self.cancellation_token = cancellation_token
+        self.discrepancy_limit: int | None = None
+        self.discrepancies = 0  # discrepancies of the move sequence leading to the searched node
+        self.cutoffs = 0  # moves skipped for the discrepancy limit
+        self.stop_reason: str | None = None
+        self.best_partial: list[list] = []
+        self.__countdown = 1  # check right away, a spent budget or a cancelled token stops the solve at the root
+
+    def stops(self, strategy: list[list]) -> bool:
+        """Tell if the search has to stop before the node reached by `strategy`, recording the deepest node."""
+        if self.stop_reason is not None:
+            return True
+        if len(strategy) > len(self.best_partial):
+            self.best_partial = list(strategy)
+        self.__countdown -= 1
+        if self.__countdown == 0:
+            self.__countdown = self.CHECK_INTERVAL
+            if self.cancellation_token is not None and self.cancellation_token.cancelled:
+                self.stop_reason = SolveResult.CANCELLED
+            elif self.deadline is not None and perf_counter() >= self.deadline:
+                self.stop_reason = SolveResult.TIMEOUT
+            return self.stop_reason is not None
+        return False
+
+    def allowed_moves(self, moves: list[tuple]) -> list[tuple]:
+        """Moves of the node within the discrepancy limit - only the first one when no discrepancy is left."""
+        if len(moves) > 1 and self.discrepancy_limit is not None and self.discrepancies >= self.discrepancy_limit:
+            self.cutoffs += 1
+            return moves[:1]
+        return moves
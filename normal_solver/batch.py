@@ -0,0 +1,132 @@
+"""
+Batch solving of many generated boards, spread over a pool of worker processes.
+
+Each task is a single seed. The board for the seed is laid down with its own `random.Random(seed)` instance,
+and solved with a fresh transposition table, so the result (board, moves and node count) of a seed does not
+depend on which worker picked it up, or in what order. Results are appended to a JSONL file as soon as they
+are ready, one line per board.
+
+With `--generator reverse` boards are laid down by reverse play instead (see normal_solver.generator) - they are
+solvable by construction, so the witness solution is recorded without running the solver at all. With
+`--engine bitboard` boards are searched on bitboards (see SmallSigmarGame.solve) - compare the boards/s of both.
+
+Usage:
+    python -m normal_solver.batch --start 0 --count 100000 --radius 6 --output results.jsonl
+"""
+import json
+import os
+from argparse import ArgumentParser
+from functools import partial
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.generator import generate_solvable_board
+from normal_solver.solver import SmallSigmarGame
+
+
+def make_board(radius: int | None) -> SmallSigmarBoard:
+    """Empty board of the given radius, the small test board when radius is None."""
+    return HexSigmarBoard(radius) if radius is not None else SmallSigmarBoard()
+
+
+def solve_seed(seed_: int, radius: int | None = None, engine: str = "fields") -> dict:
+    """
+    Lay down and solve the board of a single seed with the given SmallSigmarGame engine, returning the JSON-ready
+    result record.
+    """
+    started = perf_counter()
+    board = make_board(radius)
+    try:
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+    except RuntimeError as error:
+        return {"seed": seed_, "radius": radius, "error": str(error), "wall_time": perf_counter() - started}
+    game = SmallSigmarGame(board=board)
+    strategy = game.solve(engine=engine)
+    return {
+        "seed": seed_,
+        "radius": radius,
+        "engine": engine,
+        "board": board.text_encoding(),
+        "solvable": game.solvable,
+        "moves": strategy,
+        "nodes": game.nodes_searched,
+        "wall_time": perf_counter() - started,
+    }
+
+
+def generate_seed(seed_: int, radius: int | None = None, engine: str = "fields") -> dict:
+    """
+    Lay down a solvable board of a single seed by reverse play, recording its witness solution. The board is not
+    searched, `engine` is accepted only to take the same arguments as solve_seed.
+    """
+    started = perf_counter()
+    board = make_board(radius)
+    witness, attempts = generate_solvable_board(board, Random(seed_))
+    return {
+        "seed": seed_,
+        "radius": radius,
+        "board": board.text_encoding(),
+        "solvable": True,
+        "moves": witness,
+        "nodes": 0,
+        "attempts": attempts,
+        "wall_time": perf_counter() - started,
+    }
+
+
+# generator -> task of a single seed, all of them called with the seed, radius and engine
+TASKS = {"wavefront": solve_seed, "reverse": generate_seed}
+
+
+def run_batch(seeds: range, output_path: str, radius: int | None = None, processes: int | None = None,
+              chunksize: int = 1, generator: str = "wavefront", engine: str = "fields") -> int:
+    """
+    Solve boards for every seed of the range over a process pool (sized to the cores by default), writing
+    results to `output_path` in completion order. Returns the number of records written.
+    :param chunksize: seeds sent to a worker at once - results of a chunk come back together, so anything but 1
+        holds the finished boards back until the whole chunk is done.
+    :param generator: "wavefront" to lay boards down randomly and solve them, "reverse" for boards solvable
+        by construction.
+    :param engine: SmallSigmarGame.solve engine of the boards that are searched.
+    """
+    if generator not in TASKS:
+        raise ValueError(f"Unknown generator {generator!r}, choose one of: {', '.join(TASKS)}")
+    if engine not in SmallSigmarGame.ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, choose one of: {', '.join(SmallSigmarGame.ENGINES)}")
+    processes = processes or os.cpu_count() or 1
+    written = 0
+    with open(output_path, "w") as output, Pool(processes) as pool:
+        task = partial(TASKS[generator], radius=radius, engine=engine)
+        for result in pool.imap_unordered(task, seeds, chunksize=chunksize):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            written += 1
+    return written
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(description="Solve a range of seeded boards in parallel, streaming results to JSONL.")
+    parser.add_argument("--start", type=int, default=0, help="first seed of the range")
+    parser.add_argument("--count", type=int, required=True, help="number of boards (seeds) to solve")
+    parser.add_argument("--radius", type=int, default=None, help="hex board radius, small test board if omitted")
+    parser.add_argument("--output", required=True, help="path of the JSONL file with results")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("--generator", choices=list(TASKS), default="wavefront",
+                        help="wavefront: random layout solved by search, reverse: solvable by construction")
+    parser.add_argument("--engine", choices=SmallSigmarGame.ENGINES, default="fields",
+                        help="search engine of wavefront boards, the SigmarField graph by default")
+    args = parser.parse_args(argv)
+
+    started = perf_counter()
+    written = run_batch(
+        range(args.start, args.start + args.count), args.output, args.radius, args.processes,
+        generator=args.generator, engine=args.engine
+    )
+    elapsed = perf_counter() - started
+    print(f"Solved {written} boards in {elapsed:.2f}s ({written / elapsed:.1f} boards/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+Performance benchmarks of board generation, board storage, free status, move generation and solving, on fixed
+seed sets.
+
+Every benchmark times single operations (setup of each operation - like laying down the board to solve - is not
+timed) and reports throughput, p50/p99 latency and the peak memory allocated by an operation, measured with
+tracemalloc in a separate pass so that tracing does not skew the timings. Solves get a time budget each, solves
+that run out of it are recorded as timeouts, and solve benchmarks also report the search nodes of the completed
+solves and their node throughput. Results are written as JSON, and compared against a baseline - the one kept with
+the package (DEFAULT_BASELINE) unless another is given. A benchmark regresses when its throughput drops, or its peak
+memory or node count grows, by more than the threshold, or when it times out more often. Node counts and timeouts don't
+depend on the machine much, timings do - refresh the baseline on the machine that runs the comparison:
+    python -m normal_solver.benchmark --output normal_solver/benchmark_baseline.json --no-baseline
+
+Search engines of the solver are compared by node throughput - solve_small_bitboard solves the boards of
+solve_small with the bitboard engine (which has no time budget, so it's run on small boards only).
+
+Boards held in memory are measured as SigmarField based boards (board_full) and as compact ones
+(compact_board_full, normal_solver.compact) - the peak memory of the two is the memory per stored board.
+
+Move orderings (normal_solver.move_ordering) are compared separately, by the number of search nodes until the first
+solution over a fixed corpus of full boards - a machine independent measure, unlike timings.
+
+Usage:
+    python -m normal_solver.benchmark --output benchmark.json
+    python -m normal_solver.benchmark --output new.json --baseline benchmark.json --threshold 0.15
+    python -m normal_solver.benchmark --output orderings.json --move-orderings generator metals_last+salt_parity
+"""
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter_ns
+from typing import Callable
+
+from normal_solver.anytime import SolveResult
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.compact import CompactSigmarBoard
+from normal_solver.solver import SmallSigmarGame
+
+
+# full board seeds - a contiguous range, so that slow and unsolvable boards are measured as well, every solve
+# stopped after SOLVE_TIME_BUDGET seconds (and counted as a timeout)
+FULL_SOLVE_SEEDS = tuple(range(20))
+SOLVE_TIME_BUDGET = 1.0
+# full board corpus of the move ordering comparison - solvable boards as well as unsolvable ones, which search
+# the same tree in any move order
+ORDERING_SEEDS = tuple(range(30))
+# peaks of a few hundred bytes move with interpreter internals, memory has to grow by more than this to regress
+MEMORY_NOISE_KIB = 1.0
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+def _laid_board(board: SmallSigmarBoard, seed_: int) -> SmallSigmarBoard:
+    board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+    return board
+
+
+def _wavefront(make_board: Callable[[], SmallSigmarBoard]):
+    def setup(seed_: int) -> Callable[[], None]:
+        board = make_board()
+
+        def operation():
+            try:
+                board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+            except RuntimeError:
+                pass  # stuck layouts are a part of the cost of generating boards
+        return operation
+    return setup
+
+
+def _stored_board(seed_: int) -> Callable[[], SmallSigmarBoard]:
+    encoding = _laid_board(HexSigmarBoard(), seed_).text_encoding()
+
+    def operation() -> SmallSigmarBoard:
+        board = HexSigmarBoard()
+        board.load_text_encoding(encoding)
+        return board
+    return operation
+
+
+def _stored_compact_board(seed_: int) -> Callable[[], CompactSigmarBoard]:
+    board = _laid_board(HexSigmarBoard(), seed_)
+
+    def operation() -> CompactSigmarBoard:
+        return CompactSigmarBoard.from_board(board)
+    return operation
+
+
+def _free_status(seed_: int) -> Callable[[], None]:
+    fields = _laid_board(HexSigmarBoard(), seed_).fields[:-1]
+
+    def operation():
+        for field in fields:
+            field.check_and_set_free_status()
+    return operation
+
+
+def _move_generation(seed_: int) -> Callable[[], None]:
+    game = SmallSigmarGame(board=_laid_board(HexSigmarBoard(), seed_))
+    game.count_marbles()
+
+    def operation():
+        game.set_eligible_fields()
+        game.set_eligible_moves()
+    return operation
+
+
+def _solve(make_board: Callable[[], SmallSigmarBoard]):
+    def setup(seed_: int) -> Callable[[], SolveResult]:
+        game = SmallSigmarGame(board=_laid_board(make_board(), seed_))
+
+        def operation() -> SolveResult:
+            return game.solve_anytime(SOLVE_TIME_BUDGET, discrepancy_limits=())
+        return operation
+    return setup
+
+
+def _bitboard_solve(make_board: Callable[[], SmallSigmarBoard]):
+    def setup(seed_: int) -> Callable[[], SolveResult]:
+        game = SmallSigmarGame(board=_laid_board(make_board(), seed_))
+
+        def operation() -> SolveResult:
+            started = perf_counter_ns()
+            game.solve(engine="bitboard")
+            return SolveResult(
+                SolveResult.COMPLETE, game.solvable, game.winning_strategy, game.winning_strategy or [],
+                game.nodes_searched, (perf_counter_ns() - started) / 1e9, None
+            )
+        return operation
+    return setup
+
+
+# name -> (setup of the operation for a seed, seeds), solve operations return their SolveResult, board storage
+# operations the board they built
+BENCHMARKS: dict[str, tuple[Callable[[int], Callable[[], object]], tuple[int, ...]]] = {
+    "wavefront_small": (_wavefront(SmallSigmarBoard), tuple(range(200))),
+    "wavefront_full": (_wavefront(HexSigmarBoard), tuple(range(100))),
+    "board_full": (_stored_board, tuple(range(100))),
+    "compact_board_full": (_stored_compact_board, tuple(range(100))),
+    "free_status_full": (_free_status, tuple(range(100))),
+    "eligible_moves_full": (_move_generation, tuple(range(100))),
+    "solve_small": (_solve(SmallSigmarBoard), tuple(range(100))),
+    "solve_small_bitboard": (_bitboard_solve(SmallSigmarBoard), tuple(range(100))),
+    "solve_full": (_solve(HexSigmarBoard), FULL_SOLVE_SEEDS),
+}
+
+
+def _percentile(sorted_values: list[int], fraction: float) -> int:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_benchmark(name: str, repeat: int = 3, seeds: tuple[int, ...] | None = None) -> dict[str, float]:
+    """
+    Time every seed of the benchmark `repeat` times, then once more under tracemalloc for the memory peak.
+    Each timed run gets a freshly set up operation, so that solves are not answered from a warm table.
+    Solves are counted as timeouts when they run out of their budget, nodes (and nodes per second of the solving
+    time) add up the completed ones. Seeds that timed out are left out of the memory pass - how far a stopped
+    search got depends on the speed of the machine.
+    """
+    setup, default_seeds = BENCHMARKS[name]
+    seeds = default_seeds if seeds is None else seeds
+    latencies = []
+    timeouts = nodes = solve_ns = 0
+    timed_out_seeds = set()
+    for _ in range(repeat):
+        for seed_ in seeds:
+            operation = setup(seed_)
+            started = perf_counter_ns()
+            outcome = operation()
+            latencies.append(perf_counter_ns() - started)
+            if isinstance(outcome, SolveResult):
+                if outcome.status == SolveResult.COMPLETE:
+                    nodes += outcome.nodes
+                    solve_ns += latencies[-1]
+                else:
+                    timeouts += 1
+                    timed_out_seeds.add(seed_)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for seed_ in seeds:
+            if seed_ in timed_out_seeds:
+                continue
+            operation = setup(seed_)
+            tracemalloc.reset_peak()
+            baseline_memory = tracemalloc.get_traced_memory()[0]
+            operation()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline_memory)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_second": len(latencies) / (sum(latencies) / 1e9) if sum(latencies) else float("inf"),
+        "p50_ms": _percentile(latencies, 0.50) / 1e6,
+        "p99_ms": _percentile(latencies, 0.99) / 1e6,
+        "peak_memory_kib": peak / 1024,
+        "timeouts": timeouts,
+        "nodes": nodes,
+        "nodes_per_second": nodes / (solve_ns / 1e9) if solve_ns else 0.0,
+    }
+
+
+def run_benchmarks(names: list[str] | None = None, repeat: int = 3, seed_count: int | None = None) -> dict:
+    """
+    Run the selected benchmarks (all of them by default) into a JSON-ready report.
+    :param seed_count: use only this many first seeds of every seed set, for quick runs.
+    """
+    names = names if names is not None else list(BENCHMARKS)
+    unknown_names = set(names) - set(BENCHMARKS)
+    if unknown_names:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown_names)}, choose from: {', '.join(BENCHMARKS)}")
+    results = {}
+    for name in names:
+        seeds = BENCHMARKS[name][1][:seed_count] if seed_count is not None else None
+        results[name] = run_benchmark(name, repeat, seeds)
+    return {
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def ordering_name(policies: tuple[str, ...]) -> str:
+    return "+".join(policies) or "generator"
+
+
+def run_move_ordering_benchmark(orderings: list[tuple[str, ...]], seeds: tuple[int, ...] = ORDERING_SEEDS,
+                                time_budget: float = 5.0,
+                                make_board: Callable[[], SmallSigmarBoard] = HexSigmarBoard) -> dict:
+    """
+    Solve every seed with each of the move orderings (tuples of MoveOrdering policies, empty for the generator order),
+    counting search nodes until the first solution. Solves running over `time_budget` seconds are stopped
+    and counted as timeouts, nodes_to_solution sums the solvable boards solved within the budget.
+    """
+    results = {}
+    for policies in orderings:
+        nodes = {}
+        solved = unsolvable = timeouts = 0
+        seconds = 0.0
+        for seed_ in seeds:
+            game = SmallSigmarGame(board=_laid_board(make_board(), seed_))
+            result = game.solve_anytime(time_budget, discrepancy_limits=(), move_ordering=policies)
+            seconds += result.elapsed
+            if result.status != SolveResult.COMPLETE:
+                timeouts += 1
+            elif result.solvable:
+                solved += 1
+                nodes[str(seed_)] = result.nodes
+            else:
+                unsolvable += 1
+        solution_nodes = sorted(nodes.values())
+        results[ordering_name(policies)] = {
+            "policies": list(policies),
+            "solved": solved,
+            "unsolvable": unsolvable,
+            "timeouts": timeouts,
+            "nodes_to_solution": sum(solution_nodes),
+            "p50_nodes_to_solution": _percentile(solution_nodes, 0.50) if solution_nodes else 0,
+            "seconds": seconds,
+            "nodes": nodes,
+        }
+    return {
+        "seeds": list(seeds),
+        "time_budget": time_budget,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = 0.1) -> list[str]:
+    """
+    Describe every regression of the report against the baseline - throughput lower, or peak memory or search
+    nodes higher, by more than `threshold` (a fraction of the baseline value, plus MEMORY_NOISE_KIB for memory),
+    or more timeouts. Benchmarks missing from either side are skipped, and so are the nodes and timeouts of runs
+    with a different number of operations.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["ops_per_second"] < base["ops_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['ops_per_second']:.1f} ops/s, baseline {base['ops_per_second']:.1f} ops/s"
+            )
+        if result["peak_memory_kib"] > base["peak_memory_kib"] * (1 + threshold) + MEMORY_NOISE_KIB:
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory_kib']:.1f} KiB, "
+                f"baseline {base['peak_memory_kib']:.1f} KiB"
+            )
+        if result.get("ops") != base.get("ops"):
+            continue
+        if result.get("timeouts", 0) > base.get("timeouts", 0):
+            regressions.append(f"{name}: {result['timeouts']} timeouts, baseline {base.get('timeouts', 0)}")
+        if result.get("nodes", 0) > base.get("nodes", 0) * (1 + threshold):
+            regressions.append(f"{name}: {result['nodes']} search nodes, baseline {base.get('nodes', 0)}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = ArgumentParser(description="Benchmark board generation, free status, move generation and solving.")
+    parser.add_argument("--output", required=True, help="path of the JSON file with results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="JSON results of an earlier run to compare against, the stored baseline by default")
+    parser.add_argument("--no-baseline", action="store_true", help="don't compare against any baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed relative drop of throughput (or growth of peak memory), 0.1 by default")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of every seed")
+    parser.add_argument("--seed-count", type=int, default=None, help="use only this many seeds per benchmark")
+    parser.add_argument("--move-orderings", nargs="+", default=None, metavar="POLICIES",
+                        help="compare move orderings instead - policies joined by '+', 'generator' for none")
+    parser.add_argument("--time-budget", type=float, default=5.0, help="seconds per solve of move ordering runs")
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args(argv)
+
+    if args.move_orderings is not None:
+        orderings = [
+            tuple(policy for policy in spec.split("+") if policy != "generator") for spec in args.move_orderings
+        ]
+        seeds = ORDERING_SEEDS[:args.seed_count] if args.seed_count is not None else ORDERING_SEEDS
+        report = run_move_ordering_benchmark(orderings, seeds, args.time_budget)
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        for name, result in report["results"].items():
+            print(
+                f"{name:<40}{result['nodes_to_solution']:>10} nodes to {result['solved']} solutions  "
+                f"p50 {result['p50_nodes_to_solution']}  timeouts {result['timeouts']}  {result['seconds']:.2f}s"
+            )
+        return 0
+
+    report = run_benchmarks(args.benchmarks or None, args.repeat, args.seed_count)
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    for name, result in report["results"].items():
+        print(
+            f"{name:<22}{result['ops_per_second']:>12.1f} ops/s  p50 {result['p50_ms']:.3f} ms  "
+            f"p99 {result['p99_ms']:.3f} ms  peak {result['peak_memory_kib']:.1f} KiB  timeouts {result['timeouts']}  "
+            f"{result['nodes_per_second']:.0f} nodes/s"
+        )
+    if args.no_baseline:
+        return 0
+    with open(args.baseline) as baseline_file:
+        regressions = compare(report, json.load(baseline_file), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
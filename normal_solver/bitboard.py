@@ -0,0 +1,367 @@
+from itertools import combinations
+
+from normal_solver.board import SigmarMarble, SmallSigmarBoard
+from normal_solver.pruning import SALT, ELEMENTS, METALS, GOLD, QUICKSILVER, MORS, VITAE
+from normal_solver.symmetry import board_symmetries
+from normal_solver.transposition import ZobristHasher, TranspositionTable
+
+
+class BitboardLayout:
+    """
+    Bit numbering of a hexagonal layout, shared by every bitboard of the same shape.
+
+    Rows of the layout are skewed into axial coordinates, so that every one of the six hex directions turns into
+    a constant shift of the bit index:
+
+        column = field_index + max(0, middle_row - row_index)
+        bit = row_index * stride + column
+
+    Fields on the board edge get bits as well - they are never occupied, which makes them count as "empty"
+    neighbours of the playable fields, the same as in the SigmarField graph.
+    """
+    __cache: dict[tuple[int, ...], "BitboardLayout"] = {}
+
+    def __init__(self, row_sizes: list[int]):
+        self.row_sizes = tuple(row_sizes)
+        middle_row = self.row_sizes.index(max(self.row_sizes))
+        self.row_shifts = [max(0, middle_row - row_idx) for row_idx in range(len(self.row_sizes))]
+        self.stride = max(size + shift for size, shift in zip(self.row_sizes, self.row_shifts))
+        # offsets in the same order as SigmarField.get_continuous_neigh_list, starting from left upper neighbour
+        self.direction_offsets = (
+            -self.stride,  # left up
+            -self.stride + 1,  # right up
+            1,  # right
+            self.stride,  # right down
+            self.stride - 1,  # left down
+            -1,  # left
+        )
+        self.full_mask = (1 << (self.stride * len(self.row_sizes))) - 1
+        self.playable_mask = 0
+        self.bit_to_coords: dict[int, tuple[int, int]] = {}
+        self.coords_to_bit: dict[tuple[int, int], int] = {}
+        last_row = len(self.row_sizes) - 1
+        for row_idx, (size, shift) in enumerate(zip(self.row_sizes, self.row_shifts)):
+            for field_idx in range(size):
+                bit = row_idx * self.stride + field_idx + shift
+                self.bit_to_coords[bit] = (row_idx, field_idx)
+                self.coords_to_bit[(row_idx, field_idx)] = bit
+                if 0 < row_idx < last_row and 0 < field_idx < size - 1:
+                    self.playable_mask |= 1 << bit
+
+    @classmethod
+    def for_row_sizes(cls, row_sizes: list[int]) -> "BitboardLayout":
+        """Return the layout for given row sizes, building it only once per board shape."""
+        key = tuple(row_sizes)
+        if key not in cls.__cache:
+            cls.__cache[key] = cls(row_sizes)
+        return cls.__cache[key]
+
+    def free_fields(self, occupancy: int) -> int:
+        """
+        Mask of playable fields with at least three consecutive empty neighbours under the given occupancy,
+        calculated for the whole board at once - the "empty" mask is shifted in each of the six hex directions.
+        """
+        empty = self.full_mask ^ occupancy
+        # bit of a field is set if its neighbour in the given direction is empty
+        neighbour_empty = [empty >> offset if offset > 0 else empty << -offset for offset in self.direction_offsets]
+        free = 0
+        for i in range(6):
+            free |= neighbour_empty[i] & neighbour_empty[(i + 1) % 6] & neighbour_empty[(i + 2) % 6]
+        return free & self.playable_mask
+
+    def iter_bits(self, mask: int):
+        """Yield bit indexes set in the mask, from the lowest one (row-major order of the layout)."""
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+
+class BitboardSigmarBoard:
+    """
+    Alternative board engine, holding marbles as integer bitmasks instead of the SigmarField object graph.
+
+    Board keeps one occupancy mask and one mask per marble type. Free status is calculated for the whole board at
+    once, by shifting the "empty" mask in each of the six hex directions and looking for three consecutive empty
+    neighbours. Fields are addressed by (row_index, field_index), same as in SmallSigmarBoard layout.
+    """
+
+    def __init__(self, row_sizes: list[int] | None = None):
+        if row_sizes is None:
+            row_sizes = SmallSigmarBoard.board_row_sizes
+        self.geometry = BitboardLayout.for_row_sizes(row_sizes)
+        self.occupancy = 0
+        self.marble_masks: dict[int, int] = {marble.value: 0 for marble in SigmarMarble}
+        self.marbles: dict[int, int] = {}  # bit -> marble value, for O(1) single field lookups
+        self.__free_mask: int | None = None
+
+    @classmethod
+    def from_board(cls, board: SmallSigmarBoard) -> "BitboardSigmarBoard":
+        """Copy marbles laid out on the SigmarField based board into a new bitboard."""
+        bitboard = cls([len(row) for row in board.layout])
+        for row in board.layout:
+            for field in row:
+                if field.marble is not None:
+                    bitboard.set_marble(field.row_index, field.field_index, field.marble)
+        return bitboard
+
+    def __bit(self, row_idx: int, field_idx: int) -> int:
+        try:
+            return self.geometry.coords_to_bit[(row_idx, field_idx)]
+        except KeyError:
+            raise IndexError(f"Field {row_idx=} {field_idx=} is not a part of the board layout") from None
+
+    def get_marble(self, row_idx: int, field_idx: int) -> int | None:
+        """Return the marble value placed on the field, or None for an empty field."""
+        return self.marbles.get(self.__bit(row_idx, field_idx))
+
+    def set_marble(self, row_idx: int, field_idx: int, marble: int | None):
+        """Place a marble on the field (or empty it with None)."""
+        bit = self.__bit(row_idx, field_idx)
+        bit_mask = 1 << bit
+        previous = self.marbles.pop(bit, None)
+        if previous is not None:
+            self.marble_masks[previous] &= ~bit_mask
+            self.occupancy &= ~bit_mask
+        if marble is not None:
+            if not (self.geometry.playable_mask & bit_mask):
+                raise ValueError(f"Can't place marble on the board edge field {row_idx=} {field_idx=}")
+            self.marbles[bit] = marble
+            self.marble_masks[marble] |= bit_mask
+            self.occupancy |= bit_mask
+        self.__free_mask = None
+
+    def remove_pair(self, field_1: tuple[int, int],
+                    field_2: tuple[int, int] | None = None) -> tuple[int | None, int | None]:
+        """
+        Take marbles off two fields (or a single one, for the gold cleared alone), returning what was placed on them
+        (needed to place them back).
+        """
+        marble_1 = self.get_marble(*field_1)
+        marble_2 = self.get_marble(*field_2) if field_2 is not None else None
+        self.set_marble(*field_1, None)
+        if field_2 is not None:
+            self.set_marble(*field_2, None)
+        return marble_1, marble_2
+
+    def place_pair(self, field_1: tuple[int, int], marble_1: int | None,
+                   field_2: tuple[int, int] | None = None, marble_2: int | None = None):
+        """Put a pair of marbles (or the lone gold) on the board, reverting the effect of remove_pair."""
+        self.set_marble(*field_1, marble_1)
+        if field_2 is not None:
+            self.set_marble(*field_2, marble_2)
+
+    @property
+    def free_mask(self) -> int:
+        """
+        Mask of playable fields with at least three consecutive empty neighbours, calculated for the whole
+        board at once. Cached until next change of marbles.
+        """
+        if self.__free_mask is None:
+            self.__free_mask = self.geometry.free_fields(self.occupancy)
+        return self.__free_mask
+
+    def is_free(self, row_idx: int, field_idx: int) -> bool:
+        """Equivalent of SigmarField.free flag, edge fields are always free."""
+        bit_mask = 1 << self.__bit(row_idx, field_idx)
+        if not (self.geometry.playable_mask & bit_mask):
+            return True
+        return bool(self.free_mask & bit_mask)
+
+    def free_marble_fields(self) -> list[tuple[int, int]]:
+        """Coordinates of free fields holding a marble, in the same order as SmallSigmarGame.set_eligible_fields."""
+        coords = self.geometry.bit_to_coords
+        return [coords[bit] for bit in self.geometry.iter_bits(self.free_mask & self.occupancy)]
+
+    def marble_fields(self, marble: int) -> list[tuple[int, int]]:
+        """Coordinates of all fields holding the given marble type."""
+        coords = self.geometry.bit_to_coords
+        return [coords[bit] for bit in self.geometry.iter_bits(self.marble_masks[marble])]
+
+    @property
+    def marble_count(self) -> int:
+        return self.occupancy.bit_count()
+
+
+
+
+class BitboardSearch:
+    """
+    Search of SmallSigmarGame.solve run on bitboards - the "bitboard" engine of the solver.
+
+    Marbles never move, so a position is just the occupancy mask: marbles of a type left on the board are its mask
+    on the starting board masked with the occupancy, and the next metal to clear is the lowest metal left. Moves
+    are pairs of bit indexes paired from the free mask of the whole board, in the same groups and order as
+    pairs_from_buckets (bits are numbered in layout order), and a move is made by clearing its bits in a copy
+    of the occupancy - there is nothing to undo. Bits are turned into field coordinates for the strategy only.
+
+    Positions are cut by the rules of InfeasibilityPruner, checked on the masks. Dead positions go to a bounded
+    TranspositionTable under their canonical Zobrist hash, kept for every symmetry of the board as in the field
+    engine - hashes of both engines are equal, so they can share a table.
+    """
+    # row sizes -> metal keys, and per playable bit: Zobrist keys of the field it is mapped to by every symmetry
+    __shape_key_cache: dict[tuple[int, ...], tuple[dict[int | None, int], dict[int, list[dict[int, int]]]]] = {}
+
+    def __init__(self, board: SmallSigmarBoard, transposition_table: TranspositionTable | None = None):
+        bitboard = BitboardSigmarBoard.from_board(board)
+        self.layout = bitboard.geometry
+        self.occupancy = bitboard.occupancy
+        self.marble_masks = bitboard.marble_masks
+        # marbles that never block the next metal for good - anything but metals and quicksilver
+        self.clearable_mask = self.occupancy
+        for marble in (*METALS, QUICKSILVER):
+            self.clearable_mask &= ~self.marble_masks[marble]
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.metal_keys, symmetric_keys = self.__shape_keys(board)
+        # bit -> Zobrist keys of its marble in every symmetric copy of the position
+        self.bit_keys: dict[int, list[int]] = {
+            bit: [keys[marble] for keys in symmetric_keys[bit]] for bit, marble in bitboard.marbles.items()
+        }
+        self.symmetry_count = len(next(iter(symmetric_keys.values())))
+        self.nodes = 0
+
+    @classmethod
+    def __shape_keys(cls, board: SmallSigmarBoard) -> tuple[dict[int | None, int], dict[int, list[dict[int, int]]]]:
+        """Keys of the hasher SmallSigmarGame draws for the board shape, rearranged by bit. Computed once per shape."""
+        row_sizes = tuple(len(row) for row in board.layout)
+        if row_sizes not in cls.__shape_key_cache:
+            hasher = ZobristHasher([field for row in board.layout[1:-1] for field in row[1:-1]])
+            layout = BitboardLayout.for_row_sizes(list(row_sizes))
+            symmetries = board_symmetries(list(row_sizes))
+            symmetric_keys = {
+                bit: [hasher.field_keys[transform.map_coords(layout.bit_to_coords[bit])] for transform in symmetries]
+                for bit in layout.iter_bits(layout.playable_mask)
+            }
+            cls.__shape_key_cache[row_sizes] = hasher.metal_keys, symmetric_keys
+        return cls.__shape_key_cache[row_sizes]
+
+    def solve(self) -> list[list] | None:
+        """Winning strategy in the format of SmallSigmarGame.solve, None when the board is unsolvable."""
+        self.nodes = 0
+        next_metal_to_clear = self.next_metal_to_clear(self.occupancy)
+        strategy = []
+        if not self.__search(self.occupancy, self.position_hashes(self.occupancy), next_metal_to_clear, strategy):
+            return None
+        bit_to_coords = self.layout.bit_to_coords
+        return [[bit_to_coords[bit] for bit in move] for move in strategy]
+
+    def next_metal_to_clear(self, occupancy: int) -> int | None:
+        marble_masks = self.marble_masks
+        return next((metal for metal in METALS if marble_masks[metal] & occupancy), None)
+
+    def position_hashes(self, occupancy: int) -> list[int]:
+        """Zobrist hashes of the position and its symmetric copies, calculated from scratch."""
+        hashes = [self.metal_keys[self.next_metal_to_clear(occupancy)]] * self.symmetry_count
+        for bit in self.layout.iter_bits(occupancy):
+            hashes = [position_hash ^ key for position_hash, key in zip(hashes, self.bit_keys[bit])]
+        return hashes
+
+    def dead_rule(self, occupancy: int, next_metal_to_clear: int | None, free: int | None = None) -> str | None:
+        """
+        Name of the first InfeasibilityPruner rule proving the position dead, None when it may be solvable.
+        Counts are popcounts of the masks, buried_metal floods the masks (see __metal_is_buried).
+        """
+        marble_masks = self.marble_masks
+        salt = (marble_masks[SALT] & occupancy).bit_count()
+        element_counts = [(marble_masks[element] & occupancy).bit_count() for element in ELEMENTS]
+        if (salt + sum(element_counts)) & 1 or sum(count & 1 for count in element_counts) > salt:
+            return "element_pairing"
+        if (marble_masks[MORS] & occupancy).bit_count() != (marble_masks[VITAE] & occupancy).bit_count():
+            return "mors_vitae"
+        metal_counts = [(marble_masks[metal] & occupancy).bit_count() for metal in METALS]
+        if (marble_masks[QUICKSILVER] & occupancy).bit_count() != sum(metal_counts[:-1]):  # gold takes none
+            return "quicksilver_balance"
+        for metal, count in zip(METALS, metal_counts):
+            if count > 1 or (count and (next_metal_to_clear is None or metal < next_metal_to_clear)):
+                return "metal_order"
+        if self.__metal_is_buried(occupancy, next_metal_to_clear, free):
+            return "buried_metal"
+        return None
+
+    def __metal_is_buried(self, occupancy: int, next_metal_to_clear: int | None, free: int | None) -> bool:
+        """
+        buried_metal of InfeasibilityPruner - clear every marble that isn't a metal nor quicksilver as soon as it is
+        free, until the next metal and one quicksilver are both free (alive), or nothing more gets free (dead).
+        """
+        if next_metal_to_clear is None or next_metal_to_clear == GOLD:
+            return False
+        metal = self.marble_masks[next_metal_to_clear] & occupancy
+        if not metal:
+            return False
+        quicksilver = self.marble_masks[QUICKSILVER] & occupancy
+        candidates = self.clearable_mask & occupancy
+        if free is None:
+            free = self.layout.free_fields(occupancy)
+        while not (free & metal and free & quicksilver):
+            newly_free = candidates & free
+            if not newly_free:
+                return True
+            occupancy ^= newly_free
+            candidates ^= newly_free
+            free = self.layout.free_fields(occupancy)
+        return False
+
+    def eligible_moves(self, occupancy: int, next_metal_to_clear: int | None,
+                       free: int | None = None) -> list[tuple[int, ...]]:
+        """Legal moves as tuples of bit indexes, in the order of pairs_from_buckets."""
+        if free is None:
+            free = self.layout.free_fields(occupancy)
+        free_marbles = free & occupancy
+        marble_masks = self.marble_masks
+        iter_bits = self.layout.iter_bits
+        salt = list(iter_bits(marble_masks[SALT] & free_marbles))
+        moves = list(combinations(salt, 2))
+        for element in ELEMENTS:
+            if marble_masks[element] & free_marbles:
+                element_bits = list(iter_bits(marble_masks[element] & free_marbles))
+                moves.extend(combinations(element_bits, 2))
+                moves.extend((bit, salt_bit) if bit < salt_bit else (salt_bit, bit)
+                             for bit in element_bits for salt_bit in salt)
+        if next_metal_to_clear is not None and next_metal_to_clear != GOLD:
+            metal_bits = list(iter_bits(marble_masks[next_metal_to_clear] & free_marbles))
+            moves.extend((bit, metal_bit) if bit < metal_bit else (metal_bit, bit)
+                         for bit in iter_bits(marble_masks[QUICKSILVER] & free_marbles) for metal_bit in metal_bits)
+        vitae_bits = list(iter_bits(marble_masks[VITAE] & free_marbles))
+        moves.extend((bit, vitae_bit) if bit < vitae_bit else (vitae_bit, bit)
+                     for bit in iter_bits(marble_masks[MORS] & free_marbles) for vitae_bit in vitae_bits)
+        if next_metal_to_clear == GOLD:
+            moves.extend((bit,) for bit in iter_bits(marble_masks[GOLD] & free_marbles))
+        return moves
+
+    def __search(self, occupancy: int, hashes: list[int], metal: int | None, strategy: list[tuple[int, ...]]) -> bool:
+        """
+        Same search as the field engine's, the position is passed down as a value. Hashes come from the parent
+        with the key of its next metal to clear (`metal`), swapped here when the move has cleared that metal.
+        """
+        if not occupancy:
+            return True
+        next_metal_to_clear = self.next_metal_to_clear(occupancy)
+        if next_metal_to_clear != metal:
+            metal_key = self.metal_keys[metal] ^ self.metal_keys[next_metal_to_clear]
+            hashes = [position_hash ^ metal_key for position_hash in hashes]
+        canonical_hash = min(hashes)
+        if self.transposition_table.is_dead(canonical_hash):
+            return False
+        free = self.layout.free_fields(occupancy)
+        if self.dead_rule(occupancy, next_metal_to_clear, free) is not None:
+            return False
+        self.nodes += 1
+        bit_keys = self.bit_keys
+        for move in self.eligible_moves(occupancy, next_metal_to_clear, free):
+            if len(move) == 1:  # gold, cleared alone
+                bit = move[0]
+                cleared = 1 << bit
+                move_hashes = [position_hash ^ key for position_hash, key in zip(hashes, bit_keys[bit])]
+            else:
+                bit_1, bit_2 = move
+                cleared = 1 << bit_1 | 1 << bit_2
+                move_hashes = [
+                    position_hash ^ key_1 ^ key_2
+                    for position_hash, key_1, key_2 in zip(hashes, bit_keys[bit_1], bit_keys[bit_2])
+                ]
+            strategy.append(move)
+            if self.__search(occupancy ^ cleared, move_hashes, next_metal_to_clear, strategy):
+                return True
+            strategy.pop()
+        self.transposition_table.mark_dead(canonical_hash, occupancy.bit_count())
+        return False
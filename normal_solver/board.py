@@ -1,6 +1,6 @@
 from typing import Optional
 from enum import Enum
-from random import shuffle, randint
+from random import shuffle, randint, Random
 
 
 class SigmarMarble(Enum):
@@ -43,6 +43,17 @@ class SigmarMarble(Enum):
 
 
 class SigmarField:
+    __slots__ = (
+        "marble", "row_index", "field_index", "left_up_neigh", "right_up_neigh", "right_neigh",
+        "right_down_neigh", "left_down_neigh", "left_neigh", "free", "board_edge_field", "layout_index",
+    )
+    # 6-bit pattern of empty neighbours (bit 0 = left upper neighbour, then counter-clockwise, the same order
+    # as get_continuous_neigh_list) -> is there an arc of three consecutive empty neighbours
+    free_pattern_table: list[bool] = [
+        any(all((pattern >> ((start + offset) % 6)) & 1 for offset in range(3)) for start in range(6))
+        for pattern in range(64)
+    ]
+
     def __init__(self, marble: int | None, row_index: int, field_index: int,
                  neighbours: Optional[list["SigmarField"]] = None, board_edge_field = False):
         self.marble: int | None = marble
@@ -61,6 +72,7 @@ class SigmarField:
                 raise TypeError("One of the fields passed as neighbour is of invalid type.")
         self.free = False
         self.board_edge_field = board_edge_field
+        self.layout_index: int | None = None  # position in the flat field list of the board, set by the board
 
     def __eq__(self, other):
         """This only used for tests."""
@@ -83,6 +95,19 @@ class SigmarField:
         self.left_down_neigh = neighbours[4]
         self.left_neigh = neighbours[5]
 
+    def copy(self) -> "SigmarField":
+        """Copy of the field state (marble, position and free status), not wired to any neighbours."""
+        field = SigmarField.__new__(SigmarField)
+        field.marble = self.marble
+        field.row_index = self.row_index
+        field.field_index = self.field_index
+        field.left_up_neigh = field.right_up_neigh = field.right_neigh = None
+        field.right_down_neigh = field.left_down_neigh = field.left_neigh = None
+        field.free = self.free
+        field.board_edge_field = self.board_edge_field
+        field.layout_index = self.layout_index
+        return field
+
     def get_continuous_neigh_list(self):
         """
         Return a list of fields surrounding this one. Returns a list in counter-clockwise order.
@@ -108,22 +133,22 @@ class SigmarField:
         if self.board_edge_field:
             self.free = True
             return True
-        i = 0
-        j = 1
-        k = 2
-        n_list = self.get_continuous_neigh_list()
         if invoke_for_neighbours:
-            for neigh in n_list[:6]:
-                neigh.check_and_set_free_status(invoke_for_neighbours=False)
-        for _ in range(6):
-            if n_list[i].marble is None and n_list[j].marble is None and n_list[k].marble is None:
-                self.free = True
-                return True
-            i += 1
-            j += 1
-            k += 1
-        self.free = False
-        return False
+            self.left_up_neigh.check_and_set_free_status(invoke_for_neighbours=False)
+            self.right_up_neigh.check_and_set_free_status(invoke_for_neighbours=False)
+            self.right_neigh.check_and_set_free_status(invoke_for_neighbours=False)
+            self.right_down_neigh.check_and_set_free_status(invoke_for_neighbours=False)
+            self.left_down_neigh.check_and_set_free_status(invoke_for_neighbours=False)
+            self.left_neigh.check_and_set_free_status(invoke_for_neighbours=False)
+        self.free = self.free_pattern_table[
+            (self.left_up_neigh.marble is None)
+            | (self.right_up_neigh.marble is None) << 1
+            | (self.right_neigh.marble is None) << 2
+            | (self.right_down_neigh.marble is None) << 3
+            | (self.left_down_neigh.marble is None) << 4
+            | (self.left_neigh.marble is None) << 5
+        ]
+        return self.free
 
     def update_field(self, marble: int | None):
         """
@@ -165,15 +190,34 @@ class SmallSigmarBoard:
         65: "v",  # vitae
         None: "_"  # empty field
     }
+    # row lengths of the layout, including the edge fields that surround the playable area
+    board_row_sizes = [6, 7, 8, 9, 8, 7, 6]
+    # neighbour index arrays compiled from the layout, shared by all boards of the same shape
+    __compiled_neighbour_indexes: dict[tuple[int, ...], list[int]] = {}
+    # (board class, row sizes) -> fields of the empty board of that shape and the neighbours (layout indexes) of its
+    # playable fields - new boards copy the fields and wire them up, instead of composing the layout again
+    __templates: dict[tuple[type, tuple[int, ...]], tuple[list[SigmarField], list[tuple[int, ...]]]] = {}
 
     def __init__(self):
         self.first_element: SigmarMarble = SigmarMarble.gold
         self.initial_items: list[SigmarMarble] | None = None
         self.layout: list[list[SigmarField]] | None = None
+        self.fields: list[SigmarField] | None = None
+        self.neighbour_indexes: list[int] | None = None
         self.init_items()
-        self.init_board_rows()
-        self.compose_board_interconnections()
-        self.layout_midpoint = 3, 4
+        template_key = self.__template_key()
+        if template_key in self.__templates:
+            self.__load_fields(self.__templates[template_key][0])
+        else:
+            self.init_board_rows()
+            self.compose_board_interconnections()
+            wiring = [
+                (field.layout_index, *self.neighbour_indexes[6 * field.layout_index:6 * field.layout_index + 6])
+                for field in self.fields[:-1] if not field.board_edge_field
+            ]
+            self.__templates[template_key] = [field.copy() for field in self.fields], wiring
+        middle_row = len(self.layout) // 2
+        self.layout_midpoint = middle_row, len(self.layout[middle_row]) // 2
         self.initialized_to_play = False
 
     @staticmethod
@@ -208,10 +252,9 @@ class SmallSigmarBoard:
         #   n - e - e - e - e - e - e - n
         #     n - e - e - e - e - e - n
         #       n - n - n - n - n - n
-        sizes = [6, 7, 8, 9, 8, 7, 6]
         self.layout: list[list[SigmarField]] = [
             [SigmarField(None, row_idx, field_idx) for field_idx in range(size)]
-            for row_idx, size in enumerate(sizes)
+            for row_idx, size in enumerate(self.board_row_sizes)
         ]
         for field in self.layout[0]:
             field.board_edge_field = True
@@ -221,51 +264,159 @@ class SmallSigmarBoard:
             layer[0].board_edge_field = True
             layer[-1].board_edge_field = True
 
+    @classmethod
+    def compile_adjacency(cls, row_sizes: tuple[int, ...]) -> list[int]:
+        """
+        Compile neighbourhood of the layout with given row sizes into a flat index array - six entries per field
+        (row-major order of the layout), in get_continuous_neigh_list order. Missing neighbours (all the neighbours
+        of the edge fields) point to a sentinel index after the last field, which never holds a marble. This way
+        edge fields always come out as free from the same free pattern lookup as the playable ones.
+
+        Rows are skewed into axial coordinates (column = field_index + rows left until the middle row), which turns
+        both the growing and the shrinking half of the hexagon into the same neighbour arithmetic. The result
+        is built once per board shape and shared by all the boards of that shape.
+        """
+        if row_sizes in cls.__compiled_neighbour_indexes:
+            return cls.__compiled_neighbour_indexes[row_sizes]
+        middle_row = row_sizes.index(max(row_sizes))
+        last_row = len(row_sizes) - 1
+        row_offsets = [sum(row_sizes[:row_idx]) for row_idx in range(len(row_sizes))]
+        sentinel_index = sum(row_sizes)
+
+        def layout_index(row_idx: int, column: int) -> int:
+            field_idx = column - max(0, middle_row - row_idx)
+            if 0 <= row_idx <= last_row and 0 <= field_idx < row_sizes[row_idx]:
+                return row_offsets[row_idx] + field_idx
+            return sentinel_index
+
+        neighbour_indexes = []
+        for row_idx, size in enumerate(row_sizes):
+            for field_idx in range(size):
+                if row_idx in (0, last_row) or field_idx in (0, size - 1):
+                    neighbour_indexes.extend([sentinel_index] * 6)
+                    continue
+                column = field_idx + max(0, middle_row - row_idx)
+                neighbour_indexes.extend([
+                    layout_index(row_idx - 1, column),  # left up
+                    layout_index(row_idx - 1, column + 1),  # right up
+                    layout_index(row_idx, column + 1),  # right
+                    layout_index(row_idx + 1, column),  # right down
+                    layout_index(row_idx + 1, column - 1),  # left down
+                    layout_index(row_idx, column - 1),  # left
+                ])
+        cls.__compiled_neighbour_indexes[row_sizes] = neighbour_indexes
+        return neighbour_indexes
+
     def compose_board_interconnections(self):
-        """Prepare all the interconnectivity required for neighbourhood checks."""
-        field: SigmarField
-        for row_idx, board_row in enumerate(self.layout[1:4]):
-            for field_idx, field in enumerate(board_row[1:-1]):
-                field.left_up_neigh = self.layout[row_idx][field_idx]
-                field.right_up_neigh = self.layout[row_idx][field_idx+1]
-                field.left_neigh = board_row[field_idx]
-                field.right_neigh = board_row[field_idx+2]
-                if row_idx + 1 < 3:
-                    field.left_down_neigh = self.layout[row_idx+2][field_idx+1]
-                    field.right_down_neigh = self.layout[row_idx+2][field_idx+2]
-                else:
-                    field.left_down_neigh = self.layout[row_idx+2][field_idx]
-                    field.right_down_neigh = self.layout[row_idx+2][field_idx+1]
-        for row_idx, board_row in enumerate(self.layout[4:-1]):
-            for field_idx, field in enumerate(board_row[1:-1]):
-                field.left_up_neigh = self.layout[3+row_idx][field_idx+1]
-                field.right_up_neigh = self.layout[3+row_idx][field_idx+2]
-                field.left_neigh = board_row[field_idx]
-                field.right_neigh = board_row[field_idx+2]
-                field.left_down_neigh = self.layout[3+row_idx+2][field_idx]
-                field.right_down_neigh = self.layout[3+row_idx+2][field_idx+1]
-        for board_row in self.layout[1:-1]:
-            for field in board_row[1:-1]:
-                field.check_and_set_free_status()
+        """
+        Prepare all the interconnectivity required for neighbourhood checks - flatten the layout into a row-major
+        field list (with the sentinel field at the end) and wire neighbour pointers of the playable fields
+        from the compiled adjacency of the board shape.
+        """
+        self.fields = [field for row in self.layout for field in row]
+        sentinel = SigmarField(None, -1, -1, board_edge_field=True)
+        self.fields.append(sentinel)
+        for layout_index, field in enumerate(self.fields):
+            field.layout_index = layout_index
+        self.neighbour_indexes = self.compile_adjacency(tuple(len(row) for row in self.layout))
+        for field in self.fields[:-1]:
+            if not field.board_edge_field:
+                base = 6 * field.layout_index
+                field.update_neighbours([self.fields[idx] for idx in self.neighbour_indexes[base:base + 6]])
+        self.refresh_free_status()
+
+    def __template_key(self) -> tuple[type, tuple[int, ...]]:
+        """Subclasses may lay the rows out on their own, so templates are kept per board class as well as shape."""
+        return type(self), tuple(self.board_row_sizes)
+
+    def __load_fields(self, source_fields: list[SigmarField]):
+        """
+        Take copies of the fields of a board of the same shape (the sentinel field included) as the fields of this
+        board, wiring their neighbour pointers from the template of the shape.
+        """
+        row_sizes = tuple(self.board_row_sizes)
+        wiring = self.__templates[self.__template_key()][1]
+        self.fields = fields = [field.copy() for field in source_fields]
+        self.layout = []
+        row_start = 0
+        for size in row_sizes:
+            self.layout.append(fields[row_start:row_start + size])
+            row_start += size
+        self.neighbour_indexes = self.compile_adjacency(row_sizes)
+        for layout_index, left_up, right_up, right, right_down, left_down, left in wiring:
+            field = fields[layout_index]
+            field.left_up_neigh = fields[left_up]
+            field.right_up_neigh = fields[right_up]
+            field.right_neigh = fields[right]
+            field.right_down_neigh = fields[right_down]
+            field.left_down_neigh = fields[left_down]
+            field.left_neigh = fields[left]
+
+    def clone(self) -> "SmallSigmarBoard":
+        """
+        Independent copy of the board position. Only the marbles and free status are copied, the layout is wired
+        up from the template of the board shape.
+        """
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board.initial_items = list(self.initial_items)
+        board.__load_fields(self.fields)
+        return board
+
+    def refresh_field_free_status(self, layout_index: int):
+        """Set free status of a single field with one lookup into SigmarField.free_pattern_table."""
+        fields = self.fields
+        neighbours = self.neighbour_indexes
+        base = 6 * layout_index
+        fields[layout_index].free = SigmarField.free_pattern_table[
+            (fields[neighbours[base]].marble is None)
+            | (fields[neighbours[base + 1]].marble is None) << 1
+            | (fields[neighbours[base + 2]].marble is None) << 2
+            | (fields[neighbours[base + 3]].marble is None) << 3
+            | (fields[neighbours[base + 4]].marble is None) << 4
+            | (fields[neighbours[base + 5]].marble is None) << 5
+        ]
+
+    def refresh_free_status(self):
+        """Recalculate free status of every field on the board."""
+        for layout_index in range(len(self.fields) - 1):
+            self.refresh_field_free_status(layout_index)
+
+    def set_field_marble(self, layout_index: int, marble: int | None):
+        """
+        Equivalent of SigmarField.update_field working on the compiled layout - places the marble (or empties
+        the field) and refreshes free status of the field and its six neighbours.
+        """
+        self.fields[layout_index].marble = marble
+        self.refresh_field_free_status(layout_index)
+        sentinel_index = len(self.fields) - 1
+        for neigh_index in self.neighbour_indexes[6 * layout_index:6 * layout_index + 6]:
+            if neigh_index != sentinel_index:
+                self.refresh_field_free_status(neigh_index)
 
     def reset_board(self):
         """Return board to empty state for a new game/test."""
         self.init_items()
-        for row in self.layout[1:-1]:  # don't rebuild entire layout again
-            for field in row[1:-1]:
-                field.update_field(None)
+        # don't rebuild entire layout again - free status of the empty board comes from the template of the shape
+        for field, empty_field in zip(self.fields, self.__templates[self.__template_key()][0]):
+            field.marble = None
+            field.free = empty_field.free
 
-    def lay_down_marbles_in_wavefront(self):
+    def lay_down_marbles_in_wavefront(self, rng: Random | None = None):
         """
         Since original Sigmar Garden game starts from the middle and the first middle element is always the "Gold"
         marble, place it in the middle of the layout. Also, start placing other pairs of marbles, moving out from
         center to the edges, randomly picking the neighbour of the wavefront to propagate outwards.
 
         Partially tested
+
+        :param rng: random generator to draw the layout from, global `random` state is used when not passed.
         """
-        self.layout[self.layout_midpoint[0]][self.layout_midpoint[1]].update_field(self.first_element.value)
+        shuffle_ = rng.shuffle if rng is not None else shuffle
+        midpoint_field = self.layout[self.layout_midpoint[0]][self.layout_midpoint[1]]
+        self.set_field_marble(midpoint_field.layout_index, self.first_element.value)
         eligible_wavefront_elements = [self.layout[self.layout_midpoint[0]][self.layout_midpoint[1]]]
-        shuffle(self.initial_items)
+        shuffle_(self.initial_items)
         for pair in self.initial_items:
             marble: Enum
             for marble in pair:
@@ -275,10 +426,11 @@ class SmallSigmarBoard:
                 for wavefront_sigfield_index in randomized_wavefront_indexes:
                     wavefront_sigmar_field: SigmarField = eligible_wavefront_elements[wavefront_sigfield_index]
                     randomized_neighbours = wavefront_sigmar_field.get_continuous_neigh_list()[:6]
-                    shuffle(randomized_neighbours)
+                    shuffle_(randomized_neighbours)
                     for neigh in randomized_neighbours:
                         if neigh.marble is None and neigh.free and not neigh.board_edge_field:
-                            neigh.update_field(marble.value)  # "value" is a property not a regular method
+                            # "value" is a property not a regular method
+                            self.set_field_marble(neigh.layout_index, marble.value)
                             success = True
                         if success:
                             if wavefront_sigmar_field.enclosed_status:
@@ -289,10 +441,25 @@ class SmallSigmarBoard:
                         break
                 if not success:
                     raise RuntimeError(f"Could not find proper field for {marble=}, aborting.")
-        for row in self.layout[1:-1]:
-            for field in row[1:-1]:
-                field.check_and_set_free_status(invoke_for_neighbours=False)
+        self.refresh_free_status()
+
+        self.initialized_to_play = True
+
+    def text_encoding(self) -> str:
+        """Board contents as a string of sigmar_text_encoding characters, one per playable field, row by row."""
+        return "".join(self.sigmar_text_encoding[field.marble] for row in self.layout[1:-1] for field in row[1:-1])
 
+    def load_text_encoding(self, encoding: str):
+        """Lay down the marbles of a text_encoding string (of a board of the same shape), ready to play."""
+        playable_fields = [field for row in self.layout[1:-1] for field in row[1:-1]]
+        if len(encoding) != len(playable_fields):
+            raise ValueError(f"Encoding holds {len(encoding)} fields, board has {len(playable_fields)}")
+        marbles = {character: marble for marble, character in self.sigmar_text_encoding.items()}
+        for field, character in zip(playable_fields, encoding):
+            if character not in marbles:
+                raise ValueError(f"Unknown marble character {character!r} in the encoding")
+            field.marble = marbles[character]
+        self.refresh_free_status()
         self.initialized_to_play = True
 
     def print_board(self):
@@ -321,8 +488,64 @@ class SmallSigmarBoard:
         print(" " * (space_count-4), "\\-"+"---"*(len(self.layout[1])-2)+"-/")
 
 
+class HexSigmarBoard(SmallSigmarBoard):
+    """
+    Regular hexagonal Sigmar Garden board, with a side of `radius` fields. Real game board has radius 6 -
+    11 fields across and 91 fields in total - and carries the real game marble set: 4 salt, 8 marbles of each
+    element, 5 quicksilver, 6 metals and 4 mors/vitae pairs.
+
+    Smaller boards (for benchmarks) get the marble set trimmed down to the same density of marbles per field
+    as the real board. Metals and quicksilver are never trimmed.
+    """
+    REAL_GAME_RADIUS = 6
+
+    def __init__(self, radius: int = REAL_GAME_RADIUS):
+        if radius < 3:
+            raise ValueError(f"Board needs a radius of at least 3 to hold all the metals, got {radius=}")
+        self.radius = radius
+        self.board_row_sizes = self.hex_row_sizes(radius)
+        super().__init__()
+
+    @staticmethod
+    def hex_row_sizes(radius: int) -> list[int]:
+        """Playable rows grow from `radius` to `2*radius-1` fields and shrink back, plus the ring of edge fields."""
+        return [
+            radius + 1 + row_idx if row_idx <= radius else 3 * radius + 1 - row_idx
+            for row_idx in range(2 * radius + 1)
+        ]
+
+    @property
+    def playable_field_count(self) -> int:
+        return 3 * self.radius * (self.radius - 1) + 1
+
+    def init_items(self):
+        metal_pairs = [
+            (SigmarMarble.quicksilver, metal) for metal in [
+                SigmarMarble.lead, SigmarMarble.tin, SigmarMarble.iron, SigmarMarble.copper, SigmarMarble.silver
+            ]
+        ]
+        # the rest of the pairs is interleaved by kind, so trimming from the end keeps the marble set balanced
+        other_pairs = []
+        for pair_round in range(4):
+            other_pairs.extend([
+                (SigmarMarble.earth, SigmarMarble.earth), (SigmarMarble.fire, SigmarMarble.fire),
+                (SigmarMarble.wind, SigmarMarble.wind), (SigmarMarble.water, SigmarMarble.water),
+                (SigmarMarble.mors, SigmarMarble.vitae)
+            ])
+            if pair_round < 2:
+                other_pairs.append((SigmarMarble.salt, SigmarMarble.salt))
+        real_board_fields = 3 * self.REAL_GAME_RADIUS * (self.REAL_GAME_RADIUS - 1) + 1
+        real_marble_count = 1 + 2 * (len(metal_pairs) + len(other_pairs))
+        max_marbles = self.playable_field_count * real_marble_count // real_board_fields
+        max_other_pairs = max(0, (max_marbles - 1) // 2 - len(metal_pairs))
+        self.initial_items = metal_pairs + other_pairs[:max_other_pairs]
+
+
 if __name__ == '__main__':
     smol_board = SmallSigmarBoard()
     smol_board.print_board()
     smol_board.lay_down_marbles_in_wavefront()
     smol_board.print_board()
+    real_board = HexSigmarBoard()
+    real_board.lay_down_marbles_in_wavefront()
+    real_board.print_board()
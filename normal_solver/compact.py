@@ -0,0 +1,111 @@
+from normal_solver.board import SigmarField, SmallSigmarBoard
+
+
+class CompactBoardShape:
+    """
+    Everything about the board that doesn't change during the game - row sizes, edge fields, field coordinates
+    and the compiled adjacency. Held once per board shape and shared by all compact boards of that shape.
+    """
+    __shapes: dict[tuple[int, ...], "CompactBoardShape"] = {}
+
+    def __init__(self, row_sizes: tuple[int, ...]):
+        self.row_sizes = row_sizes
+        self.neighbour_indexes = SmallSigmarBoard.compile_adjacency(row_sizes)
+        self.field_count = sum(row_sizes)  # index of the sentinel field as well
+        self.coords: list[tuple[int, int]] = []
+        self.playable_indexes: list[int] = []
+        last_row = len(row_sizes) - 1
+        for row_idx, size in enumerate(row_sizes):
+            for field_idx in range(size):
+                if 0 < row_idx < last_row and 0 < field_idx < size - 1:
+                    self.playable_indexes.append(len(self.coords))
+                self.coords.append((row_idx, field_idx))
+        self.layout_indexes = {coords: layout_index for layout_index, coords in enumerate(self.coords)}
+
+    @classmethod
+    def for_row_sizes(cls, row_sizes) -> "CompactBoardShape":
+        key = tuple(row_sizes)
+        if key not in cls.__shapes:
+            cls.__shapes[key] = cls(key)
+        return cls.__shapes[key]
+
+
+class CompactSigmarBoard:
+    """
+    Memory-compact board - marbles and free flags of all the fields are held in two bytearrays (one byte per
+    field, indexed by layout index like SmallSigmarBoard.fields, sentinel field included), while the layout
+    itself lives in the shared CompactBoardShape. No per-field objects are allocated, so a board costs
+    a couple hundred bytes instead of a SigmarField object graph.
+    """
+    __slots__ = ("shape", "marbles", "free")
+    EMPTY = 0xFF  # marble code of an empty field, all SigmarMarble values fit below it
+
+    def __init__(self, row_sizes: list[int] | None = None):
+        self.shape = CompactBoardShape.for_row_sizes(
+            row_sizes if row_sizes is not None else SmallSigmarBoard.board_row_sizes
+        )
+        self.marbles = bytearray([self.EMPTY]) * (self.shape.field_count + 1)
+        self.free = bytearray(self.shape.field_count + 1)
+        self.refresh_free_status()
+
+    @classmethod
+    def from_board(cls, board: SmallSigmarBoard) -> "CompactSigmarBoard":
+        compact = cls([len(row) for row in board.layout])
+        for layout_index, field in enumerate(board.fields[:-1]):
+            compact.marbles[layout_index] = cls.EMPTY if field.marble is None else field.marble
+        compact.refresh_free_status()
+        return compact
+
+    def to_board(self, board: SmallSigmarBoard):
+        """Write marbles of this board into a SigmarField based board of the same shape."""
+        for layout_index, field in enumerate(board.fields[:-1]):
+            marble = self.marbles[layout_index]
+            field.marble = None if marble == self.EMPTY else marble
+        board.refresh_free_status()
+
+    def copy(self) -> "CompactSigmarBoard":
+        clone = object.__new__(CompactSigmarBoard)
+        clone.shape = self.shape
+        clone.marbles = self.marbles[:]
+        clone.free = self.free[:]
+        return clone
+
+    def get_marble(self, row_idx: int, field_idx: int) -> int | None:
+        marble = self.marbles[self.shape.layout_indexes[(row_idx, field_idx)]]
+        return None if marble == self.EMPTY else marble
+
+    def is_free(self, row_idx: int, field_idx: int) -> bool:
+        return bool(self.free[self.shape.layout_indexes[(row_idx, field_idx)]])
+
+    def refresh_field_free_status(self, layout_index: int):
+        marbles = self.marbles
+        neighbours = self.shape.neighbour_indexes
+        base = 6 * layout_index
+        self.free[layout_index] = SigmarField.free_pattern_table[
+            (marbles[neighbours[base]] == self.EMPTY)
+            | (marbles[neighbours[base + 1]] == self.EMPTY) << 1
+            | (marbles[neighbours[base + 2]] == self.EMPTY) << 2
+            | (marbles[neighbours[base + 3]] == self.EMPTY) << 3
+            | (marbles[neighbours[base + 4]] == self.EMPTY) << 4
+            | (marbles[neighbours[base + 5]] == self.EMPTY) << 5
+        ]
+
+    def refresh_free_status(self):
+        for layout_index in range(self.shape.field_count):
+            self.refresh_field_free_status(layout_index)
+
+    def set_field_marble(self, layout_index: int, marble: int | None):
+        """Same as SmallSigmarBoard.set_field_marble - update the field and free status around it."""
+        self.marbles[layout_index] = self.EMPTY if marble is None else marble
+        self.refresh_field_free_status(layout_index)
+        for neigh_index in self.shape.neighbour_indexes[6 * layout_index:6 * layout_index + 6]:
+            if neigh_index != self.shape.field_count:
+                self.refresh_field_free_status(neigh_index)
+
+    def text_encoding(self) -> str:
+        """Same as SmallSigmarBoard.text_encoding."""
+        encoding = SmallSigmarBoard.sigmar_text_encoding
+        return "".join(
+            encoding[None if self.marbles[idx] == self.EMPTY else self.marbles[idx]]
+            for idx in self.shape.playable_indexes
+        )
@@ -0,0 +1,157 @@
+"""
+Generator of boards that are solvable by construction, laid down by playing the game backwards.
+
+Starting from the empty board, the gold marble goes to the middle, then pairs of marbles are put on the board one
+by one, each pair only on fields that are still free after both marbles are placed. Taking the pairs off in the
+reverse order is then always a legal game: every pair is free when its turn comes, and metals are placed in the
+reverse of the clearing order (silver first, lead last), so they come off in the order the rules require.
+The reversed placement order is returned as a witness solution, in the same format as
+SmallSigmarGame.winning_strategy.
+
+Usage:
+    python -m normal_solver.generator --count 1000 --radius 6 --seed 0
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from normal_solver.board import SigmarMarble, SigmarField, SmallSigmarBoard, HexSigmarBoard
+
+
+METAL_VALUES = {
+    SigmarMarble.lead.value, SigmarMarble.tin.value, SigmarMarble.iron.value,
+    SigmarMarble.copper.value, SigmarMarble.silver.value, SigmarMarble.gold.value,
+}
+
+
+class GenerationFailed(RuntimeError):
+    """Placement got stuck - no pair of fields could take the next pair of marbles."""
+
+
+def _metal_of_pair(pair: tuple[SigmarMarble, SigmarMarble]) -> int | None:
+    for marble in pair:
+        if marble.value in METAL_VALUES:
+            return marble.value
+    return None
+
+
+def placement_order(items: list[tuple[SigmarMarble, SigmarMarble]], rng: Random) -> list[tuple]:
+    """
+    Shuffle pairs into the order of placement. Metal pairs keep the slots the shuffle gave them, but are
+    reordered among themselves from the last metal to clear (silver) to the first one (lead).
+    """
+    order = list(items)
+    rng.shuffle(order)
+    metal_slots = [idx for idx, pair in enumerate(order) if _metal_of_pair(pair) is not None]
+    metal_pairs = sorted((order[idx] for idx in metal_slots), key=_metal_of_pair, reverse=True)
+    for idx, pair in zip(metal_slots, metal_pairs):
+        order[idx] = pair
+    return order
+
+
+def _free_empty_fields(board: SmallSigmarBoard) -> list[SigmarField]:
+    """Empty playable fields that would be free with a marble placed on them."""
+    return [
+        field for field in board.fields[:-1]
+        if not field.board_edge_field and field.marble is None and field.free
+    ]
+
+
+def _prefer_connected(board: SmallSigmarBoard, candidates: list[SigmarField]) -> list[SigmarField]:
+    """Fields touching an already placed marble go first, so the board grows outward like in the real game."""
+    connected = []
+    detached = []
+    for field in candidates:
+        base = 6 * field.layout_index
+        if any(board.fields[idx].marble is not None for idx in board.neighbour_indexes[base:base + 6]):
+            connected.append(field)
+        else:
+            detached.append(field)
+    return connected + detached
+
+
+def _place_pair(board: SmallSigmarBoard, pair: tuple[SigmarMarble, SigmarMarble],
+                rng: Random) -> tuple[SigmarField, SigmarField]:
+    first_candidates = _free_empty_fields(board)
+    rng.shuffle(first_candidates)
+    for first in _prefer_connected(board, first_candidates):
+        board.set_field_marble(first.layout_index, pair[0].value)
+        if first.free:
+            second_candidates = _free_empty_fields(board)
+            rng.shuffle(second_candidates)
+            for second in _prefer_connected(board, second_candidates):
+                board.set_field_marble(second.layout_index, pair[1].value)
+                if first.free and second.free:
+                    return first, second
+                board.set_field_marble(second.layout_index, None)
+        board.set_field_marble(first.layout_index, None)
+    raise GenerationFailed(f"Could not find free fields for pair {pair}")
+
+
+def lay_down_in_reverse(board: SmallSigmarBoard, rng: Random) -> list[list[tuple[int, int]]]:
+    """
+    Lay down the initial items of an empty board by reverse play. Board is left ready to play.
+    :return: witness solution - moves clearing the whole board, as lists of (row_index, field_index).
+    :raises GenerationFailed: when placement got stuck, board should be reset and laid down again.
+    """
+    midpoint = board.get_field_by_index(*board.layout_midpoint)
+    board.set_field_marble(midpoint.layout_index, board.first_element.value)
+    placements = [[board.layout_midpoint]]
+    for pair in placement_order(board.initial_items, rng):
+        placed = _place_pair(board, pair, rng)
+        placements.append([(field.row_index, field.field_index) for field in placed])
+    board.initialized_to_play = True
+    return placements[::-1]
+
+
+def generate_solvable_board(board: SmallSigmarBoard, rng: Random,
+                            max_attempts: int = 100) -> tuple[list[list[tuple[int, int]]], int]:
+    """
+    Lay down a solvable board, retrying from the empty board when placement gets stuck.
+    :return: witness solution and the number of attempts it took.
+    """
+    for attempt in range(1, max_attempts + 1):
+        board.reset_board()
+        try:
+            return lay_down_in_reverse(board, rng), attempt
+        except GenerationFailed:
+            continue
+    raise GenerationFailed(f"Could not lay down a solvable board in {max_attempts} attempts")
+
+
+def generate_boards(count: int, radius: int | None = None, seed_: int = 0) -> tuple[list[tuple[str, list]], dict]:
+    """
+    Generate `count` solvable boards, returning (text encoding, witness solution) pairs and generation stats
+    (attempts made, elapsed time and boards per second).
+    """
+    rng = Random(seed_)
+    boards = []
+    attempts = 0
+    started = perf_counter()
+    for _ in range(count):
+        board = HexSigmarBoard(radius) if radius is not None else SmallSigmarBoard()
+        witness, board_attempts = generate_solvable_board(board, rng)
+        attempts += board_attempts
+        boards.append((board.text_encoding(), witness))
+    elapsed = perf_counter() - started
+    stats = {
+        "boards": count, "attempts": attempts, "elapsed": elapsed,
+        "boards_per_second": count / elapsed if elapsed > 0 else float("inf"),
+    }
+    return boards, stats
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(description="Generate solvable boards by reverse play and report the throughput.")
+    parser.add_argument("--count", type=int, default=1000, help="number of boards to generate")
+    parser.add_argument("--radius", type=int, default=None, help="hex board radius, small test board if omitted")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    args = parser.parse_args(argv)
+
+    _, stats = generate_boards(args.count, args.radius, args.seed)
+    print(f"Generated {stats['boards']} boards in {stats['elapsed']:.2f}s "
+          f"({stats['boards_per_second']:.1f} boards/s, {stats['attempts']} attempts)")
+
+
+if __name__ == '__main__':
+    main()
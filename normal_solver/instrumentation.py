@@ -0,0 +1,96 @@
+"""
+Opt-in statistics of a solve - search tree shape, move counts, cache hits and time spent per solver phase.
+
+Counters and timers are updated by the search of SmallSigmarGame itself, behind a check for the stats of
+the running solve. Solves without stats skip them, so instrumentation costs a single check per node and move.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable
+
+
+class SolveStats:
+    """
+    Statistics of a single SmallSigmarGame.solve (or solve_anytime) call.
+
+    - nodes: expanded search nodes (positions whose moves were generated)
+    - max_depth: the deepest move sequence tried
+    - branching: histogram of legal move counts of the expanded nodes
+    - moves_generated / moves_tried: legal moves listed in expanded nodes / actually applied
+    - transposition_hits, pruned, solution_cache_hit: nodes answered without expanding them
+    - timers: seconds spent updating free status, generating moves (eligible move lists and keeping their index
+      up to date) and checking the pruning rules
+
+    :param progress_callback: called with the stats roughly every `progress_interval` seconds of the solve.
+    """
+    TIMERS = ("free_status", "move_generation", "pruning")
+
+    def __init__(self, progress_callback: Callable[["SolveStats"], None] | None = None,
+                 progress_interval: float = 1.0):
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.nodes = 0
+        self.max_depth = 0
+        self.branching: Counter[int] = Counter()
+        self.moves_generated = 0
+        self.moves_tried = 0
+        self.transposition_hits = 0
+        self.pruned = 0
+        self.solution_cache_hit = False
+        self.timers: dict[str, float] = {timer: 0.0 for timer in self.TIMERS}
+        self.elapsed = 0.0
+        self.__depth = 0
+        self.__started = 0.0
+        self.__last_progress = 0.0
+
+    @property
+    def mean_branching(self) -> float:
+        return self.moves_generated / self.nodes if self.nodes else 0.0
+
+    def as_dict(self) -> dict:
+        """JSON-ready form of the stats."""
+        return {
+            "nodes": self.nodes,
+            "max_depth": self.max_depth,
+            "branching": {str(moves): count for moves, count in sorted(self.branching.items())},
+            "mean_branching": self.mean_branching,
+            "moves_generated": self.moves_generated,
+            "moves_tried": self.moves_tried,
+            "transposition_hits": self.transposition_hits,
+            "pruned": self.pruned,
+            "solution_cache_hit": self.solution_cache_hit,
+            "timers": dict(self.timers),
+            "elapsed": self.elapsed,
+        }
+
+    def count_node(self, moves: int):
+        """Expanded node with `moves` legal moves."""
+        self.nodes += 1
+        self.branching[moves] += 1
+        self.moves_generated += moves
+        if self.progress_callback is not None:
+            now = perf_counter()
+            self.elapsed = now - self.__started
+            if now - self.__last_progress >= self.progress_interval:
+                self.__last_progress = now
+                self.progress_callback(self)
+
+    def count_move(self):
+        self.moves_tried += 1
+        self.__depth += 1
+        self.max_depth = max(self.max_depth, self.__depth)
+
+    def count_undo(self):
+        self.__depth -= 1
+
+    @contextmanager
+    def attached(self, game):
+        """Time the solve running in the block, the game counts into the stats meanwhile."""
+        transposition_hits = game.transposition_table.hits
+        self.__started = self.__last_progress = perf_counter()
+        try:
+            yield self
+        finally:
+            self.elapsed = perf_counter() - self.__started
+            self.transposition_hits += game.transposition_table.hits - transposition_hits
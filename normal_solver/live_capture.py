@@ -0,0 +1,185 @@
+"""
+Following a live game frame by frame - the board is recognised once, later frames only update it.
+
+A move changes two fields (one for gold), so instead of recognising every frame from scratch the tracker samples
+the fields at the grid location found in the first frame and compares them with the previous samples, field
+by field. Only the fields whose pixels changed are classified again. When the changed fields became empty and
+form a legal move, the move is applied to the game (SmallSigmarGame.apply_move - the board is updated in place
+through set_field_marble), so the solver keeps its transposition table, and its winning strategy too, if the
+player followed it. Half of a move (one marble of a pair gone in the middle of an animation) is held back until
+the other one is gone as well. Any other change is taken as an edit of the board, and too many changed fields
+at once (a new game, the window moved) as a reason to recognise the frame from scratch.
+
+Runs offline on recorded frames - an (N, height, width, 3) array saved with numpy.save:
+    python -m normal_solver.live_capture recording.npy --radius 6
+"""
+from argparse import ArgumentParser
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from normal_solver.batch import make_board
+from normal_solver.board import SigmarMarble, SmallSigmarBoard
+from normal_solver.serialisation import board_for_row_sizes
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.vectorised import EMPTY
+from normal_solver.visual_inspector import BoardRecogniser, GridLocation, encoding_from_codes
+
+
+class FrameUpdate:
+    """
+    What a frame changed on the board.
+
+    - kind: IDLE (nothing changed), PENDING (waiting for the rest of a move), MOVE, EDIT or RESYNC (the frame
+      was recognised from scratch)
+    - changed: (row, field) coordinates of the fields whose pixels changed
+    - move: coordinates of the fields of the move made, for MOVE
+    """
+    IDLE = "idle"
+    PENDING = "pending"
+    MOVE = "move"
+    EDIT = "edit"
+    RESYNC = "resync"
+
+    def __init__(self, kind: str, changed: list[tuple[int, int]], move: list[tuple[int, int]] | None = None):
+        self.kind = kind
+        self.changed = changed
+        self.move = move
+
+    def __repr__(self):
+        return f"FrameUpdate(kind={self.kind!r}, changed={self.changed}, move={self.move})"
+
+
+class LiveBoardTracker:
+    """
+    Board of a live game, kept up to date frame by frame.
+    :param change_threshold: mean absolute difference of the samples of a field (0-255) that counts as a change.
+    :param resync_fraction: fraction of fields changed at once that makes the frame be recognised from scratch.
+    """
+
+    def __init__(self, recogniser: BoardRecogniser, change_threshold: float = 24.0, resync_fraction: float = 0.25):
+        self.recogniser = recogniser
+        self.change_threshold = change_threshold
+        self.resync_fraction = resync_fraction
+        self.board: SmallSigmarBoard | None = None
+        self.game: SmallSigmarGame | None = None
+        self.location: GridLocation | None = None
+        # remaining moves of the winning strategy, None when it has to be solved (again)
+        self.strategy: list[list] | None = None
+        self.frames = 0
+        self.classified_fields = 0
+        self.__features: np.ndarray | None = None
+        self.__fields = []
+
+    def start(self, frame: np.ndarray) -> SmallSigmarBoard:
+        """Recognise the whole frame, (re)starting the game from it."""
+        codes, self.location = self.recogniser.recognise_codes(frame)
+        if self.board is None:
+            self.board = board_for_row_sizes(len(row) for row in self.recogniser.board.layout)
+            self.board.load_text_encoding(encoding_from_codes(codes))
+            self.game = SmallSigmarGame(board=self.board)
+            self.__fields = [field for row in self.board.layout[1:-1] for field in row[1:-1]]
+        else:
+            self.board.load_text_encoding(encoding_from_codes(codes))
+        self.classified_fields += len(codes)
+        self.__features = self.recogniser.sample(frame, self.location)
+        self.__restart_game()
+        return self.board
+
+    def __restart_game(self):
+        self.game.next_metal_to_clear = SigmarMarble.lead.value
+        self.game.count_marbles()
+        self.strategy = None
+
+    def update(self, frame: np.ndarray) -> FrameUpdate:
+        """Diff the frame against the previous one field by field, and apply what changed to the board."""
+        self.frames += 1
+        if self.board is None:
+            self.start(frame)
+            return FrameUpdate(FrameUpdate.RESYNC, [])
+        features = self.recogniser.sample(frame, self.location)
+        difference = np.abs(features - self.__features).mean(axis=1)
+        changed = np.flatnonzero(difference > self.change_threshold)
+        if not len(changed):
+            return FrameUpdate(FrameUpdate.IDLE, [])
+        if len(changed) > self.resync_fraction * len(self.__fields):
+            self.start(frame)
+            return FrameUpdate(FrameUpdate.RESYNC, self.__coords(changed))
+
+        codes = self.recogniser.classify(features[changed])
+        self.classified_fields += len(changed)
+        marbles = [None if code == EMPTY else int(code) for code in codes]
+        # fields that look different, but hold the same marble (a highlight, the cursor...) are no change
+        edits = [
+            (self.__fields[number], marble) for number, marble in zip(changed, marbles)
+            if self.__fields[number].marble != marble
+        ]
+        if not edits:
+            self.__features[changed] = features[changed]
+            return FrameUpdate(FrameUpdate.IDLE, self.__coords(changed))
+        if all(marble is None for _, marble in edits):
+            emptied = {field.layout_index for field, _ in edits}
+            for move in self.game.move_index.eligible_moves(self.game.next_metal_to_clear):
+                move_fields = {field.layout_index for field in move}
+                if move_fields == emptied:
+                    return self.__apply_move(move, features, changed)
+                if emptied < move_fields:
+                    # rest of the move will follow - samples of the changed fields are kept, to be seen again
+                    return FrameUpdate(FrameUpdate.PENDING, self.__coords(changed))
+
+        for field, marble in edits:
+            self.board.set_field_marble(field.layout_index, marble)
+        self.__features[changed] = features[changed]
+        self.__restart_game()
+        return FrameUpdate(FrameUpdate.EDIT, self.__coords(changed))
+
+    def __apply_move(self, move: tuple, features: np.ndarray, changed: np.ndarray) -> FrameUpdate:
+        self.game.apply_move(move)
+        self.__features[changed] = features[changed]
+        move_coords = [(field.row_index, field.field_index) for field in move]
+        if self.strategy and {tuple(coords) for coords in self.strategy[0]} == set(move_coords):
+            self.strategy = self.strategy[1:]
+        else:
+            self.strategy = None
+        return FrameUpdate(FrameUpdate.MOVE, self.__coords(changed), move_coords)
+
+    def __coords(self, numbers: np.ndarray) -> list[tuple[int, int]]:
+        return [(self.__fields[number].row_index, self.__fields[number].field_index) for number in numbers]
+
+    def next_move(self) -> list | None:
+        """
+        Next move of a winning strategy from the current position, None when the board can't be cleared.
+        The strategy is solved only when the player left the previous one - dead positions found by earlier solves
+        stay in the transposition table of the game.
+        """
+        if self.strategy is None:
+            if self.game.remaining_marbles == 0:
+                return None
+            self.strategy = self.game.solve() or []
+        return self.strategy[0] if self.strategy else None
+
+    def replay(self, frames: Iterable[np.ndarray]) -> Iterator[FrameUpdate]:
+        """Updates of a recorded frame sequence, the first frame starts the game."""
+        for frame in frames:
+            yield self.update(frame)
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(description="Follow a recorded game frame by frame, suggesting winning moves.")
+    parser.add_argument("recording", help="(frames, height, width, 3) RGB frames saved with numpy.save")
+    parser.add_argument("--radius", type=int, default=None, help="hex board radius, small test board if omitted")
+    args = parser.parse_args(argv)
+
+    frames = np.load(args.recording, mmap_mode="r")
+    tracker = LiveBoardTracker(BoardRecogniser(make_board(args.radius)))
+    for number, update in enumerate(tracker.replay(frames)):
+        if update.kind == FrameUpdate.IDLE:
+            continue
+        print(f"frame {number}: {update.kind} {update.move or update.changed}")
+        if update.kind != FrameUpdate.PENDING:
+            print(f"  next winning move: {tracker.next_move()}")
+    print(f"{tracker.frames} frames, {tracker.classified_fields} fields classified")
+
+
+if __name__ == '__main__':
+    main()
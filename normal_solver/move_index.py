@@ -0,0 +1,111 @@
+from bisect import bisect_left, insort
+from itertools import combinations
+
+from normal_solver.board import SigmarMarble, SigmarField, SmallSigmarBoard
+
+
+SALT = SigmarMarble.salt.value
+ELEMENTS = (SigmarMarble.earth.value, SigmarMarble.fire.value, SigmarMarble.wind.value, SigmarMarble.water.value)
+QUICKSILVER = SigmarMarble.quicksilver.value
+GOLD = SigmarMarble.gold.value
+MORS = SigmarMarble.mors.value
+VITAE = SigmarMarble.vitae.value
+
+
+def _ordered(field_1: SigmarField, field_2: SigmarField) -> tuple[SigmarField, SigmarField]:
+    if field_1.layout_index < field_2.layout_index:
+        return field_1, field_2
+    return field_2, field_1
+
+
+def pairs_from_buckets(buckets: dict[int, list[SigmarField]], next_metal_to_clear: int | None) -> list[tuple]:
+    """
+    Build all legal moves out of free marbles bucketed by marble type, only ever pairing compatible buckets:
+    element with the same element or salt, salt with salt, quicksilver with the next metal to clear,
+    mors with vitae, and gold alone once it is the next metal to clear.
+
+    Moves come out grouped by the buckets they pair - salt with salt, then every element with itself and with salt,
+    quicksilver with the metal, mors with vitae, gold last. With buckets in layout order, the moves of a group
+    (and the fields of a move) are in layout order too, so the order depends on the position alone, and no sort
+    is needed - the cost is proportional to the number of legal moves.
+    """
+    empty = []
+    salt = buckets.get(SALT, empty)
+    pairs = list(combinations(salt, 2))
+    for element in ELEMENTS:
+        element_fields = buckets.get(element, empty)
+        if element_fields:
+            pairs.extend(combinations(element_fields, 2))
+            pairs.extend(_ordered(element_field, salt_field) for element_field in element_fields for salt_field in salt)
+    if next_metal_to_clear is not None and next_metal_to_clear != GOLD:
+        pairs.extend(
+            _ordered(quicksilver_field, metal_field)
+            for quicksilver_field in buckets.get(QUICKSILVER, empty)
+            for metal_field in buckets.get(next_metal_to_clear, empty)
+        )
+    pairs.extend(
+        _ordered(mors_field, vitae_field)
+        for mors_field in buckets.get(MORS, empty) for vitae_field in buckets.get(VITAE, empty)
+    )
+    if next_metal_to_clear == GOLD:
+        pairs.extend((gold_field,) for gold_field in buckets.get(GOLD, empty))
+    return pairs
+
+
+def _layout_index(field: SigmarField) -> int:
+    return field.layout_index
+
+
+def bucket_fields(fields: list[SigmarField]) -> dict[int, list[SigmarField]]:
+    """Group fields by the marble placed on them, keeping the order of the passed list."""
+    buckets: dict[int, list[SigmarField]] = {}
+    for field in fields:
+        buckets.setdefault(field.marble, []).append(field)
+    return buckets
+
+
+class EligibleMoveIndex:
+    """
+    Free marbles of the board bucketed by marble type, maintained incrementally.
+
+    A move only changes marbles of the cleared fields and free status of their neighbours, so after apply/undo
+    only these fields are re-bucketed (update_around), instead of rescanning the board and checking every
+    pair of free marbles. Buckets are kept in layout order as fields come and go, ready for pairs_from_buckets.
+    """
+
+    def __init__(self, board: SmallSigmarBoard):
+        self.board = board
+        self.buckets: dict[int, list[SigmarField]] = {}
+        self.bucketed_marbles: list[int | None] = []
+        self.rebuild()
+
+    def rebuild(self):
+        """Bucket all the fields from scratch - required after the board was changed outside of update_around."""
+        self.buckets = {marble.value: [] for marble in SigmarMarble}
+        self.bucketed_marbles = [None] * len(self.board.fields)
+        for layout_index in range(len(self.board.fields) - 1):
+            self.update_field(layout_index)
+
+    def update_field(self, layout_index: int):
+        field = self.board.fields[layout_index]
+        marble = field.marble if field.free else None
+        previous = self.bucketed_marbles[layout_index]
+        if previous == marble:
+            return
+        if previous is not None:
+            bucket = self.buckets[previous]
+            del bucket[bisect_left(bucket, layout_index, key=_layout_index)]
+        if marble is not None:
+            insort(self.buckets[marble], field, key=_layout_index)
+        self.bucketed_marbles[layout_index] = marble
+
+    def update_around(self, layout_index: int):
+        """Re-bucket the field and its neighbours, after the field's marble has changed."""
+        self.update_field(layout_index)
+        sentinel_index = len(self.board.fields) - 1
+        for neigh_index in self.board.neighbour_indexes[6 * layout_index:6 * layout_index + 6]:
+            if neigh_index != sentinel_index:
+                self.update_field(neigh_index)
+
+    def eligible_moves(self, next_metal_to_clear: int | None) -> list[tuple]:
+        return pairs_from_buckets(self.buckets, next_metal_to_clear)
@@ -0,0 +1,69 @@
+"""
+Move ordering policies of the search - the order in which moves of a node are tried.
+
+Moves come out of the move generator grouped by kind of pair (see pairs_from_buckets). Ordering changes neither
+the result of a solve nor the set of searched positions of an unsolvable board (every move is tried anyway), but on
+a solvable board a good first guess finds the winning line with far fewer nodes.
+"""
+from normal_solver.board import SigmarMarble, SigmarField, SmallSigmarBoard
+
+
+SALT = SigmarMarble.salt.value
+METALS_AND_QUICKSILVER = frozenset((
+    SigmarMarble.lead.value, SigmarMarble.tin.value, SigmarMarble.iron.value, SigmarMarble.copper.value,
+    SigmarMarble.silver.value, SigmarMarble.gold.value, SigmarMarble.quicksilver.value,
+))
+
+
+class MoveOrdering:
+    """
+    Sorts moves of a search node by the keys of the chosen policies - by the first policy, ties broken by the next
+    one and so on, the generator order last. No policies keep the generator order, which is what the solver does
+    unless it is given a move ordering. Policies:
+
+    - metals_last: metal moves (quicksilver with the next metal, gold) after all the others.
+    - salt_parity: salt is saved for the elements with odd counts - an element paired with itself or an odd
+      element with salt first, salt with salt next, salt spent on an element of even count last.
+
+    The generator order is a strong guess already - on solvable full boards the first solution takes a median of
+    about 35 nodes, for 28 moves. Measured on the 40 first seeds (2 s budget each), over the 17 boards solved within
+    the budget, nodes to the first solution are: generator order 931, metals_last 789, salt_parity 988,
+    metals_last+salt_parity 660 - a reduction by less than a third, not by orders of magnitude. Moves freeing the
+    most marbles first, metals first and outer rings first were measured as well, they searched 2x to 14x more nodes
+    than the generator order.
+    """
+    POLICIES = ("metals_last", "salt_parity")
+
+    def __init__(self, board: SmallSigmarBoard, policies: tuple[str, ...]):
+        unknown_policies = set(policies) - set(self.POLICIES)
+        if unknown_policies:
+            raise ValueError(f"Unknown move ordering policies: {sorted(unknown_policies)}")
+        self.board = board
+        self.policies = tuple(policies)
+        self.__keys = [getattr(self, f"_{policy}_key") for policy in self.policies]
+
+    def order(self, moves: list[tuple[SigmarField, ...]], marble_counts: dict[int, int]) -> list[tuple]:
+        """Moves sorted by the policies, a new list - or the same list, when there is nothing to sort."""
+        keys = self.__keys
+        if not keys or len(moves) < 2:
+            return moves
+        if len(keys) == 1:
+            key = keys[0]
+            return sorted(moves, key=lambda move: key(move, marble_counts))
+        return sorted(moves, key=lambda move: tuple(key(move, marble_counts) for key in keys))
+
+    @staticmethod
+    def _metals_last_key(move: tuple[SigmarField, ...], _marble_counts: dict[int, int]) -> int:
+        return 1 if move[0].marble in METALS_AND_QUICKSILVER else 0
+
+    @staticmethod
+    def _salt_parity_key(move: tuple[SigmarField, ...], marble_counts: dict[int, int]) -> int:
+        if len(move) == 1:
+            return 0
+        marble_1, marble_2 = move[0].marble, move[1].marble
+        if marble_1 != SALT and marble_2 != SALT:
+            return 0
+        if marble_1 == marble_2:
+            return 1
+        element = marble_2 if marble_1 == SALT else marble_1
+        return 0 if marble_counts.get(element, 0) & 1 else 2
@@ -0,0 +1,210 @@
+"""
+Parallel solve of a single board - the first plies of the search tree are expanded in the main process, subtrees
+below them are searched by a pool of worker processes.
+
+Subtrees are handed out one at a time in the move order, so a worker done with an easy subtree picks up the next
+one. As soon as a worker finds a win, a shared cancellation event stops the others. Workers can share the dead
+positions they prove through a SharedDeadTable in shared memory, so a position proven dead in one subtree
+is skipped in all the others.
+
+How the solve scales depends on the board and the machine - measure_scaling (--scaling) times the serial solve
+and the parallel one for every given number of processes.
+
+Usage:
+    python -m normal_solver.parallel --seed 16 --radius 6 --processes 8
+    python -m normal_solver.parallel --seed 16 --radius 6 --scaling 1 2 4 8
+"""
+import multiprocessing
+import os
+from argparse import ArgumentParser
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from random import Random
+from time import perf_counter, time
+
+from normal_solver.anytime import CancellationToken, SolveResult
+from normal_solver.batch import make_board
+from normal_solver.board import SmallSigmarBoard
+from normal_solver.serialisation import board_for_row_sizes
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.transposition import SharedDeadTable, TranspositionTable
+
+
+_worker_state: dict = {}
+
+
+def _init_worker(cancel_event, shared_slots):
+    _worker_state["token"] = CancellationToken(cancel_event)
+    _worker_state["shared_slots"] = shared_slots
+    # dead positions stay dead, whatever subtree they were found in - worker keeps them between its tasks
+    _worker_state["local_table"] = TranspositionTable()
+
+
+def _solve_subtree(task: tuple[list[int], str, list[list], float | None]) -> dict:
+    row_sizes, encoding, prefix, deadline = task
+    if _worker_state["token"].cancelled:
+        return {
+            "prefix": prefix, "status": SolveResult.CANCELLED, "solvable": None, "moves": None, "best_partial": [],
+            "nodes": 0,
+        }
+    board = board_for_row_sizes(row_sizes)
+    board.load_text_encoding(encoding)
+    table = _worker_state["local_table"]
+    if _worker_state["shared_slots"] is not None:
+        table = SharedDeadTable(_worker_state["shared_slots"], table)
+    game = SmallSigmarGame(transposition_table=table, board=board)
+    game.count_marbles()
+    for move_coords in prefix:
+        game.apply_move(tuple(board.get_field_by_index(*coords) for coords in move_coords))
+    time_budget = None if deadline is None else max(0.0, deadline - time())
+    result = game.solve_anytime(time_budget, _worker_state["token"], discrepancy_limits=())
+    return {
+        "prefix": prefix, "status": result.status, "solvable": result.solvable, "moves": result.moves,
+        "best_partial": result.best_partial, "nodes": result.nodes,
+    }
+
+
+def split_root(game: SmallSigmarGame, plies: int) -> tuple[list[list], list[list] | None]:
+    """
+    Move sequences of `plies` moves from the current position of the game, skipping the ones leading to positions
+    the pruner rejects and repeated positions (the same pairs taken in another order). Returns the sequences,
+    or a winning strategy if the board gets cleared within the first plies already.
+    """
+    prefixes = []
+    seen_positions = set()
+    prefix = []
+
+    def expand(plies_left: int) -> bool:
+        if game.remaining_marbles == 0:
+            return True
+        if game.pruner.dead_rule(game.marble_counts, game.next_metal_to_clear) is not None:
+            return False
+        if plies_left == 0:
+            if game.canonical_hash not in seen_positions:
+                seen_positions.add(game.canonical_hash)
+                prefixes.append(list(prefix))
+            return False
+        for move in game.move_index.eligible_moves(game.next_metal_to_clear):
+            undo_info = game.apply_move(move)
+            prefix.append([(field.row_index, field.field_index) for field in move])
+            won = expand(plies_left - 1)
+            game.undo_move(move, undo_info)
+            if won:
+                return True
+            prefix.pop()
+        return False
+
+    if expand(plies):
+        return [], prefix
+    return prefixes, None
+
+
+def solve_parallel(board: SmallSigmarBoard, processes: int | None = None, plies: int = 2,
+                   share_dead_positions: bool = True, time_budget: float | None = None,
+                   cancellation_token: CancellationToken | None = None,
+                   shared_slots: int = 1 << 20) -> SolveResult:
+    """
+    Solve the board over a process pool (sized to the cores by default), splitting the search tree after `plies`
+    moves. Result is the same as of SmallSigmarGame.solve_anytime - nodes are summed over all the workers,
+    best partial is the deepest of all the subtrees.
+    :param shared_slots: size of the shared dead position table, 8 bytes per slot.
+    """
+    if not board.initialized_to_play:
+        raise RuntimeError("Board not initialized")
+    started = perf_counter()
+    game = SmallSigmarGame(board=board)
+    game.count_marbles()
+    prefixes, winning_strategy = split_root(game, plies)
+    if winning_strategy is not None:
+        return SolveResult(SolveResult.COMPLETE, True, winning_strategy, winning_strategy, 0,
+                           perf_counter() - started, None)
+
+    deadline = time() + time_budget if time_budget is not None else None
+    row_sizes = [len(row) for row in board.layout]
+    encoding = board.text_encoding()
+    tasks = [(row_sizes, encoding, prefix, deadline) for prefix in prefixes]
+    cancel_event = multiprocessing.Event()
+    slots = SharedDeadTable.allocate(shared_slots) if share_dead_positions else None
+    nodes = 0
+    best_partial = []
+    statuses = set()
+    executor = ProcessPoolExecutor(
+        processes or os.cpu_count() or 1, initializer=_init_worker, initargs=(cancel_event, slots)
+    )
+    try:
+        pending = {executor.submit(_solve_subtree, task) for task in tasks}
+        while pending and winning_strategy is None:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            if cancellation_token is not None and cancellation_token.cancelled:
+                cancel_event.set()
+            for future in done:
+                result = future.result()
+                nodes += result["nodes"]
+                statuses.add(result["status"])
+                partial = result["prefix"] + result["best_partial"]
+                if len(partial) > len(best_partial):
+                    best_partial = partial
+                if result["solvable"]:
+                    winning_strategy = result["prefix"] + result["moves"]
+                    break
+    finally:
+        # subtrees not started yet are dropped, the running ones stop on the cancel event
+        cancel_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = perf_counter() - started
+    if winning_strategy is not None:
+        return SolveResult(SolveResult.COMPLETE, True, winning_strategy, winning_strategy, nodes, elapsed, None)
+    if statuses <= {SolveResult.COMPLETE}:
+        return SolveResult(SolveResult.COMPLETE, False, None, best_partial, nodes, elapsed, None)
+    status = SolveResult.CANCELLED if SolveResult.CANCELLED in statuses else SolveResult.TIMEOUT
+    return SolveResult(status, None, None, best_partial, nodes, elapsed, None)
+
+
+def measure_scaling(board: SmallSigmarBoard, process_counts: list[int], plies: int = 2,
+                    time_budget: float | None = None) -> list[dict]:
+    """
+    Solve the board serially (SmallSigmarGame.solve_anytime) and then in parallel with each of the process counts,
+    reporting the wall time, nodes and speedup over the serial solve of every run. Runs that time out report
+    the speedup of the time budget they ran out of.
+    """
+    runs = []
+    serial = SmallSigmarGame(board=board).solve_anytime(time_budget, discrepancy_limits=())
+    runs.append({"processes": 0, "status": serial.status, "elapsed": serial.elapsed, "nodes": serial.nodes})
+    for processes in process_counts:
+        result = solve_parallel(board, processes, plies, time_budget=time_budget)
+        runs.append({"processes": processes, "status": result.status, "elapsed": result.elapsed, "nodes": result.nodes})
+    for run in runs:
+        run["speedup"] = serial.elapsed / run["elapsed"] if run["elapsed"] else float("inf")
+    return runs
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(description="Solve a single seeded board over all cores.")
+    parser.add_argument("--seed", type=int, required=True, help="seed of the board layout")
+    parser.add_argument("--radius", type=int, default=None, help="hex board radius, small test board if omitted")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("--plies", type=int, default=2, help="moves expanded before splitting the search")
+    parser.add_argument("--time-budget", type=float, default=None, help="seconds to stop the search after")
+    parser.add_argument("--no-sharing", action="store_true", help="don't share dead positions between workers")
+    parser.add_argument("--scaling", type=int, nargs="+", default=None, metavar="PROCESSES",
+                        help="time the serial solve and the parallel one with each number of processes instead")
+    args = parser.parse_args(argv)
+
+    board = make_board(args.radius)
+    board.lay_down_marbles_in_wavefront(rng=Random(args.seed))
+    if args.scaling is not None:
+        for run in measure_scaling(board, args.scaling, args.plies, args.time_budget):
+            name = f"{run['processes']} processes" if run["processes"] else "serial"
+            print(
+                f"{name:<14}{run['status']:<10}{run['elapsed']:>9.3f}s  {run['nodes']:>10} nodes  "
+                f"speedup {run['speedup']:.2f}"
+            )
+        return
+    result = solve_parallel(board, args.processes, args.plies, not args.no_sharing, args.time_budget)
+    print(result)
+    if result.moves:
+        print("winning strategy:", result.moves)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Solution cache kept in an SQLite file, so solved boards survive between runs, CI jobs and service restarts.
+
+Same interface as normal_solver.symmetry.SolutionCache (get/put by canonical_key, moves in the canonical frame),
+so it can be passed to SmallSigmarGame.solve as is. Every entry records the SOLVER_VERSION that produced it,
+entries of other versions are treated as missing and get overwritten.
+
+Writes are batched - put only queues the entry, they are written in a single transaction every `batch_size` puts,
+or by the first put or get at least `flush_interval` seconds after the last write (and on flush/close). Queued
+entries are not visible to other processes, and are lost if the process dies, so both limits are kept small.
+Reads update the last use time of entries the same way, so the cache can be capped at `max_entries`, evicting
+the least recently used entries on flush. Read-only consumers turn that off (track_usage=False) - they never write
+to the database then, and never wait for the write lock.
+
+The database runs in WAL mode, so any number of processes can read it while one of them writes. Open one cache
+per process (a connection must not cross a fork).
+"""
+import json
+import sqlite3
+from time import time
+from typing import Callable
+
+from normal_solver.solver import SOLVER_VERSION
+
+
+class PersistentSolutionCache:
+    """
+    :param path: SQLite database file, created if missing.
+    :param max_entries: entries kept in the database, None - no cap.
+    :param batch_size: puts (and reads touching last use times) queued before they are written.
+    :param flush_interval: seconds after which queued writes are written by the next put or get, None - only
+        when the batch is full.
+    :param track_usage: record last use times of the entries read, for the eviction of least recently used entries.
+    :param clock: source of the time of flushes and last uses, in seconds.
+    """
+
+    def __init__(self, path: str, max_entries: int | None = None, batch_size: int = 16,
+                 flush_interval: float | None = 1.0, solver_version: int = SOLVER_VERSION, track_usage: bool = True,
+                 clock: Callable[[], float] = time):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError(f"Cache has to hold at least one entry, got max_entries={max_entries}")
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.solver_version = solver_version
+        self.track_usage = track_usage
+        self.__clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__pending: dict[str, tuple[bool, list | None]] = {}
+        self.__touched: dict[str, float] = {}
+        self.__last_flush = clock()
+        self.__connection = sqlite3.connect(path, timeout=30.0)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        with self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                "key TEXT PRIMARY KEY, solvable INTEGER NOT NULL, moves TEXT, solver_version INTEGER NOT NULL, "
+                "last_used REAL NOT NULL)"
+            )
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+
+    def __enter__(self) -> "PersistentSolutionCache":
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+    def __len__(self):
+        """Entries written to the database - queued puts are not counted until they are flushed."""
+        return self.__connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "pending": len(self.__pending)}
+
+    def get(self, key: str) -> tuple[bool, list | None] | None:
+        cached = self.__pending.get(key)
+        if cached is None:
+            row = self.__connection.execute(
+                "SELECT solvable, moves FROM solutions WHERE key = ? AND solver_version = ?",
+                (key, self.solver_version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            moves = None
+            if row[1] is not None:
+                moves = [[tuple(coords) for coords in move] for move in json.loads(row[1])]
+            cached = (bool(row[0]), moves)
+            if self.track_usage:
+                self.__touched[key] = self.__clock()
+                self.__flush_if_due(len(self.__touched))
+        self.hits += 1
+        return cached
+
+    def put(self, key: str, solvable: bool, moves: list | None):
+        self.__pending[key] = (solvable, moves)
+        self.__flush_if_due(len(self.__pending))
+
+    def __flush_if_due(self, queued: int):
+        if queued >= self.batch_size or (
+                self.flush_interval is not None and self.__clock() - self.__last_flush >= self.flush_interval):
+            self.flush()
+
+    def put_many(self, entries):
+        """Queue (key, solvable, moves) entries, written in batches."""
+        for key, solvable, moves in entries:
+            self.put(key, solvable, moves)
+
+    def flush(self):
+        """Write queued entries and last use times, then evict least recently used entries over the cap."""
+        now = self.__clock()
+        self.__last_flush = now
+        if not self.__pending and not self.__touched:
+            return
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO solutions (key, solvable, moves, solver_version, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, int(solvable), json.dumps(moves) if moves is not None else None, self.solver_version, now)
+                    for key, (solvable, moves) in self.__pending.items()
+                ]
+            )
+            self.__connection.executemany(
+                "UPDATE solutions SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self.__touched.items()]
+            )
+            if self.max_entries is not None:
+                excess = self.__connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    self.__connection.execute(
+                        "DELETE FROM solutions WHERE key IN "
+                        "(SELECT key FROM solutions ORDER BY last_used LIMIT ?)", (excess,)
+                    )
+                    self.evictions += excess
+        self.__pending.clear()
+        self.__touched.clear()
+
+    def close(self):
+        self.flush()
+        self.__connection.close()
@@ -0,0 +1,132 @@
+"""
+Cheap necessary conditions of solvability, checked before expanding a search node.
+
+Every rule looks at a position and tells if it is certainly dead - when a rule fires, no move order can clear
+the board, so the whole subtree is cut without searching it. Rules never cut a solvable position (they are
+necessary, not sufficient conditions), so pruning only changes the number of searched nodes, never the result.
+"""
+from normal_solver.board import SigmarMarble, SigmarField, SmallSigmarBoard
+
+
+SALT = SigmarMarble.salt.value
+ELEMENTS = (SigmarMarble.earth.value, SigmarMarble.fire.value, SigmarMarble.wind.value, SigmarMarble.water.value)
+METALS = (
+    SigmarMarble.lead.value, SigmarMarble.tin.value, SigmarMarble.iron.value,
+    SigmarMarble.copper.value, SigmarMarble.silver.value, SigmarMarble.gold.value,
+)
+GOLD = SigmarMarble.gold.value
+QUICKSILVER = SigmarMarble.quicksilver.value
+MORS = SigmarMarble.mors.value
+VITAE = SigmarMarble.vitae.value
+
+
+class InfeasibilityPruner:
+    """
+    Dead position detection for SmallSigmarGame search. Rules, in the order they are checked:
+
+    - element_pairing: elements pair with their own kind or salt, salt with anything of the group - total
+      of elements and salt has to be even and every element of odd count needs a salt of its own.
+    - mors_vitae: mors and vitae are only cleared with each other, so there has to be as many of both.
+    - quicksilver_balance: every metal but gold takes exactly one quicksilver.
+    - metal_order: metals are cleared one of each kind in order, a metal below the next metal to clear
+      (or a second marble of the same metal) can never be cleared.
+    - buried_metal: the next metal to clear and one quicksilver have to become free using only the marbles
+      that can be cleared before that metal. Other metals and quicksilver can't, so everything else is
+      optimistically cleared as soon as it would be free - if the metal or all the quicksilver stay
+      covered even then, they are buried for good.
+
+    Count rules are a few dictionary lookups, buried_metal walks the board and runs only when the next metal
+    or all quicksilver are not free already.
+    """
+    RULES = ("element_pairing", "mors_vitae", "quicksilver_balance", "metal_order", "buried_metal")
+
+    def __init__(self, board: SmallSigmarBoard, rules: tuple[str, ...] = RULES):
+        unknown_rules = set(rules) - set(self.RULES)
+        if unknown_rules:
+            raise ValueError(f"Unknown pruning rules: {sorted(unknown_rules)}")
+        self.board = board
+        self.rules = tuple(rule for rule in self.RULES if rule in rules)
+        self.checks = 0
+        self.cuts: dict[str, int] = {rule: 0 for rule in self.rules}
+
+    def dead_rule(self, marble_counts: dict[int, int], next_metal_to_clear: int | None) -> str | None:
+        """Name of the first rule proving the position dead, None when the position may be solvable."""
+        self.checks += 1
+        for rule in self.rules:
+            if getattr(self, f"_{rule}_is_dead")(marble_counts, next_metal_to_clear):
+                self.cuts[rule] += 1
+                return rule
+        return None
+
+    @staticmethod
+    def _element_pairing_is_dead(marble_counts: dict[int, int], _next_metal_to_clear: int | None) -> bool:
+        salt = marble_counts.get(SALT, 0)
+        element_counts = [marble_counts.get(element, 0) for element in ELEMENTS]
+        odd_elements = sum(count & 1 for count in element_counts)
+        return (salt + sum(element_counts)) & 1 == 1 or odd_elements > salt
+
+    @staticmethod
+    def _mors_vitae_is_dead(marble_counts: dict[int, int], _next_metal_to_clear: int | None) -> bool:
+        return marble_counts.get(MORS, 0) != marble_counts.get(VITAE, 0)
+
+    @staticmethod
+    def _quicksilver_balance_is_dead(marble_counts: dict[int, int], _next_metal_to_clear: int | None) -> bool:
+        metals = sum(marble_counts.get(metal, 0) for metal in METALS if metal != GOLD)
+        return marble_counts.get(QUICKSILVER, 0) != metals
+
+    @staticmethod
+    def _metal_order_is_dead(marble_counts: dict[int, int], next_metal_to_clear: int | None) -> bool:
+        for metal in METALS:
+            count = marble_counts.get(metal, 0)
+            if count > 1 or (count and (next_metal_to_clear is None or metal < next_metal_to_clear)):
+                return True
+        return False
+
+    def _buried_metal_is_dead(self, marble_counts: dict[int, int], next_metal_to_clear: int | None) -> bool:
+        if next_metal_to_clear is None or next_metal_to_clear == GOLD \
+                or not marble_counts.get(next_metal_to_clear, 0):
+            return False  # nothing left to block gold, missing metal is the concern of metal_order
+        fields = self.board.fields
+        metal_indexes = []
+        quicksilver_indexes = []
+        candidates = []
+        for field in fields:
+            if field.marble is None:
+                continue
+            if field.marble == next_metal_to_clear:
+                metal_indexes.append(field.layout_index)
+            elif field.marble == QUICKSILVER:
+                quicksilver_indexes.append(field.layout_index)
+            elif field.marble not in METALS:
+                candidates.append(field.layout_index)
+        if any(fields[idx].free for idx in metal_indexes) and any(fields[idx].free for idx in quicksilver_indexes):
+            return False
+
+        cleared = [field.marble is None for field in fields]
+        neighbours = self.board.neighbour_indexes
+        free_pattern_table = SigmarField.free_pattern_table
+
+        def frees(layout_index: int) -> bool:
+            base = 6 * layout_index
+            return free_pattern_table[
+                cleared[neighbours[base]]
+                | cleared[neighbours[base + 1]] << 1
+                | cleared[neighbours[base + 2]] << 2
+                | cleared[neighbours[base + 3]] << 3
+                | cleared[neighbours[base + 4]] << 4
+                | cleared[neighbours[base + 5]] << 5
+            ]
+
+        while True:
+            if any(frees(idx) for idx in metal_indexes) and any(frees(idx) for idx in quicksilver_indexes):
+                return False
+            newly_free = [idx for idx in candidates if frees(idx)]
+            if not newly_free:
+                return True
+            for idx in newly_free:
+                cleared[idx] = True
+            candidates = [idx for idx in candidates if not cleared[idx]]
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"checks": self.checks, **{f"cut_{rule}": cuts for rule, cuts in self.cuts.items()}}
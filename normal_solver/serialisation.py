@@ -0,0 +1,174 @@
+"""
+Compact storage of board corpora - nibble-packed binary records of fixed size, read back lazily from a memory map.
+
+A board is stored as its text encoding (SmallSigmarBoard.text_encoding, one character per playable field,
+row-major), with every field packed into 4 bits - 14 marble kinds and the empty field fit in a nibble.
+Two fields share a byte, the first of them in the high nibble, so a record of the real board (91 fields) takes
+46 bytes.
+
+Corpus file layout:
+    magic (4 bytes) | number of rows (1 byte) | row sizes (1 byte each, edge fields included) | records
+
+Records follow the header back to back, so record `i` is found by offset alone and the reader never parses
+more of the file than it's asked for.
+"""
+import mmap
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.vectorised import EMPTY
+
+
+MAGIC = b"SGB1"
+# nibble -> marble, nibble 0 is the empty field
+NIBBLE_MARBLES: list[int | None] = [None] + sorted(
+    marble for marble in SmallSigmarBoard.sigmar_text_encoding if marble is not None
+)
+NIBBLE_CHARACTERS = "".join(SmallSigmarBoard.sigmar_text_encoding[marble] for marble in NIBBLE_MARBLES)
+# text encoding characters <-> hexadecimal digits of their nibbles, so that packing and unpacking is a str.translate
+# plus bytes.fromhex/bytes.hex, all done in C
+TO_HEX_DIGITS = str.maketrans({character: f"{nibble:x}" for nibble, character in enumerate(NIBBLE_CHARACTERS)})
+FROM_HEX_DIGITS = str.maketrans(
+    {f"{nibble:x}": character for nibble, character in enumerate(NIBBLE_CHARACTERS)} | {"f": "?"}
+)
+VALID_CHARACTERS = frozenset(NIBBLE_CHARACTERS)
+# nibble -> marble code of normal_solver.vectorised (EMPTY for the empty field), for all 16 nibble values - the one
+# that is not a marble decodes to CORRUPT_CODE, which marks the record as corrupt
+CORRUPT_CODE = EMPTY - 1
+NIBBLE_CODES = np.array(
+    [EMPTY if marble is None else marble for marble in NIBBLE_MARBLES] + [CORRUPT_CODE] * (16 - len(NIBBLE_MARBLES)),
+    dtype=np.int16
+)
+
+
+def record_size(field_count: int) -> int:
+    return (field_count + 1) // 2
+
+
+def pack_encoding(encoding: str) -> bytes:
+    """Nibble-pack a text encoding, odd-sized encodings are padded with an empty field."""
+    if not VALID_CHARACTERS.issuperset(encoding):
+        raise ValueError(f"Unknown marble characters {sorted(set(encoding) - VALID_CHARACTERS)} in the encoding")
+    if len(encoding) % 2:
+        encoding += NIBBLE_CHARACTERS[0]
+    return bytes.fromhex(encoding.translate(TO_HEX_DIGITS))
+
+
+def unpack_record(record: bytes, field_count: int) -> str:
+    """
+    Text encoding of a packed record of a board with `field_count` playable fields. The 16th nibble value is not
+    a marble, it comes out as "?", which boards refuse to load.
+    """
+    return record.hex()[:field_count].translate(FROM_HEX_DIGITS)
+
+
+def board_for_row_sizes(row_sizes) -> SmallSigmarBoard:
+    """Empty board with the given layout - the small test board, or a hexagonal board."""
+    row_sizes = list(row_sizes)
+    if row_sizes == SmallSigmarBoard.board_row_sizes:
+        return SmallSigmarBoard()
+    radius = len(row_sizes) // 2
+    if radius >= 3 and row_sizes == HexSigmarBoard.hex_row_sizes(radius):
+        return HexSigmarBoard(radius)
+    raise ValueError(f"No board with row sizes {row_sizes}")
+
+
+def write_corpus(path: str, row_sizes, encodings: Iterable[str]) -> int:
+    """
+    Write text encodings of boards (all of the layout with `row_sizes`) into a corpus file.
+    Returns the number of records written.
+    """
+    row_sizes = list(row_sizes)
+    field_count = sum(size - 2 for size in row_sizes[1:-1])
+    written = 0
+    with open(path, "wb") as corpus:
+        corpus.write(MAGIC + bytes([len(row_sizes)] + row_sizes))
+        for encoding in encodings:
+            if len(encoding) != field_count:
+                raise ValueError(f"Encoding holds {len(encoding)} fields, board has {field_count}")
+            corpus.write(pack_encoding(encoding))
+            written += 1
+    return written
+
+
+class CorpusReader:
+    """
+    Memory-mapped corpus file. Records are decoded only when accessed - by index, by iterating encodings
+    or boards, or in bulk as a NumPy array of marble codes (for normal_solver.vectorised).
+    """
+
+    def __init__(self, path: str):
+        self.__file = open(path, "rb")
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file can't be mapped
+            self.__file.close()
+            raise ValueError(f"{path} is not a board corpus") from None
+        if self.__map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a board corpus")
+        row_count = self.__map[len(MAGIC)]
+        self.header_size = len(MAGIC) + 1 + row_count
+        self.row_sizes = list(self.__map[len(MAGIC) + 1:self.header_size])
+        self.field_count = sum(size - 2 for size in self.row_sizes[1:-1])
+        self.record_size = record_size(self.field_count)
+
+    def __enter__(self) -> "CorpusReader":
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+    def close(self):
+        self.__map.close()
+        self.__file.close()
+
+    def __len__(self):
+        return (len(self.__map) - self.header_size) // self.record_size
+
+    def record(self, index: int) -> bytes:
+        if not 0 <= index < len(self):
+            raise IndexError(f"Record {index} out of range of {len(self)} records")
+        start = self.header_size + index * self.record_size
+        return self.__map[start:start + self.record_size]
+
+    def __getitem__(self, index: int) -> str:
+        return unpack_record(self.record(index), self.field_count)
+
+    def encodings(self, start: int = 0, stop: int | None = None) -> Iterator[str]:
+        for index in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield self[index]
+
+    def boards(self, board: SmallSigmarBoard | None = None, start: int = 0,
+               stop: int | None = None) -> Iterator[SmallSigmarBoard]:
+        """
+        Yield boards of the records one by one. When a board is passed, it is reloaded in place for every record
+        instead of building a new board each time - consume it before advancing the iterator.
+        """
+        for encoding in self.encodings(start, stop):
+            current = board if board is not None else board_for_row_sizes(self.row_sizes)
+            current.load_text_encoding(encoding)
+            yield current
+
+    def marble_codes(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """
+        (N, fields) array of SigmarMarble values of the records (EMPTY for empty fields), ready for
+        normal_solver.vectorised, unpacked straight from the mapped bytes. Raises ValueError when one of the records
+        holds a nibble that is not a marble.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        count = max(0, stop - start)
+        packed = np.frombuffer(
+            self.__map, dtype=np.uint8, count=count * self.record_size,
+            offset=self.header_size + start * self.record_size
+        ).reshape(count, self.record_size)
+        nibbles = np.empty((count, 2 * self.record_size), dtype=np.uint8)
+        nibbles[:, 0::2] = packed >> 4
+        nibbles[:, 1::2] = packed & 0xF
+        codes = NIBBLE_CODES[nibbles[:, :self.field_count]]
+        corrupt = np.flatnonzero((codes == CORRUPT_CODE).any(axis=1))
+        if len(corrupt):
+            raise ValueError(f"Record {start + corrupt[0]} is corrupt - it holds a nibble that is not a marble")
+        return codes
@@ -0,0 +1,296 @@
+"""
+Local solve service - newline-delimited JSON over TCP or a Unix socket, boards solved by a pool of worker processes.
+
+Every request line is a JSON object:
+    {"id": 1, "board": "<text encoding>", "radius": 6, "deadline": 2.5}
+
+- board: SmallSigmarBoard.text_encoding of the board to solve
+- radius: hex board radius (3 to SolveServer.MAX_RADIUS), the small test board if omitted or null
+- deadline: seconds the client is willing to wait, the server default if omitted or null (no limit by default)
+- id: anything, echoed back in the response to match responses to requests
+
+Responses are written one JSON line per request as soon as its solve ends, in completion order, not in request
+order - SolveResult.as_dict plus the id and "coalesced" (true if the result came from a solve started for another
+request). A request that can't be served gets {"id": ..., "error": "..."}, and so does a request line longer than
+SolveServer.MAX_REQUEST_BYTES (skipped up to its end).
+
+Identical boards requested while one of them is being solved share a single solve, as long as the running solve
+was started with a deadline at least as long as the one of the new request. Workers publish the deepest partial
+solution of their solves every PARTIAL_INTERVAL seconds, so that a request whose deadline passes before the shared
+solve ends still gets the best partial found so far. Solves run in the worker processes, the event loop only parses
+requests and writes responses, so it keeps serving clients during long solves.
+
+Usage:
+    python -m normal_solver.server --port 8765 --processes 4
+    python -m normal_solver.server --unix /tmp/sigmar.sock
+"""
+import asyncio
+import json
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from time import time
+
+from normal_solver.anytime import SolveResult
+from normal_solver.batch import make_board
+from normal_solver.board import HexSigmarBoard
+from normal_solver.instrumentation import SolveStats
+from normal_solver.solver import SmallSigmarGame
+
+
+# seconds between the updates of the partial solution of a solve, published for requests that time out before it ends
+PARTIAL_INTERVAL = 0.05
+
+# state of a pool worker, set up once by _init_worker
+_worker_state: dict = {}
+
+
+def _init_worker(partials):
+    # proxy of the manager dict is handed over once - a proxy passed with every solve would have to reconnect for
+    # each of them, and solves left in the queue of the pool at close would fail to unpickle it
+    _worker_state["partials"] = partials
+
+
+def _solve_encoding(radius: int | None, encoding: str, deadline: float | None) -> dict:
+    board = make_board(radius)
+    board.load_text_encoding(encoding)
+    game = SmallSigmarGame(board=board)
+    partials = _worker_state["partials"]
+    deepest = []
+
+    def publish_partial(_stats: SolveStats):
+        # winning strategy holds the moves leading to the node being searched
+        if len(game.winning_strategy) > len(deepest):
+            deepest[:] = game.winning_strategy
+            partials[(radius, encoding)] = list(deepest)
+
+    # deadline is wall-clock, the solve may have waited in the queue of the pool
+    time_budget = None if deadline is None else max(0.0, deadline - time())
+    return game.solve_anytime(time_budget, stats=SolveStats(publish_partial, PARTIAL_INTERVAL)).as_dict()
+
+
+class SolveServer:
+    """
+    Solve service for asyncio - serve it with `await server.start(...)`, stop with `await server.close()`.
+    :param processes: worker processes of the pool, all cores by default.
+    :param default_deadline: seconds, used for requests without a deadline of their own (None - no limit).
+    """
+    # largest board radius served - boards are checked on the event loop, a huge radius would stall every client
+    MAX_RADIUS = 2 * HexSigmarBoard.REAL_GAME_RADIUS
+    MAX_REQUEST_BYTES = 1 << 16
+
+    def __init__(self, processes: int | None = None, default_deadline: float | None = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.default_deadline = default_deadline
+        self.requests = 0
+        self.solves = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.__executor: ProcessPoolExecutor | None = None
+        self.__server: asyncio.AbstractServer | None = None
+        self.__manager = None
+        # (radius, encoding) -> deepest partial solution published by the workers solving the board
+        self.__partials = None
+        # (radius, encoding) -> (wall-clock deadline, future) of the solve in flight
+        self.__in_flight: dict[tuple[int | None, str], tuple[float | None, asyncio.Future]] = {}
+        self.__clients: set[asyncio.Task] = set()  # handlers of the connected clients
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests, "solves": self.solves, "coalesced": self.coalesced, "errors": self.errors,
+            "in_flight": len(self.__in_flight),
+        }
+
+    @property
+    def address(self):
+        """Address the server listens on - (host, port) for TCP, the path for a Unix socket."""
+        return self.__server.sockets[0].getsockname()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, unix_path: str | None = None):
+        """Start listening, on the Unix socket at `unix_path` if given, otherwise on TCP (any free port for 0)."""
+        self.__manager = Manager()
+        self.__partials = self.__manager.dict()
+        self.__executor = ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=(self.__partials,))
+        # forked workers start at the first submit - make it happen before any socket is open, so that they don't
+        # inherit client connections (and keep them open after the server closed them)
+        await asyncio.get_running_loop().run_in_executor(self.__executor, int)
+        limit = self.MAX_REQUEST_BYTES + 1  # newline included
+        if unix_path is not None:
+            self.__server = await asyncio.start_unix_server(self.__accept, unix_path, limit=limit)
+        else:
+            self.__server = await asyncio.start_server(self.__accept, host, port, limit=limit)
+
+    async def serve_forever(self):
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def close(self):
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        for client in self.__clients:
+            client.cancel()
+        await asyncio.gather(*self.__clients, return_exceptions=True)
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+        # callbacks of the cancelled solves run after close, there is no partial to forget once the manager is down
+        self.__in_flight.clear()
+        if self.__manager is not None:
+            self.__manager.shutdown()
+
+    def __solve(self, radius: int | None, encoding: str, deadline: float | None) -> tuple[asyncio.Future, bool]:
+        """Future of the solve result of the board, joining a solve in flight if it runs long enough."""
+        key = (radius, encoding)
+        in_flight = self.__in_flight.get(key)
+        if in_flight is not None:
+            solve_deadline, future = in_flight
+            if solve_deadline is None or (deadline is not None and deadline <= solve_deadline):
+                self.coalesced += 1
+                return future, True
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self.__executor, _solve_encoding, radius, encoding, deadline
+        )
+        self.solves += 1
+        self.__in_flight[key] = (deadline, future)
+
+        def forget(_future):
+            if not future.cancelled():
+                future.exception()  # all the waiters may have timed out, a failed solve is nobody's error then
+            if self.__in_flight.get(key, (None, None))[1] is future:
+                del self.__in_flight[key]
+                self.__partials.pop(key, None)
+        future.add_done_callback(forget)
+        return future, False
+
+    async def __serve_request(self, line: bytes) -> dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request has to be a JSON object")
+            request_id = request.get("id")
+            encoding, radius = request.get("board"), request.get("radius")
+            if not isinstance(encoding, str):
+                raise ValueError("Request has no board text encoding")
+            if radius is not None and (type(radius) is not int or not 3 <= radius <= self.MAX_RADIUS):
+                raise ValueError(f"Radius has to be an integer from 3 to {self.MAX_RADIUS}, got {radius!r}")
+            make_board(radius).load_text_encoding(encoding)  # reject bad boards here, not in a worker
+            time_budget = request.get("deadline")
+            if time_budget is None:
+                time_budget = self.default_deadline
+            deadline = time() + float(time_budget) if time_budget is not None else None
+        except (ValueError, TypeError) as error:
+            self.errors += 1
+            return {"id": request_id, "error": str(error)}
+
+        future, coalesced = self.__solve(radius, encoding, deadline)
+        try:
+            # a joined solve may run longer than this request is willing to wait
+            timeout = None if deadline is None else max(0.0, deadline - time())
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            best_partial = self.__partials.get((radius, encoding), [])
+            result = SolveResult(SolveResult.TIMEOUT, None, None, best_partial, 0, float(time_budget), None).as_dict()
+        except Exception as error:  # worker crashed, the pool is broken...
+            self.errors += 1
+            return {"id": request_id, "error": f"Solve failed: {error!r}"}
+        return {"id": request_id, **result, "coalesced": coalesced}
+
+    @staticmethod
+    async def __skip_line(reader: asyncio.StreamReader):
+        """Drop the rest of a request line over the limit, up to its newline (or the end of the stream)."""
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.LimitOverrunError as error:
+                await reader.readexactly(error.consumed)
+            except asyncio.IncompleteReadError:
+                return
+
+    def __accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Handle the client in a task of its own, for close to cancel. A coroutine passed to start_server directly
+        would be reported as failed by asyncio when it is cancelled.
+        """
+        client = asyncio.create_task(self.__handle_client(reader, writer))
+        self.__clients.add(client)
+        client.add_done_callback(self.__clients.discard)
+
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def respond(line: bytes):
+            response = await self.__serve_request(line)
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    line = error.partial  # last request without a newline, b"" at the end of the stream
+                except asyncio.LimitOverrunError:
+                    await self.__skip_line(reader)
+                    self.requests += 1
+                    self.errors += 1
+                    error = {"id": None, "error": f"Request line longer than {self.MAX_REQUEST_BYTES} bytes"}
+                    async with write_lock:
+                        writer.write(json.dumps(error).encode() + b"\n")
+                        await writer.drain()
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                self.requests += 1
+                task = asyncio.create_task(respond(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            for task in pending:
+                task.cancel()
+        except asyncio.CancelledError:
+            # server is shutting down - stop the requests of the client, and let the cancellation through
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            writer.close()
+
+
+async def _serve(args):
+    server = SolveServer(args.processes, args.default_deadline)
+    await server.start(args.host, args.port, args.unix)
+    print(f"Serving on {server.address}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(description="Serve board solves as newline-delimited JSON over a local socket.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket at this path instead of TCP")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("--default-deadline", type=float, default=None,
+                        help="seconds to stop solves of requests without a deadline after")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,92 @@
+import warnings
+from contextlib import nullcontext
 from enum import Enum
+from time import perf_counter
+from typing import Iterator
 from typing import Literal
-from itertools import combinations
 
+from normal_solver.anytime import CancellationToken, SearchLimits, SolveResult
+from normal_solver.bitboard import BitboardSearch
 from normal_solver.board import SigmarMarble, SigmarField, SmallSigmarBoard
+from normal_solver.instrumentation import SolveStats
+from normal_solver.move_index import EligibleMoveIndex, pairs_from_buckets, bucket_fields
+from normal_solver.move_ordering import MoveOrdering
+from normal_solver.pruning import InfeasibilityPruner
+from normal_solver.symmetry import board_symmetries, canonical_key, SolutionCache
+from normal_solver.transposition import ZobristHasher, TranspositionTable
+
+
+# version of solve results - bump when a change of the solver changes results or the format of winning strategies,
+# so that results persisted by older versions are not reused
+SOLVER_VERSION = 1
 
 
 class SmallSigmarGame:
-    """Untested class"""
+    """
+    Game of Sigmar's Garden played on a board - marble counts, the next metal to clear and the position hash are
+    kept up to date by apply_move/undo_move, and solve searches for a sequence of moves clearing the board.
+    """
     allowed_marble_value_combinations = {
         (0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 1), (2, 2), (3, 3), (4, 4),
         (16, 32), (17, 32), (18, 32), (19, 32), (20, 32), (64, 65)
     }
     base_marbles = {0, 1, 2, 3, 4}
     QUICKSILVER = SigmarMarble.quicksilver.value
-    MINIMAL_METAL_ELEMENT_VALUE = SigmarMarble.copper.value
+    MINIMAL_METAL_ELEMENT_VALUE = SigmarMarble.lead.value
     MAXIMAL_METAL_ELEMENT_VALUE = SigmarMarble.gold.value
+    # dense alphabet of marbles - marble values map to 0..13, in the order of the enum
+    dense_marble_codes: dict[int, int] = {marble.value: code for code, marble in enumerate(SigmarMarble)}
+    UNKNOWN_MARBLE_CODE = len(SigmarMarble)
+    # search engines of solve - the SigmarField graph, or bitboards (normal_solver.bitboard)
+    ENGINES = ("fields", "bitboard")
+    # next metal to clear -> legality table, see legality_table
+    __legality_tables: dict[int | None, list[list[bool]]] = {}
+    # row sizes -> Zobrist hasher and symmetric keys of the board shape, see __shape_keys
+    __shape_key_cache: dict[tuple[int, ...], tuple[ZobristHasher, list[dict[int, dict[int, int]]]]] = {}
 
-    def __init__(self):
-        self.board = SmallSigmarBoard()
-        self.board.lay_down_marbles_in_wavefront()
+    def __init__(self, transposition_table: TranspositionTable | None = None, board: SmallSigmarBoard | None = None,
+                 pruner: InfeasibilityPruner | None = None):
+        self.board = board if board is not None else SmallSigmarBoard()
+        if not self.board.initialized_to_play:
+            self.board.lay_down_marbles_in_wavefront()
+        self.symmetries = board_symmetries([len(row) for row in self.board.layout])
+        self.hasher, self.symmetric_keys = self.__shape_keys(self.board)
+        self.move_index = EligibleMoveIndex(self.board)
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.pruner = pruner if pruner is not None else InfeasibilityPruner(self.board)
         self.eligible_fields: list[SigmarField] | None = None
-        self.eligible_moves: list[tuple[SigmarField, SigmarField]] | None = None
+        self.eligible_moves: list[tuple[SigmarField, ...]] | None = None
         self.next_metal_to_clear: int = SigmarMarble.lead.value
         self.winning_strategy: list[list] | None = None
+        self.solvable: bool | None = None
+        self.marble_counts: dict[int, int] = {}
+        self.nodes_searched = 0
+        self.stats: SolveStats | None = None
+        self.__active_stats: SolveStats | None = None  # stats of the running solve, counted into by the search
+        self.__limits: SearchLimits | None = None
+        self.__ordering: MoveOrdering | None = None
+        self.position_hashes: list[int] = [0] * len(self.symmetries)
+
+    @classmethod
+    def __shape_keys(cls, board: SmallSigmarBoard) -> tuple[ZobristHasher, list[dict[int, dict[int, int]]]]:
+        """
+        Zobrist hasher of the board shape, and per symmetry: layout index -> Zobrist keys of the field it is mapped
+        to, so that a hash of every symmetric copy of the position can be updated along with the position itself.
+        Keys depend on the shape only, so they are drawn once and shared (read only) by all the games of the shape.
+        """
+        row_sizes = tuple(len(row) for row in board.layout)
+        if row_sizes not in cls.__shape_key_cache:
+            playable_fields = [field for row in board.layout[1:-1] for field in row[1:-1]]
+            hasher = ZobristHasher(playable_fields)
+            symmetric_keys = [
+                {
+                    field.layout_index: hasher.field_keys[transform.coords[transform.permutation[number]]]
+                    for number, field in enumerate(playable_fields)
+                }
+                for transform in board_symmetries(list(row_sizes))
+            ]
+            cls.__shape_key_cache[row_sizes] = hasher, symmetric_keys
+        return cls.__shape_key_cache[row_sizes]
 
     @staticmethod
     def __convert_to_int(marble: Enum | SigmarMarble | int) -> int:
@@ -64,14 +128,12 @@ class SmallSigmarGame:
                     self.eligible_fields.append(field)
 
     def set_eligible_moves(self):
-        self.eligible_moves = []
-        if len(self.eligible_fields) > 0:
-            f = [f for f in self.eligible_fields if f.marble != SigmarMarble.gold.value]
-            pairs_to_check = combinations(f, 2)
-            pair: tuple[SigmarField, SigmarField]
-            for pair in pairs_to_check:
-                if self.test_eligible_move(pair[0].marble, pair[1].marble):
-                    self.eligible_moves.append(pair)
+        """
+        Pair up eligible fields into legal moves. Fields are bucketed by marble type and only compatible buckets
+        are paired, instead of testing every combination of two free marbles. Gold, which is cleared
+        alone once it is the next metal to clear, comes as a single-field move.
+        """
+        self.eligible_moves = pairs_from_buckets(bucket_fields(self.eligible_fields), self.next_metal_to_clear)
 
     def test_eligible_move(self, marble_1, marble_2) -> bool:
         """
@@ -93,46 +155,417 @@ class SmallSigmarGame:
         :param marble_2: Marble type from field on the board
         :return: True if match is possible, otherwise False.
         """
-        marble_type_1 = self.__convert_to_int(marble_1)
-        marble_type_2 = self.__convert_to_int(marble_2)
-
-        # allowed combinations
-        if (tuple([marble_type_1, marble_type_2]) in self.allowed_marble_value_combinations) \
-            or (tuple([marble_type_2, marble_type_1]) in self.allowed_marble_value_combinations):
-            if marble_type_1 in self.base_marbles:  # base element or salt
-                if marble_type_1 != 0:
-                    return (marble_type_2 == marble_type_1) or (marble_type_2 == 0)
-                return marble_type_2 in self.base_marbles
-            elif marble_type_2 in self.base_marbles:
-                if marble_type_2 != 0:
-                    return (marble_type_1 == marble_type_2) or (marble_type_1 == 0)
-                return marble_type_1 in self.base_marbles
-            if marble_type_1 == self.QUICKSILVER:  # metal/quicksilver
-                if marble_type_2 == self.next_metal_to_clear:
-                    return True
+        # anything but int or Enum is rejected by __convert_to_int before it is looked up (a float equal
+        # to a marble value, or an unhashable value, would otherwise slip through the dict or raise TypeError)
+        dense_codes = self.dense_marble_codes
+        if not isinstance(marble_1, int):
+            marble_1 = self.__convert_to_int(marble_1)
+        if not isinstance(marble_2, int):
+            marble_2 = self.__convert_to_int(marble_2)
+        code_1 = dense_codes.get(marble_1, self.UNKNOWN_MARBLE_CODE)
+        code_2 = dense_codes.get(marble_2, self.UNKNOWN_MARBLE_CODE)
+        return self.legality_table(self.next_metal_to_clear)[code_1][code_2]
+
+    @classmethod
+    def __pair_is_legal(cls, marble_type_1: int, marble_type_2: int, next_metal_to_clear: int | None) -> bool:
+        """Matching rules of test_eligible_move for marble values, used to fill the legality tables."""
+        if marble_type_1 in cls.base_marbles and marble_type_2 in cls.base_marbles:
+            return marble_type_1 == marble_type_2 or 0 in (marble_type_1, marble_type_2)
+        if (marble_type_1, marble_type_2) in cls.allowed_marble_value_combinations \
+                or (marble_type_2, marble_type_1) in cls.allowed_marble_value_combinations:
+            if cls.QUICKSILVER in (marble_type_1, marble_type_2):
+                return next_metal_to_clear in (marble_type_1, marble_type_2)
+            return True  # mors and vitae
+        return False
+
+    @classmethod
+    def legality_table(cls, next_metal_to_clear: int | None) -> list[list[bool]]:
+        """
+        2D table of legal pairs for the next metal to clear, indexed by dense marble codes (dense_marble_codes,
+        with UNKNOWN_MARBLE_CODE for values that are no marble at all). Built once per metal state.
+        """
+        table = cls.__legality_tables.get(next_metal_to_clear)
+        if table is None:
+            marble_values = [marble.value for marble in SigmarMarble] + [None]
+            table = [
+                [
+                    marble_1 is not None and marble_2 is not None
+                    and cls.__pair_is_legal(marble_1, marble_2, next_metal_to_clear)
+                    for marble_2 in marble_values
+                ]
+                for marble_1 in marble_values
+            ]
+            cls.__legality_tables[next_metal_to_clear] = table
+        return table
+
+    def __is_metal(self, marble: int | None) -> bool:
+        return marble is not None and self.MINIMAL_METAL_ELEMENT_VALUE <= marble <= self.MAXIMAL_METAL_ELEMENT_VALUE
+
+    def __skip_absent_metals(self) -> int:
+        """
+        Move next metal to clear past the metals that are not present on the board (small board does not
+        hold the full set of metals). Returns number of increments made, so they can be rewound.
+        """
+        increments = 0
+        previous_metal = self.next_metal_to_clear
+        while self.next_metal_to_clear is not None and self.marble_counts.get(self.next_metal_to_clear, 0) == 0:
+            self.__increment_metal_to_clear()
+            increments += 1
+        if increments:
+            self.__toggle_metal_hash(previous_metal)
+            self.__toggle_metal_hash(self.next_metal_to_clear)
+        return increments
+
+    def __toggle_marble_hash(self, field: SigmarField, marble: int):
+        """Add or remove (XOR is its own inverse) the marble on the field in hashes of all symmetric positions."""
+        layout_index = field.layout_index
+        hashes = self.position_hashes
+        for symmetry_idx, keys in enumerate(self.symmetric_keys):
+            hashes[symmetry_idx] ^= keys[layout_index][marble]
+
+    def __toggle_metal_hash(self, metal: int | None):
+        key = self.hasher.metal_keys[metal]
+        self.position_hashes = [position_hash ^ key for position_hash in self.position_hashes]
+
+    @property
+    def position_hash(self) -> int:
+        """Zobrist hash of the position as it lies on the board."""
+        return self.position_hashes[0]
+
+    @property
+    def canonical_hash(self) -> int:
+        """Smallest hash among all symmetric copies of the position - equal for all of them."""
+        return min(self.position_hashes)
+
+    def count_marbles(self):
+        """
+        Count marbles of each type left on the board, move the next metal to clear past the metals missing from
+        the board, hash the position and index free marbles. All of them are kept up to date by
+        apply_move/undo_move afterward.
+        """
+        self.marble_counts = {}
+        fields = [field for row in self.board.layout[1:-1] for field in row[1:-1]]
+        for field in fields:
+            if field.marble is not None:
+                self.marble_counts[field.marble] = self.marble_counts.get(field.marble, 0) + 1
+        self.__skip_absent_metals()
+        self.position_hashes = [self.hasher.metal_keys[self.next_metal_to_clear]] * len(self.symmetries)
+        for field in fields:
+            if field.marble is not None:
+                self.__toggle_marble_hash(field, field.marble)
+        self.move_index.rebuild()
+
+    def apply_move(self, move: tuple[SigmarField, ...]) -> tuple[list[int], int]:
+        """
+        Take the marbles of the move off the board, in place. Free status is recalculated only for the cleared
+        fields and their neighbours, using the compiled layout of the board. Returns removed marbles and
+        the number of metal increments, which are required by undo_move to restore the position.
+        """
+        marbles = [field.marble for field in move]
+        stats = self.__active_stats
+        if stats is not None:
+            stats.count_move()
+        for field in move:
+            self.marble_counts[field.marble] -= 1
+            self.__toggle_marble_hash(field, field.marble)
+            self.__set_field(field.layout_index, None, stats)
+        metal_increments = 0
+        if any(self.__is_metal(marble) for marble in marbles):
+            self.__toggle_metal_hash(self.next_metal_to_clear)
+            self.__increment_metal_to_clear()
+            self.__toggle_metal_hash(self.next_metal_to_clear)
+            metal_increments = 1 + self.__skip_absent_metals()
+        return marbles, metal_increments
+
+    def undo_move(self, move: tuple[SigmarField, ...], undo_info: tuple[list[int], int]):
+        """Put back marbles taken off by apply_move, rewinding the next metal to clear as well."""
+        marbles, metal_increments = undo_info
+        stats = self.__active_stats
+        if stats is not None:
+            stats.count_undo()
+        if metal_increments:
+            self.__toggle_metal_hash(self.next_metal_to_clear)
+            for _ in range(metal_increments):
+                self.__decrement_metal_to_clear()
+            self.__toggle_metal_hash(self.next_metal_to_clear)
+        for field, marble in zip(reversed(move), reversed(marbles)):
+            self.__set_field(field.layout_index, marble, stats)
+            self.marble_counts[marble] += 1
+            self.__toggle_marble_hash(field, marble)
+
+    def __set_field(self, layout_index: int, marble: int | None, stats: SolveStats | None):
+        """Set the marble of the field (None clears it), updating free status and the move index around it."""
+        if stats is None:
+            self.board.set_field_marble(layout_index, marble)
+            self.move_index.update_around(layout_index)
+            return
+        started = perf_counter()
+        self.board.set_field_marble(layout_index, marble)
+        free_status_done = perf_counter()
+        self.move_index.update_around(layout_index)
+        stats.timers["free_status"] += free_status_done - started
+        stats.timers["move_generation"] += perf_counter() - free_status_done
+
+    @property
+    def remaining_marbles(self) -> int:
+        return sum(self.marble_counts.values())
+
+    def __search(self) -> bool:
+        """
+        Depth-first search with in place apply/undo. Board is restored to the node position on return.
+        Positions proven dead are recorded in the transposition table under their canonical hash, so other move
+        orders reaching them, or any of their symmetric copies, are cut off immediately. Positions failing
+        a necessary condition of the pruner are cut off without expanding them, the root included.
+
+        Under search limits (solve_anytime) a position is recorded as dead only if its whole subtree was searched -
+        neither cut by the discrepancy limit nor abandoned when the solve was stopped.
+        """
+        if self.remaining_marbles == 0:
+            return True
+        if self.transposition_table.is_dead(self.canonical_hash):
+            return False
+        stats = self.__active_stats
+        if stats is None:
+            if self.pruner.dead_rule(self.marble_counts, self.next_metal_to_clear) is not None:
                 return False
-            elif marble_type_2 == self.QUICKSILVER:
-                if marble_type_1 == self.next_metal_to_clear:
-                    return True
+            moves = self.move_index.eligible_moves(self.next_metal_to_clear)
+        else:
+            started = perf_counter()
+            dead = self.pruner.dead_rule(self.marble_counts, self.next_metal_to_clear) is not None
+            pruning_done = perf_counter()
+            stats.timers["pruning"] += pruning_done - started
+            if dead:
+                stats.pruned += 1
+                return False
+            moves = self.move_index.eligible_moves(self.next_metal_to_clear)
+            stats.timers["move_generation"] += perf_counter() - pruning_done
+        limits = self.__limits
+        if self.__ordering is not None:
+            moves = self.__ordering.order(moves, self.marble_counts)
+        legal_moves = len(moves)
+        if limits is not None:
+            if limits.stops(self.winning_strategy):
                 return False
-            if marble_type_1 == 64:
-                return marble_type_2 == 65
-            elif marble_type_2 == 64:  # vitae/mors
-                return marble_type_1 == 65
+            cutoffs = limits.cutoffs
+            moves = limits.allowed_moves(moves)
+        self.nodes_searched += 1
+        if stats is not None:
+            stats.count_node(legal_moves)
+        for move_number, move in enumerate(moves):
+            undo_info = self.apply_move(move)
+            self.winning_strategy.append([(field.row_index, field.field_index) for field in move])
+            if limits is not None:
+                limits.discrepancies += move_number > 0
+                solved = self.__search()
+                limits.discrepancies -= move_number > 0
+            else:
+                solved = self.__search()
+            self.undo_move(move, undo_info)
+            if solved:
+                return True
+            self.winning_strategy.pop()
+            if limits is not None and limits.stop_reason is not None:
+                return False
+        if limits is None or limits.cutoffs == cutoffs:
+            self.transposition_table.mark_dead(self.canonical_hash, self.remaining_marbles)
         return False
 
-    def solve(self, moves_for_victory=9):
+    def solve(self, solution_cache: SolutionCache | None = None, stats: SolveStats | None = None,
+              move_ordering: tuple[str, ...] = (),
+              engine: Literal["fields", "bitboard"] = "fields",
+              moves_for_victory: int | None = None) -> list[list] | None:
+        """
+        Search for a sequence of moves that clears the whole board.
+
+        Each move in the winning strategy is a list of (row_index, field_index) coordinates of the fields that
+        are cleared - two fields for a regular pair, single field for the gold marble.
+        :param solution_cache: cache of results keyed by the canonical encoding of the position (SolutionCache,
+            or PersistentSolutionCache to keep them on disk). Moves are stored in the canonical frame and mapped
+            back to this board through the inverse transform.
+        :param stats: collect statistics of the solve into this object, kept in self.stats afterward.
+        :param move_ordering: MoveOrdering policies to try the moves of every node in, generator order if empty.
+        :param engine: "fields" to search on the board itself, "bitboard" to search a bitboard copy of it
+            (BitboardSearch) - same search and the same transposition table, cheaper nodes, no stats nor move ordering.
+        :param moves_for_victory: deprecated and ignored - the search runs until the board is cleared, however
+            many moves it takes. Accepted as the first positional argument as well, as in the old signature.
+        :return: winning strategy, or None when the board is unsolvable (self.solvable is set accordingly).
+        """
+        if not self.board.initialized_to_play:
+            raise RuntimeError("Board not initialized")
+        if isinstance(solution_cache, int):
+            solution_cache, moves_for_victory = None, solution_cache
+        if moves_for_victory is not None:
+            warnings.warn(
+                "moves_for_victory is deprecated and ignored, solve searches until the board is cleared",
+                DeprecationWarning, stacklevel=2
+            )
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, choose one of: {', '.join(self.ENGINES)}")
+        if engine == "bitboard" and (stats is not None or move_ordering):
+            raise ValueError("Stats and move ordering are supported by the fields engine only")
+
+        self.count_marbles()
+        self.winning_strategy = []
+        self.nodes_searched = 0
+        self.stats = stats
+        cached = None
+        if solution_cache is not None:
+            cache_key, transform = canonical_key(self.board, self.next_metal_to_clear)
+            cached = solution_cache.get(cache_key)
+        if cached is not None:
+            self.solvable, canonical_moves = cached
+            if self.solvable:
+                self.winning_strategy = transform.inverse().map_moves(canonical_moves)
+            if stats is not None:
+                stats.solution_cache_hit = True
+        else:
+            if engine == "bitboard":
+                search = BitboardSearch(self.board, self.transposition_table)
+                self.winning_strategy = search.solve()
+                self.solvable = self.winning_strategy is not None
+                self.nodes_searched = search.nodes
+            else:
+                self.__ordering = MoveOrdering(self.board, move_ordering) if move_ordering else None
+                self.__active_stats = stats
+                try:
+                    with stats.attached(self) if stats is not None else nullcontext():
+                        self.solvable = self.__search()
+                finally:
+                    self.__ordering = None
+                    self.__active_stats = None
+            if solution_cache is not None:
+                canonical_moves = transform.map_moves(self.winning_strategy) if self.solvable else None
+                solution_cache.put(cache_key, self.solvable, canonical_moves)
+        if not self.solvable:
+            self.winning_strategy = None
+        # leave eligible fields/moves describing the starting position, not the last searched one
+        self.set_eligible_fields()
+        self.set_eligible_moves()
+        return self.winning_strategy
+
+    def solve_anytime(self, time_budget: float | None = None, cancellation_token: CancellationToken | None = None,
+                      discrepancy_limits: tuple[int, ...] = (0,), move_ordering: tuple[str, ...] = (),
+                      stats: SolveStats | None = None) -> SolveResult:
+        """
+        Search within a wall-clock budget (seconds), stopping early when the cancellation token is cancelled.
+
+        Search is iteratively deepened by discrepancies (see normal_solver.anytime) - an iteration for each of
+        `discrepancy_limits`, followed by the complete search, until a winning strategy is found or an iteration
+        ends without hitting its limit. Dead positions proven by earlier iterations stay in the transposition
+        table, so later iterations skip them. Whenever the solve ends, the result holds the deepest sequence
+        of moves cleared so far.
+
+        By default only the greedy dive (limit 0) precedes the complete search - move ordering of the solver
+        leaves little for the limited iterations to find, on full boards they cost more nodes than they save.
+        Discrepancies count from the first move of the `move_ordering` policies (see solve). Statistics are
+        collected over all the iterations into `stats`, kept in self.stats afterward.
+        """
         if not self.board.initialized_to_play:
             raise RuntimeError("Board not initialized")
 
+        started = perf_counter()
+        self.count_marbles()
         self.winning_strategy = []
-        i = 0
-        while not (len(self.winning_strategy) == moves_for_victory) or (i > 140):
-            self.set_eligible_fields()
-            self.set_eligible_moves()
+        self.nodes_searched = 0
+        self.__limits = limits = SearchLimits(
+            started + time_budget if time_budget is not None else None, cancellation_token
+        )
+        self.__ordering = MoveOrdering(self.board, move_ordering) if move_ordering else None
+        self.stats = self.__active_stats = stats
+        try:
+            with stats.attached(self) if stats is not None else nullcontext():
+                for discrepancy_limit in [*sorted(discrepancy_limits), None]:
+                    limits.discrepancy_limit = discrepancy_limit
+                    limits.cutoffs = 0
+                    self.solvable = self.__search()
+                    if self.solvable or limits.stop_reason is not None or not limits.cutoffs:
+                        break
+        finally:
+            self.__limits = None
+            self.__ordering = None
+            self.__active_stats = None
+
+        if self.solvable:
+            limits.best_partial = list(self.winning_strategy)
+        else:
+            self.winning_strategy = None
+            if limits.stop_reason is not None:
+                self.solvable = None
+        self.set_eligible_fields()
+        self.set_eligible_moves()
+        return SolveResult(
+            limits.stop_reason or SolveResult.COMPLETE, self.solvable, self.winning_strategy, limits.best_partial,
+            self.nodes_searched, perf_counter() - started, limits.discrepancy_limit
+        )
+
+    def iter_solutions(self) -> Iterator[list[list]]:
+        """
+        Lazily yield every winning strategy of the board (the same move lists as solve returns), in the search
+        order. Consumer can stop at any time - closing the generator puts the board back to the starting position.
+        """
+        if not self.board.initialized_to_play:
+            raise RuntimeError("Board not initialized")
+
+        self.count_marbles()
+        self.winning_strategy = []
+        self.nodes_searched = 0
+        yield from self.__enumerate()
+
+    def __enumerate(self) -> Iterator[list[list]]:
+        """Like __search, but goes on after a win. Positions are dead when their whole subtree held no win."""
+        if self.remaining_marbles == 0:
+            yield list(self.winning_strategy)
+            return
+        if self.transposition_table.is_dead(self.canonical_hash):
+            return
+        if self.pruner.dead_rule(self.marble_counts, self.next_metal_to_clear) is not None:
+            return
+        self.nodes_searched += 1
+        won = False
+        for move in self.move_index.eligible_moves(self.next_metal_to_clear):
+            undo_info = self.apply_move(move)
+            self.winning_strategy.append([(field.row_index, field.field_index) for field in move])
+            try:
+                for solution in self.__enumerate():
+                    won = True
+                    yield solution
+            finally:
+                self.winning_strategy.pop()
+                self.undo_move(move, undo_info)
+        if not won:
+            self.transposition_table.mark_dead(self.canonical_hash, self.remaining_marbles)
+
+    def count_solutions(self) -> int:
+        """
+        Count the winning strategies of the board without enumerating them - number of wins from a position is
+        memoised under its canonical hash (symmetric positions have as many wins), so every position reached
+        by different move orders is searched once.
+        """
+        if not self.board.initialized_to_play:
+            raise RuntimeError("Board not initialized")
+
+        self.count_marbles()
+        self.nodes_searched = 0
+        return self.__count({})
 
-            i += 1
-            break
+    def __count(self, solution_counts: dict[int, int]) -> int:
+        if self.remaining_marbles == 0:
+            return 1
+        position_hash = self.canonical_hash
+        if position_hash in solution_counts:
+            return solution_counts[position_hash]
+        count = 0
+        if not self.transposition_table.is_dead(position_hash) \
+                and self.pruner.dead_rule(self.marble_counts, self.next_metal_to_clear) is None:
+            self.nodes_searched += 1
+            for move in self.move_index.eligible_moves(self.next_metal_to_clear):
+                undo_info = self.apply_move(move)
+                count += self.__count(solution_counts)
+                self.undo_move(move, undo_info)
+            if not count:
+                self.transposition_table.mark_dead(position_hash, self.remaining_marbles)
+        solution_counts[position_hash] = count
+        return count
 
 
 if __name__ == '__main__':
@@ -147,5 +580,6 @@ if __name__ == '__main__':
         print(proper_field)
     print("proper moves:")
     for proper_move in sigmar_game_smol.eligible_moves:
-        print("Field 1:", str(proper_move[0]))
-        print("Field 2:", str(proper_move[1]))
+        for field_number, proper_field in enumerate(proper_move, start=1):
+            print(f"Field {field_number}:", str(proper_field))
+    print("winning strategy:", sigmar_game_smol.winning_strategy)
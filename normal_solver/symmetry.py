@@ -0,0 +1,158 @@
+"""
+Symmetries of the hexagonal boards and canonical board encodings for solver caches.
+
+A regular hexagon has 12 symmetries - six rotations, each of them with or without a reflection. Every one of them
+maps a position to an equivalent one (same solvability, moves mapped field by field). The small test board is not
+a regular hexagon, so only the transforms mapping its playable fields onto themselves are used for it.
+
+Fields are numbered as in SmallSigmarBoard.text_encoding (playable fields, row-major). A transform is
+a permutation of these field numbers - field `i` of a position lands on field `permutation[i]`.
+"""
+from collections import OrderedDict
+
+from normal_solver.board import SmallSigmarBoard
+
+
+class BoardTransform:
+    """Single symmetry of a board shape, mapping encodings, field coordinates and move lists."""
+
+    def __init__(self, name: str, permutation: list[int], coords: list[tuple[int, int]]):
+        self.name = name
+        self.permutation = permutation
+        self.coords = coords
+        self.__field_numbers = {field_coords: number for number, field_coords in enumerate(coords)}
+
+    def __repr__(self):
+        return f"BoardTransform({self.name!r})"
+
+    def inverse(self) -> "BoardTransform":
+        inverse_permutation = [0] * len(self.permutation)
+        for source, target in enumerate(self.permutation):
+            inverse_permutation[target] = source
+        return BoardTransform(f"inverse of {self.name}", inverse_permutation, self.coords)
+
+    def apply_to_encoding(self, encoding: str) -> str:
+        transformed = [""] * len(encoding)
+        for source, target in enumerate(self.permutation):
+            transformed[target] = encoding[source]
+        return "".join(transformed)
+
+    def map_coords(self, field_coords: tuple[int, int]) -> tuple[int, int]:
+        return self.coords[self.permutation[self.__field_numbers[tuple(field_coords)]]]
+
+    def map_moves(self, moves: list[list[tuple[int, int]]]) -> list[list[tuple[int, int]]]:
+        """Map a move list (like SmallSigmarGame.winning_strategy) field by field."""
+        return [[self.map_coords(field_coords) for field_coords in move] for move in moves]
+
+
+_symmetries_cache: dict[tuple[int, ...], list[BoardTransform]] = {}
+
+
+def board_symmetries(row_sizes) -> list[BoardTransform]:
+    """
+    All the symmetries of the board shape (identity first), found by rotating and reflecting cube coordinates
+    of the playable fields around the middle field and keeping transforms that land on the board.
+    Computed once per board shape.
+    """
+    row_sizes = tuple(row_sizes)
+    if row_sizes in _symmetries_cache:
+        return _symmetries_cache[row_sizes]
+    middle_row = len(row_sizes) // 2
+    middle_column = row_sizes[middle_row] // 2
+    last_row = len(row_sizes) - 1
+    coords = [
+        (row_idx, field_idx)
+        for row_idx, size in enumerate(row_sizes) if 0 < row_idx < last_row
+        for field_idx in range(1, size - 1)
+    ]
+    field_numbers = {field_coords: number for number, field_coords in enumerate(coords)}
+
+    def to_cube(row_idx: int, field_idx: int) -> tuple[int, int, int]:
+        q = field_idx + max(0, middle_row - row_idx) - middle_column
+        r = row_idx - middle_row
+        return q, r, -q - r
+
+    def from_cube(q: int, r: int, _s: int) -> tuple[int, int]:
+        row_idx = r + middle_row
+        return row_idx, q + middle_column - max(0, middle_row - row_idx)
+
+    symmetries = []
+    for reflected in (False, True):
+        for rotation in range(6):
+            permutation = []
+            for field_coords in coords:
+                q, r, s = to_cube(*field_coords)
+                if reflected:
+                    r, s = s, r
+                for _ in range(rotation):
+                    q, r, s = -r, -s, -q
+                target = field_numbers.get(from_cube(q, r, s))
+                if target is None:
+                    break
+                permutation.append(target)
+            else:
+                name = f"{'reflect, ' if reflected else ''}rotate {60 * rotation}"
+                symmetries.append(BoardTransform(name, permutation, coords))
+    _symmetries_cache[row_sizes] = symmetries
+    return symmetries
+
+
+def canonicalise(board: SmallSigmarBoard) -> tuple[str, BoardTransform]:
+    """
+    Return the lexicographically smallest text encoding of the position among all board symmetries, together
+    with the transform taking this board to it.
+    """
+    encoding = board.text_encoding()
+    symmetries = board_symmetries([len(row) for row in board.layout])
+    return min(((transform.apply_to_encoding(encoding), transform) for transform in symmetries),
+               key=lambda candidate: candidate[0])
+
+
+def canonical_key(board: SmallSigmarBoard, next_metal_to_clear: int | None) -> tuple[str, BoardTransform]:
+    """Cache key of the position - canonical encoding and the next metal to clear, with the transform used."""
+    encoding, transform = canonicalise(board)
+    return f"{encoding}:{next_metal_to_clear}", transform
+
+
+class SolutionCache:
+    """
+    In-memory cache of solve results keyed by canonical_key. Move lists are kept in the canonical frame,
+    so one entry serves every symmetric copy of the position - callers map them back through the inverse
+    of their transform.
+
+    Cache keeps at most `max_entries` results, evicting the least recently used one when full - long-lived
+    processes (batch workers, the solve server) keep it for their whole life. Every entry costs at most roughly
+    ENTRY_SIZE_ESTIMATE bytes, `with_memory_limit` sizes the cache from a memory budget instead.
+    """
+    ENTRY_SIZE_ESTIMATE = 4096  # bytes per entry holding a full solution of the real board, measured with tracemalloc
+
+    def __init__(self, max_entries: int = 10_000):
+        if max_entries < 1:
+            raise ValueError(f"Solution cache needs to hold at least one entry, {max_entries=}")
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[bool, list | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def with_memory_limit(cls, max_megabytes: float) -> "SolutionCache":
+        return cls(max(1, int(max_megabytes * 1024 * 1024 / cls.ENTRY_SIZE_ESTIMATE)))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key: str) -> tuple[bool, list | None] | None:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, solvable: bool, moves: list | None):
+        self.entries[key] = (solvable, moves)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
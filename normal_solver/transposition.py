@@ -0,0 +1,143 @@
+from collections import OrderedDict
+from ctypes import c_uint64
+from multiprocessing.sharedctypes import RawArray
+from random import Random
+
+from normal_solver.board import SigmarMarble, SigmarField
+
+
+class ZobristHasher:
+    """
+    Random 64-bit keys for each (field, marble) combination and for each state of the next metal to clear.
+
+    Hash of a position is the XOR of keys of all marbles laid on the board and the key of the next metal to clear,
+    so taking a marble off (or putting it back) changes the hash by a single XOR.
+    Keys are drawn from a private, seeded RNG - the global `random` state is left untouched.
+    """
+    metal_states = [
+        SigmarMarble.lead.value, SigmarMarble.tin.value, SigmarMarble.iron.value,
+        SigmarMarble.copper.value, SigmarMarble.silver.value, SigmarMarble.gold.value, None
+    ]
+
+    def __init__(self, fields: list[SigmarField], key_seed: int = 0x5167AA):
+        rng = Random(key_seed)
+        self.field_keys: dict[tuple[int, int], dict[int, int]] = {
+            (field.row_index, field.field_index): {marble.value: rng.getrandbits(64) for marble in SigmarMarble}
+            for field in fields
+        }
+        self.metal_keys: dict[int | None, int] = {metal: rng.getrandbits(64) for metal in self.metal_states}
+
+    def marble_key(self, field: SigmarField, marble: int) -> int:
+        return self.field_keys[(field.row_index, field.field_index)][marble]
+
+    def hash_position(self, fields: list[SigmarField], next_metal_to_clear: int | None) -> int:
+        """Calculate the hash from scratch, incremental updates should always agree with this."""
+        position_hash = self.metal_keys[next_metal_to_clear]
+        for field in fields:
+            if field.marble is not None:
+                position_hash ^= self.marble_key(field, field.marble)
+        return position_hash
+
+
+class TranspositionTable:
+    """
+    Bounded store of positions already proven dead (that can't be cleared no matter the move order).
+
+    Table keeps at most `max_entries` position hashes, evicting the least recently used one when full. Every entry
+    costs roughly ENTRY_SIZE_ESTIMATE bytes, `with_memory_limit` sizes the table from a memory budget instead.
+    """
+    ENTRY_SIZE_ESTIMATE = 144  # bytes per entry (OrderedDict node + 64-bit int key), measured with tracemalloc
+
+    def __init__(self, max_entries: int = 1_000_000):
+        if max_entries < 1:
+            raise ValueError(f"Transposition table needs to hold at least one entry, {max_entries=}")
+        self.max_entries = max_entries
+        self.entries: OrderedDict[int, int] = OrderedDict()  # position hash -> marbles left on the board
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def with_memory_limit(cls, max_megabytes: float) -> "TranspositionTable":
+        return cls(max(1, int(max_megabytes * 1024 * 1024 / cls.ENTRY_SIZE_ESTIMATE)))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_dead(self, position_hash: int) -> bool:
+        """Check if position was proven dead, refreshing its entry on a hit."""
+        if position_hash in self.entries:
+            self.entries.move_to_end(position_hash)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def mark_dead(self, position_hash: int, marbles_left: int):
+        """Record position as dead, evicting the least recently used entry if the table is full."""
+        self.entries[position_hash] = marbles_left
+        self.entries.move_to_end(position_hash)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.entries), "hits": self.hits,
+            "misses": self.misses, "evictions": self.evictions,
+        }
+
+
+class SharedDeadTable:
+    """
+    Dead positions shared between processes - a direct-mapped array of position hashes in shared memory, in front
+    of which every process keeps its own TranspositionTable.
+
+    A hash is stored in slot `hash % slots`, overwriting whatever was there. Reads and writes take no lock: a lost
+    or overwritten entry only costs a repeated search, and a slot can hold only a complete hash of some dead
+    position, so a hit is as reliable as one of the local table. Hash 0 marks an empty slot and is never shared.
+    """
+
+    def __init__(self, slots, local_table: TranspositionTable | None = None):
+        self.slots = slots
+        self.slot_count = len(slots)
+        self.local_table = local_table if local_table is not None else TranspositionTable()
+        self.shared_hits = 0
+
+    @staticmethod
+    def allocate(slot_count: int = 1 << 20):
+        """Zeroed shared array of 64-bit slots, to be handed to the worker processes."""
+        if slot_count < 1:
+            raise ValueError(f"Shared table needs at least one slot, {slot_count=}")
+        return RawArray(c_uint64, slot_count)
+
+    def __len__(self):
+        return len(self.local_table)
+
+    @property
+    def hits(self) -> int:
+        return self.local_table.hits + self.shared_hits
+
+    def is_dead(self, position_hash: int) -> bool:
+        if self.local_table.is_dead(position_hash):
+            return True
+        if position_hash and self.slots[position_hash % self.slot_count] == position_hash:
+            self.shared_hits += 1
+            return True
+        return False
+
+    def mark_dead(self, position_hash: int, marbles_left: int):
+        self.local_table.mark_dead(position_hash, marbles_left)
+        if position_hash:
+            self.slots[position_hash % self.slot_count] = position_hash
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {**self.local_table.stats, "shared_hits": self.shared_hits}
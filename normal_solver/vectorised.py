@@ -0,0 +1,97 @@
+"""
+Batched free status and legal move counting over many positions at once, using NumPy.
+
+Positions are passed as an (N, cells) integer array of SigmarMarble values, one column per playable field of
+the board (row-major order, the same as SmallSigmarBoard.text_encoding), with EMPTY for empty fields.
+Neighbour gathers come from the adjacency compiled by SmallSigmarBoard.compose_board_interconnections.
+"""
+import numpy as np
+
+from normal_solver.board import SigmarMarble, SigmarField, SmallSigmarBoard
+
+
+EMPTY = -1
+SALT = SigmarMarble.salt.value
+ELEMENTS = (SigmarMarble.earth.value, SigmarMarble.fire.value, SigmarMarble.wind.value, SigmarMarble.water.value)
+METALS = (
+    SigmarMarble.lead.value, SigmarMarble.tin.value, SigmarMarble.iron.value,
+    SigmarMarble.copper.value, SigmarMarble.silver.value, SigmarMarble.gold.value,
+)
+GOLD = SigmarMarble.gold.value
+QUICKSILVER = SigmarMarble.quicksilver.value
+MORS = SigmarMarble.mors.value
+VITAE = SigmarMarble.vitae.value
+
+FREE_PATTERN_TABLE = np.array(SigmarField.free_pattern_table, dtype=bool)
+PATTERN_WEIGHTS = np.array([1 << direction for direction in range(6)], dtype=np.int64)
+
+
+class VectorisedBoardShape:
+    """
+    Neighbour gather array for one board shape: (cells, 6) indexes of neighbouring playable fields, with
+    the index `cells` standing for the board edge. Edge column is padded as always empty before gathering.
+    """
+
+    def __init__(self, board: SmallSigmarBoard):
+        playable = [field for field in board.fields[:-1] if not field.board_edge_field]
+        self.cells = len(playable)
+        column_of_field = {field.layout_index: column for column, field in enumerate(playable)}
+        self.neighbour_gather = np.full((self.cells, 6), self.cells, dtype=np.intp)
+        for column, field in enumerate(playable):
+            base = 6 * field.layout_index
+            for direction, neigh_index in enumerate(board.neighbour_indexes[base:base + 6]):
+                self.neighbour_gather[column, direction] = column_of_field.get(neigh_index, self.cells)
+
+    def encode_boards(self, boards: list[SmallSigmarBoard]) -> np.ndarray:
+        """Stack marbles of the boards (of this shape) into an (N, cells) array of marble codes."""
+        codes = np.full((len(boards), self.cells), EMPTY, dtype=np.int16)
+        for board_idx, board in enumerate(boards):
+            playable = [field for field in board.fields[:-1] if not field.board_edge_field]
+            codes[board_idx] = [EMPTY if field.marble is None else field.marble for field in playable]
+        return codes
+
+    def free_mask(self, codes: np.ndarray) -> np.ndarray:
+        """
+        (N, cells) free status of every field, the same as SigmarField.free (empty fields included) - 6-bit
+        pattern of empty neighbours is gathered for all fields at once and mapped through the free pattern table.
+        """
+        empty = codes == EMPTY
+        padded = np.concatenate([empty, np.ones((codes.shape[0], 1), dtype=bool)], axis=1)
+        patterns = padded[:, self.neighbour_gather] @ PATTERN_WEIGHTS
+        return FREE_PATTERN_TABLE[patterns]
+
+    @staticmethod
+    def next_metals(codes: np.ndarray) -> np.ndarray:
+        """
+        Next metal to clear for each board - the lowest metal still on the board (metals can only be cleared
+        in order), EMPTY when there are no metals left.
+        """
+        next_metals = np.full(codes.shape[0], EMPTY, dtype=codes.dtype)
+        for metal in reversed(METALS):
+            next_metals[(codes == metal).any(axis=1)] = metal
+        return next_metals
+
+    def legal_move_counts(self, codes: np.ndarray, next_metals: np.ndarray | None = None) -> np.ndarray:
+        """
+        Number of legal moves for each board - equal to the length of SmallSigmarGame.eligible_moves
+        (pairs plus the single gold move). Counted from per-type numbers of free marbles, without listing pairs.
+        """
+        if next_metals is None:
+            next_metals = self.next_metals(codes)
+        free_codes = np.where(self.free_mask(codes), codes, EMPTY)
+
+        def free_count(marble: int) -> np.ndarray:
+            return (free_codes == marble).sum(axis=1, dtype=np.int64)
+
+        salt = free_count(SALT)
+        counts = salt * (salt - 1) // 2
+        for element in ELEMENTS:
+            element_count = free_count(element)
+            counts += element_count * (element_count - 1) // 2 + element_count * salt
+        free_next_metal = np.where(
+            next_metals == EMPTY, 0, (free_codes == next_metals[:, None]).sum(axis=1, dtype=np.int64)
+        )
+        gold_is_next = next_metals == GOLD
+        counts += np.where(gold_is_next, free_next_metal, free_count(QUICKSILVER) * free_next_metal)
+        counts += free_count(MORS) * free_count(VITAE)
+        return counts
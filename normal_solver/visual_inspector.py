@@ -0,0 +1,227 @@
+"""
+Visual inspector - recovers a board from a screenshot, as an RGB image array (height, width, 3).
+
+Recognition runs in three steps, all of them on whole arrays:
+
+1. locate: the board is whatever differs from the background colour (taken from the image border). Its bounding
+   box, together with the known shape of the hex grid, gives the centre of the grid and the pitch - distance
+   between centres of neighbouring fields.
+2. sample: every field of the layout is sampled at the same fixed set of points (in units of the pitch, so
+   sampling does not depend on the scale of the screenshot) with a single fancy-indexing gather - an
+   (fields, points * 3) feature array.
+3. classify: features of all the fields are matched against templates - one per SigmarMarble plus the empty
+   field - in a single batched squared distance computation, the nearest template wins.
+
+Templates are mean features of fields of a known board (calibrate). Without a real screenshot to learn from,
+they come from render_board, a synthetic renderer of boards, which is also what the recogniser is tested against.
+"""
+import numpy as np
+
+from normal_solver.board import SigmarMarble, SmallSigmarBoard, HexSigmarBoard
+from normal_solver.serialisation import board_for_row_sizes
+from normal_solver.vectorised import EMPTY
+
+
+# class -> (outer colour, inner colour) of the synthetic renderer, EMPTY is an empty field (socket of the board)
+RENDER_COLOURS: dict[int, tuple[tuple[int, int, int], tuple[int, int, int]]] = {
+    EMPTY: ((74, 62, 48), (74, 62, 48)),
+    SigmarMarble.salt.value: ((226, 222, 210), (150, 146, 140)),
+    SigmarMarble.earth.value: ((84, 140, 60), (40, 80, 30)),
+    SigmarMarble.fire.value: ((210, 70, 40), (250, 180, 60)),
+    SigmarMarble.wind.value: ((160, 210, 220), (240, 250, 250)),
+    SigmarMarble.water.value: ((40, 90, 200), (120, 170, 240)),
+    SigmarMarble.lead.value: ((90, 90, 100), (50, 50, 60)),
+    SigmarMarble.tin.value: ((170, 170, 160), (110, 110, 100)),
+    SigmarMarble.iron.value: ((130, 80, 70), (190, 120, 110)),
+    SigmarMarble.copper.value: ((200, 120, 60), (120, 70, 30)),
+    SigmarMarble.silver.value: ((200, 200, 215), (250, 250, 255)),
+    SigmarMarble.gold.value: ((230, 190, 50), (255, 240, 140)),
+    SigmarMarble.quicksilver.value: ((180, 180, 190), (60, 60, 70)),
+    SigmarMarble.mors.value: ((40, 30, 40), (140, 40, 60)),
+    SigmarMarble.vitae.value: ((240, 220, 150), (210, 60, 80)),
+}
+RENDER_BACKGROUND = (24, 20, 18)
+# radius of a drawn field (socket or marble) and of the inner mark of a marble, in pitches
+FIELD_RADIUS = 0.46
+INNER_RADIUS = 0.2
+# sampling points - centre plus two rings, in pitches, all well inside a field and either inside or outside
+# of the inner mark
+SAMPLE_POINTS = np.array(
+    [(0.0, 0.0)]
+    + [(0.1 * np.cos(angle), 0.1 * np.sin(angle)) for angle in np.linspace(0, 2 * np.pi, 6, endpoint=False)]
+    + [(0.32 * np.cos(angle), 0.32 * np.sin(angle)) for angle in np.linspace(0, 2 * np.pi, 12, endpoint=False)]
+)
+ROW_PITCH = np.sqrt(3) / 2
+
+
+def field_offsets(board: SmallSigmarBoard) -> np.ndarray:
+    """(fields, 2) x, y offsets of the playable fields (row-major) from the centre of the grid, in pitches."""
+    middle_row = len(board.layout) // 2
+    return np.array([
+        ((field.field_index - (len(row) - 1) / 2), (field.row_index - middle_row) * ROW_PITCH)
+        for row in board.layout[1:-1] for field in row[1:-1]
+    ])
+
+
+def render_board(board: SmallSigmarBoard, size: tuple[int, int] = (1080, 1920), pitch: float = 64.0,
+                 centre: tuple[float, float] | None = None, noise: float = 0.0,
+                 rng: np.random.Generator | None = None) -> np.ndarray:
+    """
+    Synthetic screenshot of the board - (height, width, 3) uint8 RGB image with every field drawn as a disc
+    of its marble colours on a plain background. Gaussian noise of `noise` standard deviation is added on top.
+    :param centre: x, y pixel position of the centre of the grid, the middle of the image by default.
+    """
+    height, width = size
+    centre_x, centre_y = centre if centre is not None else (width / 2, height / 2)
+    image = np.empty((height, width, 3), dtype=np.float32)
+    image[:] = RENDER_BACKGROUND
+    offsets = field_offsets(board) * pitch + (centre_x, centre_y)
+    fields = [field for row in board.layout[1:-1] for field in row[1:-1]]
+    reach = int(np.ceil(FIELD_RADIUS * pitch))
+    for (x, y), field in zip(offsets, fields):
+        outer, inner = RENDER_COLOURS[EMPTY if field.marble is None else field.marble]
+        top, left = max(0, int(y) - reach), max(0, int(x) - reach)
+        ys, xs = np.ogrid[top:min(height, int(y) + reach + 2), left:min(width, int(x) + reach + 2)]
+        distance = np.hypot(xs + 0.5 - x, ys + 0.5 - y)
+        patch = image[top:top + distance.shape[0], left:left + distance.shape[1]]
+        patch[distance <= FIELD_RADIUS * pitch] = outer
+        patch[distance <= INNER_RADIUS * pitch] = inner
+    if noise:
+        rng = rng if rng is not None else np.random.default_rng()
+        image += rng.normal(0.0, noise, image.shape).astype(np.float32)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def encoding_from_codes(codes: np.ndarray) -> str:
+    """Text encoding (SmallSigmarBoard.text_encoding) of classified fields."""
+    return "".join(SmallSigmarBoard.sigmar_text_encoding[None if code == EMPTY else int(code)] for code in codes)
+
+
+class GridLocation:
+    """Position of the hex grid in an image - pixel centre of the grid and the pitch in pixels."""
+
+    def __init__(self, centre_x: float, centre_y: float, pitch: float):
+        self.centre_x = centre_x
+        self.centre_y = centre_y
+        self.pitch = pitch
+
+    def __repr__(self):
+        return f"GridLocation(centre=({self.centre_x:.1f}, {self.centre_y:.1f}), pitch={self.pitch:.2f})"
+
+
+class BoardRecogniser:
+    """
+    Recogniser of boards of one shape - the shape of `board`, the real game board by default.
+    :param templates: templates as returned by calibrate, synthetic templates by default.
+    :param background_threshold: summed absolute RGB difference from the background that counts as the board.
+    :param min_pixels: board pixels (of the sampled ones, see locate) a row or column of the board has to hold.
+    """
+    CLASSES = [EMPTY] + [marble.value for marble in SigmarMarble]
+
+    def __init__(self, board: SmallSigmarBoard | None = None, templates: np.ndarray | None = None,
+                 background_threshold: int = 90, min_pixels: int = 3):
+        board = board if board is not None else HexSigmarBoard()
+        self.board = board
+        self.offsets = field_offsets(board)
+        self.fields = [field for row in board.layout[1:-1] for field in row[1:-1]]
+        self.background_threshold = background_threshold
+        self.min_pixels = min_pixels
+        # bounding box of the drawn fields, in pitches
+        self.__span_x = np.ptp(self.offsets[:, 0]) + 2 * FIELD_RADIUS
+        self.__span_y = np.ptp(self.offsets[:, 1]) + 2 * FIELD_RADIUS
+        self.__centre_offset = (self.offsets.max(axis=0) + self.offsets.min(axis=0)) / 2
+        self.classes = np.array(self.CLASSES)
+        self.templates = np.zeros((len(self.CLASSES), 3 * len(SAMPLE_POINTS)), dtype=np.float32)
+        if templates is not None:
+            self.templates = templates
+        else:
+            self.__calibrate_synthetic()
+
+    def __calibrate_synthetic(self):
+        """Calibrate on a rendered board holding every class, repeated over all fields."""
+        marbles = [None if value == EMPTY else value for value in self.CLASSES]
+        original = [field.marble for field in self.fields]
+        try:
+            for number, field in enumerate(self.fields):
+                field.marble = marbles[number % len(marbles)]
+            image = render_board(self.board, size=(720, 1280), pitch=48.0)
+            codes = np.array([EMPTY if field.marble is None else field.marble for field in self.fields])
+        finally:
+            for field, marble in zip(self.fields, original):
+                field.marble = marble
+        self.calibrate(image, codes)
+
+    def locate(self, image: np.ndarray, stride: int | None = None) -> GridLocation:
+        """
+        Find the grid from the bounding box of the board - pixels differing from the background colour
+        (median of the image border). Only every `stride`-th pixel of every `stride`-th row is looked at (every
+        4th of a 1080p frame by default, the box is then off by a few pixels at most), and a row or column
+        belongs to the board once it holds at least `min_pixels` of them, so that noise does not stretch the box.
+        """
+        stride = stride if stride is not None else max(1, min(image.shape[:2]) // 270)
+        border = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]]).astype(np.int16)
+        background = np.median(border, axis=0).astype(np.int16)
+        foreground = np.abs(image[::stride, ::stride].astype(np.int16) - background).sum(axis=-1) \
+            > self.background_threshold
+        rows = np.flatnonzero(np.count_nonzero(foreground, axis=1) >= self.min_pixels)
+        columns = np.flatnonzero(np.count_nonzero(foreground, axis=0) >= self.min_pixels)
+        if not len(rows) or not len(columns):
+            raise ValueError("No board found in the image")
+        # edges lie somewhere between the sampled rows (columns), take the middle of that stride
+        top, bottom = rows[0] * stride + (1 - stride) / 2, rows[-1] * stride + (1 + stride) / 2
+        left, right = columns[0] * stride + (1 - stride) / 2, columns[-1] * stride + (1 + stride) / 2
+
+        pitch = ((right - left) / self.__span_x + (bottom - top) / self.__span_y) / 2
+        return GridLocation(
+            (left + right) / 2 - self.__centre_offset[0] * pitch,
+            (top + bottom) / 2 - self.__centre_offset[1] * pitch,
+            pitch
+        )
+
+    def sample(self, image: np.ndarray, location: GridLocation, fields: np.ndarray | None = None) -> np.ndarray:
+        """(fields, points * 3) float features of all fields, or of the `fields` indexes (row-major) only."""
+        offsets = self.offsets if fields is None else self.offsets[fields]
+        points = (offsets[:, None, :] + SAMPLE_POINTS[None, :, :]) * location.pitch
+        xs = np.clip(np.rint(points[..., 0] + location.centre_x - 0.5), 0, image.shape[1] - 1).astype(np.intp)
+        ys = np.clip(np.rint(points[..., 1] + location.centre_y - 0.5), 0, image.shape[0] - 1).astype(np.intp)
+        return image[ys, xs].reshape(len(offsets), -1).astype(np.float32)
+
+    def classify(self, features: np.ndarray) -> np.ndarray:
+        """Class (marble value, EMPTY for empty fields) of the nearest template for every row of features."""
+        distances = (
+            (features * features).sum(axis=1)[:, None]
+            - 2 * features @ self.templates.T
+            + (self.templates * self.templates).sum(axis=1)[None, :]
+        )
+        return self.classes[distances.argmin(axis=1)]
+
+    def calibrate(self, image: np.ndarray, codes: np.ndarray, location: GridLocation | None = None) -> np.ndarray:
+        """
+        Templates from an image of a known board - mean features of the fields of every class, in the order
+        of CLASSES. Classes missing from the board keep their current templates. The templates are returned
+        and used from now on.
+        """
+        location = location if location is not None else self.locate(image)
+        features = self.sample(image, location)
+        templates = self.templates.copy()
+        for number, value in enumerate(self.CLASSES):
+            selected = codes == value
+            if selected.any():
+                templates[number] = features[selected].mean(axis=0)
+        self.templates = templates
+        return templates
+
+    def recognise_codes(self, image: np.ndarray) -> tuple[np.ndarray, GridLocation]:
+        """Classes of all playable fields (row-major), with the location of the grid they were found at."""
+        location = self.locate(image)
+        return self.classify(self.sample(image, location)), location
+
+    def recognise(self, image: np.ndarray, board: SmallSigmarBoard | None = None) -> SmallSigmarBoard:
+        """
+        Board recovered from the image, laid down and ready to be solved - a new board of the recogniser's
+        shape, or `board` reloaded in place.
+        """
+        codes, _ = self.recognise_codes(image)
+        board = board if board is not None else board_for_row_sizes(len(row) for row in self.board.layout)
+        board.load_text_encoding(encoding_from_codes(codes))
+        return board
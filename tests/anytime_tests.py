@@ -0,0 +1,88 @@
+from random import Random
+from threading import Timer
+from unittest import TestCase
+
+from normal_solver.anytime import CancellationToken, SolveResult
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.solver import SmallSigmarGame
+
+
+class AnytimeSolveTests(TestCase):
+    HARD_SEED = 16  # full board searched for seconds before it's proven unsolvable
+
+    @staticmethod
+    def game(board: SmallSigmarBoard, seed_: int) -> SmallSigmarGame:
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+        return SmallSigmarGame(board=board)
+
+    def assertLegalSequence(self, board: SmallSigmarBoard, moves: list[list[tuple[int, int]]]):
+        """Replay the moves, every one has to be legal at the time it is made. Board is restored afterward."""
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        made_moves = []
+        for move_coords in moves:
+            legal_moves = {
+                frozenset((field.row_index, field.field_index) for field in move)
+                for move in game.move_index.eligible_moves(game.next_metal_to_clear)
+            }
+            self.assertIn(frozenset(move_coords), legal_moves)
+            move = tuple(board.get_field_by_index(*coords) for coords in move_coords)
+            made_moves.append((move, game.apply_move(move)))
+        for move, undo_info in reversed(made_moves):
+            game.undo_move(move, undo_info)
+
+    def test_complete_solve(self):
+        """Without limits hit, anytime solve gives the same answer as the plain solve."""
+        for board_type, seeds in ((SmallSigmarBoard, range(30)), (HexSigmarBoard, (2, 4, 6, 9))):
+            for seed_ in seeds:
+                for discrepancy_limits in ((), (0,), (0, 1, 2)):
+                    game = self.game(board_type(), seed_)
+                    result = game.solve_anytime(discrepancy_limits=discrepancy_limits)
+                    expected = self.game(board_type(), seed_)
+                    expected.solve()
+                    self.assertEqual(SolveResult.COMPLETE, result.status)
+                    self.assertEqual(expected.solvable, result.solvable)
+                    self.assertEqual(result.solvable, game.solvable)
+                    if result.solvable:
+                        self.assertEqual(result.moves, result.best_partial)
+                        self.assertLegalSequence(game.board, result.moves)
+                    else:
+                        self.assertIsNone(result.moves)
+
+    def test_time_budget(self):
+        game = self.game(HexSigmarBoard(), self.HARD_SEED)
+        result = game.solve_anytime(time_budget=0.2)
+        self.assertEqual(SolveResult.TIMEOUT, result.status)
+        self.assertIsNone(result.solvable)
+        self.assertIsNone(result.moves)
+        self.assertLess(result.elapsed, 1.0)
+        self.assertGreater(result.nodes, 0)
+        self.assertGreater(len(result.best_partial), 0)
+        self.assertLegalSequence(game.board, result.best_partial)
+
+        spent = game.solve_anytime(time_budget=0)
+        self.assertEqual((SolveResult.TIMEOUT, 0), (spent.status, spent.nodes))
+
+    def test_cancellation(self):
+        token = CancellationToken()
+        token.cancel()
+        result = self.game(SmallSigmarBoard(), 1).solve_anytime(cancellation_token=token)
+        self.assertEqual((SolveResult.CANCELLED, None, 0), (result.status, result.solvable, result.nodes))
+
+        token = CancellationToken()
+        game = self.game(HexSigmarBoard(), self.HARD_SEED)
+        timer = Timer(0.2, token.cancel)
+        timer.start()
+        try:
+            result = game.solve_anytime(cancellation_token=token)
+        finally:
+            timer.cancel()
+        self.assertEqual(SolveResult.CANCELLED, result.status)
+        self.assertLess(result.elapsed, 1.0)
+        self.assertLegalSequence(game.board, result.best_partial)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
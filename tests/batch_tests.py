@@ -0,0 +1,85 @@
+import json
+import os
+from random import seed, random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from normal_solver.batch import solve_seed, generate_seed, run_batch, main
+
+
+class BatchSolverTests(TestCase):
+    @staticmethod
+    def without_timing(result: dict) -> dict:
+        return {key: value for key, value in result.items() if key != "wall_time"}
+
+    def test_solve_seed_is_reproducible(self):
+        """Result of a seed doesn't depend on the global random state nor on previous tasks."""
+        seed(1)
+        first = solve_seed(19)
+        random()
+        solve_seed(20)
+        second = solve_seed(19)
+        self.assertEqual(self.without_timing(first), self.without_timing(second))
+        self.assertEqual(17, len(first["board"]) - first["board"].count("_"))
+        # seed 19 lays down a solvable board
+        self.assertTrue(first["solvable"])
+        self.assertEqual(9, len(first["moves"]))
+        self.assertGreater(first["nodes"], 0)
+
+    def test_real_board_seed(self):
+        result = solve_seed(2, radius=6)
+        self.assertEqual(91, len(result["board"]))
+        self.assertTrue(result["solvable"])
+        self.assertEqual(28, len(result["moves"]))
+
+    def test_run_batch(self):
+        """Parallel batch writes one JSON line per seed, matching the results of solving each seed alone."""
+        seeds = range(10, 30)
+        with TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "results.jsonl")
+            self.assertEqual(len(seeds), run_batch(seeds, output_path, processes=2, chunksize=3))
+            with open(output_path) as results_file:
+                results = [json.loads(line) for line in results_file]
+            main(["--start", "0", "--count", "3", "--output", output_path, "--processes", "1"])
+            with open(output_path) as results_file:
+                self.assertEqual(3, len(results_file.readlines()))
+
+        self.assertEqual(set(seeds), {result["seed"] for result in results})
+        for result in results:
+            expected = json.loads(json.dumps(solve_seed(result["seed"])))
+            self.assertEqual(self.without_timing(expected), self.without_timing(result))
+
+    def test_run_batch_bitboard_engine(self):
+        """Bitboard engine solves the same boards as the field engine."""
+        seeds = range(10, 20)
+        with TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "results.jsonl")
+            self.assertEqual(len(seeds), run_batch(seeds, output_path, processes=1, engine="bitboard"))
+            with open(output_path) as results_file:
+                results = [json.loads(line) for line in results_file]
+            with self.assertRaises(ValueError):
+                run_batch(seeds, output_path, engine="unknown")
+        for result in results:
+            self.assertEqual("bitboard", result["engine"])
+            self.assertEqual(solve_seed(result["seed"])["solvable"], result["solvable"])
+
+    def test_run_batch_reverse_generator(self):
+        """Reverse play generator records witness solutions without searching."""
+        with TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "results.jsonl")
+            self.assertEqual(4, run_batch(range(4), output_path, radius=4, processes=1, generator="reverse"))
+            with open(output_path) as results_file:
+                results = [json.loads(line) for line in results_file]
+            with self.assertRaises(ValueError):
+                run_batch(range(4), output_path, generator="unknown")
+        for result in results:
+            self.assertTrue(result["solvable"])
+            self.assertEqual(0, result["nodes"])
+            expected = json.loads(json.dumps(generate_seed(result["seed"], 4)))
+            self.assertEqual(self.without_timing(expected), self.without_timing(result))
+
+
+if __name__ == '__main__':
+    from unittest import main as unittest_main
+
+    unittest_main()
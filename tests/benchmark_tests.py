@@ -0,0 +1,106 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from normal_solver.benchmark import (
+    BENCHMARKS, FULL_SOLVE_SEEDS, DEFAULT_BASELINE, run_benchmarks, run_move_ordering_benchmark, compare, main
+)
+from normal_solver.board import SmallSigmarBoard
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_run_benchmarks(self):
+        report = run_benchmarks(repeat=2, seed_count=3)
+        self.assertEqual(list(BENCHMARKS), list(report["results"]))
+        for name, result in report["results"].items():
+            self.assertEqual(2 * min(3, len(BENCHMARKS[name][1])), result["ops"], name)
+            self.assertGreater(result["ops_per_second"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreaterEqual(result["peak_memory_kib"], 0)
+            self.assertEqual(0, result["timeouts"])
+        self.assertGreater(report["results"]["solve_small"]["nodes"], 0)
+        self.assertGreater(report["results"]["solve_small_bitboard"]["nodes_per_second"], 0)
+        self.assertEqual(0, report["results"]["wavefront_small"]["nodes"])
+        with self.assertRaises(ValueError):
+            run_benchmarks(["solve_small", "unknown"])
+
+    def test_compact_board_memory(self):
+        """Compact board takes a fraction of the memory of the SigmarField based one holding the same position."""
+        results = run_benchmarks(["board_full", "compact_board_full"], repeat=1, seed_count=5)["results"]
+        self.assertLess(5 * results["compact_board_full"]["peak_memory_kib"], results["board_full"]["peak_memory_kib"])
+
+    def test_compare(self):
+        baseline = {"results": {
+            "solve_small": {"ops_per_second": 100.0, "peak_memory_kib": 10.0},
+            "solve_full": {"ops_per_second": 10.0, "peak_memory_kib": 100.0},
+        }}
+        report = {"results": {
+            "solve_small": {"ops_per_second": 91.0, "peak_memory_kib": 11.5},
+            "solve_full": {"ops_per_second": 8.0, "peak_memory_kib": 200.0},
+            "wavefront_small": {"ops_per_second": 1.0, "peak_memory_kib": 1.0},
+        }}
+        regressions = compare(report, baseline, threshold=0.1)
+        self.assertEqual(2, len(regressions))
+        self.assertTrue(all(regression.startswith("solve_full") for regression in regressions))
+        self.assertEqual(3, len(compare(report, baseline, threshold=0.05)))
+
+        # search nodes and timeouts are compared between runs of the same operations only
+        baseline = {"results": {"solve_full": {
+            "ops": 20, "ops_per_second": 10.0, "peak_memory_kib": 100.0, "timeouts": 2, "nodes": 1000
+        }}}
+        report = {"results": {"solve_full": dict(baseline["results"]["solve_full"], timeouts=3, nodes=1200)}}
+        regressions = compare(report, baseline, threshold=0.1)
+        self.assertEqual(2, len(regressions))
+        self.assertIn("timeouts", regressions[0])
+        self.assertIn("search nodes", regressions[1])
+        report["results"]["solve_full"]["ops"] = 10
+        self.assertEqual([], compare(report, baseline, threshold=0.1))
+
+    def test_stored_baseline(self):
+        """Baseline kept with the package covers every benchmark over all of its seeds."""
+        with open(DEFAULT_BASELINE) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.assertEqual(list(BENCHMARKS), list(baseline["results"]))
+        self.assertEqual(baseline["repeat"] * len(FULL_SOLVE_SEEDS), baseline["results"]["solve_full"]["ops"])
+        self.assertEqual(list(range(len(FULL_SOLVE_SEEDS))), list(FULL_SOLVE_SEEDS))
+
+    def test_main(self):
+        """Command line run writes the report, exits with 1 when it regressed against the baseline."""
+        with TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "benchmark.json")
+            baseline_path = os.path.join(tmp_dir, "baseline.json")
+            arguments = ["--repeat", "1", "--seed-count", "2", "eligible_moves_full", "solve_small"]
+            self.assertEqual(0, main(["--output", output_path, "--no-baseline"] + arguments))
+            with open(output_path) as output:
+                report = json.load(output)
+            self.assertEqual(["eligible_moves_full", "solve_small"], list(report["results"]))
+
+            report["results"]["solve_small"]["ops_per_second"] *= 1000
+            with open(baseline_path, "w") as baseline:
+                json.dump(report, baseline)
+            self.assertEqual(1, main(["--output", output_path, "--baseline", baseline_path] + arguments))
+
+    def test_move_ordering_benchmark(self):
+        """Orderings solve the same boards, unsolvable boards cost the same nodes in any order."""
+        orderings = [(), ("metals_last", "salt_parity")]
+        report = run_move_ordering_benchmark(orderings, tuple(range(10)), make_board=SmallSigmarBoard)
+        self.assertEqual(["generator", "metals_last+salt_parity"], list(report["results"]))
+        layout, ordered = report["results"].values()
+        self.assertEqual(10, layout["solved"] + layout["unsolvable"] + layout["timeouts"])
+        self.assertEqual((layout["solved"], layout["unsolvable"]), (ordered["solved"], ordered["unsolvable"]))
+        self.assertEqual(layout["nodes"].keys(), ordered["nodes"].keys())
+        self.assertEqual(sum(layout["nodes"].values()), layout["nodes_to_solution"])
+
+        with TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "orderings.json")
+            arguments = ["--output", output_path, "--seed-count", "3", "--move-orderings", "generator", "metals_last"]
+            self.assertEqual(0, main(arguments))
+            with open(output_path) as output:
+                self.assertEqual(["generator", "metals_last"], list(json.load(output)["results"]))
+
+
+if __name__ == '__main__':
+    from unittest import main as unittest_main
+
+    unittest_main()
@@ -0,0 +1,159 @@
+from random import Random, seed, choice
+from unittest import TestCase
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble, SigmarField
+from normal_solver.bitboard import BitboardSigmarBoard, BitboardSearch
+from normal_solver.instrumentation import SolveStats
+from normal_solver.solver import SmallSigmarGame
+
+
+class BitboardSigmarBoardTests(TestCase):
+    def setUp(self):
+        seed(19)
+        self.board = SmallSigmarBoard()
+        self.board.lay_down_marbles_in_wavefront()
+        self.bitboard = BitboardSigmarBoard.from_board(self.board)
+
+    def assertSameAsFieldGraph(self):
+        """Check marbles and free status of every field against the SigmarField based board."""
+        field: SigmarField
+        for row in self.board.layout:
+            for field in row:
+                err_msg = f"mismatch at {field}"
+                self.assertEqual(field.marble, self.bitboard.get_marble(field.row_index, field.field_index), err_msg)
+                self.assertEqual(field.free, self.bitboard.is_free(field.row_index, field.field_index), err_msg)
+
+    def test_empty_board(self):
+        """Every field of the empty board is free, there are no marbles on it."""
+        self.board.reset_board()
+        self.bitboard = BitboardSigmarBoard.from_board(self.board)
+        self.assertEqual(0, self.bitboard.marble_count)
+        self.assertEqual([], self.bitboard.free_marble_fields())
+        self.assertSameAsFieldGraph()
+
+    def test_wavefront_layout(self):
+        """Laid down board is copied field by field, with the same free fields as in the field graph."""
+        self.assertEqual(1 + 2 * len(self.board.initial_items), self.bitboard.marble_count)
+        self.assertSameAsFieldGraph()
+        free_coords_for_seed_19 = [(1, 2), (1, 4), (2, 5), (3, 2), (4, 2), (4, 5), (5, 3), (5, 4)]
+        self.assertEqual(free_coords_for_seed_19, self.bitboard.free_marble_fields())
+        self.assertEqual([(3, 4)], self.bitboard.marble_fields(SigmarMarble.gold.value))
+
+    def test_remove_and_place_pair(self):
+        """
+        Remove free marbles two at a time from both representations, checking free status after every removal,
+        then put them back in reverse order and check if bitboard returns to the initial state.
+        """
+        removed = []
+        while len(self.bitboard.free_marble_fields()) >= 2:
+            field_1, field_2 = self.bitboard.free_marble_fields()[:2]
+            marbles = self.bitboard.remove_pair(field_1, field_2)
+            self.board.get_field_by_index(*field_1).update_field(None)
+            self.board.get_field_by_index(*field_2).update_field(None)
+            removed.append((field_1, marbles[0], field_2, marbles[1]))
+            self.assertSameAsFieldGraph()
+        self.assertGreater(len(removed), 0)
+
+        for field_1, marble_1, field_2, marble_2 in reversed(removed):
+            self.bitboard.place_pair(field_1, marble_1, field_2, marble_2)
+            self.board.get_field_by_index(*field_1).update_field(marble_1)
+            self.board.get_field_by_index(*field_2).update_field(marble_2)
+        self.assertSameAsFieldGraph()
+
+    def test_remove_lone_gold(self):
+        gold_field = self.bitboard.marble_fields(SigmarMarble.gold.value)[0]
+        marbles = self.bitboard.remove_pair(gold_field)
+        self.assertEqual((SigmarMarble.gold.value, None), marbles)
+        self.assertIsNone(self.bitboard.get_marble(*gold_field))
+        self.assertEqual(2 * len(self.board.initial_items), self.bitboard.marble_count)
+        self.bitboard.place_pair(gold_field, marbles[0])
+        self.assertSameAsFieldGraph()
+
+    def test_invalid_fields(self):
+        """Edge fields can't hold marbles, fields outside of the layout raise IndexError."""
+        row = choice([0, len(self.board.layout) - 1])
+        with self.assertRaises(ValueError):
+            self.bitboard.set_marble(row, 0, SigmarMarble.salt.value)
+        with self.assertRaises(IndexError):
+            self.bitboard.get_marble(1, 100)
+        self.assertTrue(self.bitboard.is_free(row, 0))
+
+
+class BitboardSearchTests(TestCase):
+    def test_solve(self):
+        """
+        Bitboard engine searches the same nodes as the field engine and finds the same strategy, board is
+        left untouched.
+        """
+        for seed_ in range(30):
+            board = SmallSigmarBoard()
+            board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+            encoding = board.text_encoding()
+            search = BitboardSearch(board)
+            strategy = search.solve()
+            game = SmallSigmarGame(board=board)
+            self.assertEqual(game.solve(), strategy, seed_)
+            self.assertEqual(game.nodes_searched, search.nodes, seed_)
+            self.assertEqual(encoding, board.text_encoding())
+
+    def test_positions_along_the_game(self):
+        """Metal to clear, pruning, hashes and moves calculated on masks agree with the field engine, move by move."""
+        rules_fired = set()
+        for seed_ in range(10):
+            board = HexSigmarBoard(4)
+            rng = Random(seed_)
+            board.lay_down_marbles_in_wavefront(rng=rng)
+            search = BitboardSearch(board)
+            game = SmallSigmarGame(board=board)
+            game.count_marbles()
+            while True:
+                occupancy = BitboardSigmarBoard.from_board(board).occupancy
+                next_metal_to_clear = search.next_metal_to_clear(occupancy)
+                self.assertEqual(game.next_metal_to_clear, next_metal_to_clear)
+                self.assertEqual(game.position_hashes, search.position_hashes(occupancy))
+                rule = search.dead_rule(occupancy, next_metal_to_clear)
+                self.assertEqual(game.pruner.dead_rule(game.marble_counts, game.next_metal_to_clear), rule)
+                rules_fired.add(rule)
+                moves = game.move_index.eligible_moves(game.next_metal_to_clear)
+                self.assertEqual(
+                    [tuple((field.row_index, field.field_index) for field in move) for move in moves],
+                    [
+                        tuple(search.layout.bit_to_coords[bit] for bit in move)
+                        for move in search.eligible_moves(occupancy, next_metal_to_clear)
+                    ]
+                )
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+        self.assertIn("buried_metal", rules_fired)
+
+    def test_solver_engine(self):
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(rng=Random(2))
+        game = SmallSigmarGame(board=board)
+        strategy = game.solve(engine="bitboard")
+        self.assertTrue(game.solvable)
+        self.assertEqual(len(game.solve()), len(strategy))
+        with self.assertRaises(ValueError):
+            game.solve(engine="unknown")
+        with self.assertRaises(ValueError):
+            game.solve(engine="bitboard", stats=SolveStats())
+
+    def test_shared_transposition_table(self):
+        """Engines hash positions the same way, positions one of them proved dead are cut by the other."""
+        for seed_ in range(30):
+            board = SmallSigmarBoard()
+            board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+            game = SmallSigmarGame(board=board)
+            if game.solve(engine="bitboard") is None:
+                self.assertIsNone(game.solve())
+                self.assertEqual(0, game.nodes_searched)
+                break
+        else:
+            self.fail("No unsolvable board among the seeds")
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
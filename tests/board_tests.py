@@ -2,7 +2,7 @@ from random import randint, choice
 from typing import Literal
 from unittest import TestCase
 
-from normal_solver.board import SmallSigmarBoard, SigmarMarble, SigmarField
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble, SigmarField
 
 
 class SigmarFieldTests(TestCase):
@@ -188,6 +188,14 @@ class SigmarFieldTests(TestCase):
         self.assertFalse(self.test_field.enclosed_status)
         self.assertFalse(nonfree_field.enclosed_status)
 
+    def test_free_pattern_table(self):
+        """Lookup table agrees with a direct search for an arc of three empty neighbours, for every pattern."""
+        self.assertEqual(64, len(SigmarField.free_pattern_table))
+        for pattern in range(64):
+            empty = [bool(pattern & (1 << i)) for i in range(6)]
+            expected = any(empty[i] and empty[(i + 1) % 6] and empty[(i + 2) % 6] for i in range(6))
+            self.assertEqual(expected, SigmarField.free_pattern_table[pattern], f"{pattern=:06b}")
+
 
 class BoardTests(TestCase):
     def setUp(self):
@@ -353,6 +361,139 @@ class BoardTests(TestCase):
         )
 
 
+    def test_compiled_layout(self):
+        """
+        Flat neighbour index array mirrors the neighbour pointers of playable fields, while edge fields
+        only point to the sentinel field (which stays empty), so they are always free.
+        """
+        fields = self.mini_board.fields
+        sentinel_index = len(fields) - 1
+        self.assertEqual(sum(len(row) for row in self.mini_board.layout) + 1, len(fields))
+        self.assertIsNone(fields[sentinel_index].marble)
+        for layout_index, field in enumerate(fields[:-1]):
+            self.assertEqual(layout_index, field.layout_index)
+            neighbour_indexes = self.mini_board.neighbour_indexes[6 * layout_index:6 * layout_index + 6]
+            if field.board_edge_field:
+                self.assertEqual([sentinel_index] * 6, neighbour_indexes)
+            else:
+                self.assertEqual(
+                    [neigh.layout_index for neigh in field.get_continuous_neigh_list()[:6]], neighbour_indexes
+                )
+
+    def test_set_field_marble(self):
+        """Updating fields through the compiled layout gives the same free status as SigmarField.update_field."""
+        reference_board = type(self.mini_board)()
+        playable = [field.layout_index for row in self.mini_board.layout[1:-1] for field in row[1:-1]]
+        for _ in range(200):
+            layout_index = choice(playable)
+            marble = choice([None, SigmarMarble.salt.value, SigmarMarble.fire.value])
+            self.mini_board.set_field_marble(layout_index, marble)
+            reference_board.fields[layout_index].update_field(marble)
+            self.assertEqual(
+                [(field.marble, field.free) for field in reference_board.fields],
+                [(field.marble, field.free) for field in self.mini_board.fields],
+            )
+
+    def test_template_per_class(self):
+        """Subclass laying out the rows on its own does not share the template of its base class."""
+        midpoint = self.mini_board.layout_midpoint
+
+        class HoledBoard(type(self.mini_board)):
+            def init_board_rows(self):
+                super().init_board_rows()
+                self.layout[midpoint[0]][midpoint[1]].board_edge_field = True
+
+        for _ in range(2):
+            self.assertTrue(HoledBoard().get_field_by_index(*midpoint).board_edge_field)
+            self.assertFalse(type(self.mini_board)().get_field_by_index(*midpoint).board_edge_field)
+
+    def test_clone(self):
+        """Boards built from the template of the shape, and clones of a position, are wired up on their own."""
+        self.mini_board.lay_down_marbles_in_wavefront()
+        clone = self.mini_board.clone()
+        self.assertIs(type(self.mini_board), type(clone))
+        self.assertTrue(clone.initialized_to_play)
+        self.assertEqual(self.mini_board.text_encoding(), clone.text_encoding())
+        self.assertEqual(
+            [(field.marble, field.free, field.row_index, field.field_index, field.board_edge_field)
+             for field in self.mini_board.fields],
+            [(field.marble, field.free, field.row_index, field.field_index, field.board_edge_field)
+             for field in clone.fields],
+        )
+        for board in (clone, type(self.mini_board)()):
+            own_fields = set(map(id, board.fields))
+            self.assertFalse(own_fields & set(map(id, self.mini_board.fields)))
+            self.assertEqual(board.fields[:-1], [field for row in board.layout for field in row])
+            for layout_index, field in enumerate(board.fields):
+                self.assertEqual(layout_index, field.layout_index)
+                if not field.board_edge_field:
+                    neighbours = field.get_continuous_neigh_list()[:6]
+                    self.assertTrue(own_fields.issuperset(map(id, neighbours)))
+                    self.assertEqual(
+                        board.neighbour_indexes[6 * layout_index:6 * layout_index + 6],
+                        [neigh.layout_index for neigh in neighbours]
+                    )
+
+        # positions are independent of each other
+        field = next(field for field in clone.fields if field.marble is not None and field.free)
+        clone.set_field_marble(field.layout_index, None)
+        self.assertIsNotNone(self.mini_board.fields[field.layout_index].marble)
+        clone.reset_board()
+        self.assertNotEqual(self.mini_board.text_encoding(), clone.text_encoding())
+        self.assertEqual(
+            [(field.marble, field.free) for field in type(self.mini_board)().fields],
+            [(field.marble, field.free) for field in clone.fields],
+        )
+
+
+class HexBoardTests(BoardTests):
+    """Run all the board tests on the real game board, and check the parts that depend on the radius."""
+    def setUp(self):
+        self.mini_board = HexSigmarBoard()
+
+    def test_layout(self):
+        """Test layout initialization as empty real-size board, 11 fields across, 91 playable fields"""
+        board_rows_length = [7, 8, 9, 10, 11, 12, 13, 12, 11, 10, 9, 8, 7]
+        self.assertEqual(board_rows_length, [len(row) for row in self.mini_board.layout])
+        playable = [field for row in self.mini_board.layout for field in row if not field.board_edge_field]
+        self.assertEqual(91, len(playable))
+        self.assertEqual(91, self.mini_board.playable_field_count)
+        self.assertEqual((6, 6), self.mini_board.layout_midpoint)
+        self.assertEqual(11, len(self.mini_board.layout[6]) - 2)
+        for field in playable:
+            self.assertIsNone(field.marble)
+
+    def test_marble_set(self):
+        """Real board carries the real game marble set, smaller boards keep all metals and quicksilver."""
+        counts = {}
+        for pair in self.mini_board.initial_items:
+            for marble in pair:
+                counts[marble] = counts.get(marble, 0) + 1
+        self.assertEqual(4, counts[SigmarMarble.salt])
+        for element in [SigmarMarble.earth, SigmarMarble.fire, SigmarMarble.wind, SigmarMarble.water]:
+            self.assertEqual(8, counts[element])
+        self.assertEqual(5, counts[SigmarMarble.quicksilver])
+        for metal in [SigmarMarble.lead, SigmarMarble.tin, SigmarMarble.iron, SigmarMarble.copper, SigmarMarble.silver]:
+            self.assertEqual(1, counts[metal])
+        self.assertEqual(4, counts[SigmarMarble.mors])
+        self.assertEqual(4, counts[SigmarMarble.vitae])
+        self.assertEqual(54, sum(counts.values()))
+
+        for radius in [3, 4, 5]:
+            board = HexSigmarBoard(radius)
+            marbles = [marble for pair in board.initial_items for marble in pair]
+            self.assertLess(len(marbles) + 1, board.playable_field_count)
+            self.assertEqual(5, marbles.count(SigmarMarble.quicksilver))
+            board.lay_down_marbles_in_wavefront()
+        with self.assertRaises(ValueError):
+            HexSigmarBoard(2)
+
+    def test_adjacency_shared_per_radius(self):
+        """Compiled adjacency is built once for each radius and shared between boards."""
+        self.assertIs(self.mini_board.neighbour_indexes, HexSigmarBoard().neighbour_indexes)
+        self.assertIsNot(self.mini_board.neighbour_indexes, HexSigmarBoard(5).neighbour_indexes)
+
+
 if __name__ == '__main__':
     from unittest.main import main
     main()
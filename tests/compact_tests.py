@@ -0,0 +1,71 @@
+import tracemalloc
+from random import Random
+from unittest import TestCase
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble, SigmarField
+from normal_solver.compact import CompactSigmarBoard
+
+
+class CompactSigmarBoardTests(TestCase):
+    def setUp(self):
+        self.board = HexSigmarBoard()
+        self.board.lay_down_marbles_in_wavefront(rng=Random(5))
+        self.compact = CompactSigmarBoard.from_board(self.board)
+
+    def assertSameAsBoard(self):
+        for field in self.board.fields[:-1]:
+            err_msg = f"mismatch at {field}"
+            self.assertEqual(field.marble, self.compact.get_marble(field.row_index, field.field_index), err_msg)
+            self.assertEqual(field.free, self.compact.is_free(field.row_index, field.field_index), err_msg)
+
+    def test_from_board(self):
+        self.assertSameAsBoard()
+        self.assertEqual(self.board.text_encoding(), self.compact.text_encoding())
+        self.assertEqual("_" * 29, CompactSigmarBoard().text_encoding())
+
+    def test_set_field_marble(self):
+        """Updates of single fields keep free status equal to the SigmarField based board."""
+        rng = Random(1)
+        playable = [field.layout_index for field in self.board.fields[:-1] if not field.board_edge_field]
+        for _ in range(300):
+            layout_index = rng.choice(playable)
+            marble = rng.choice([None, SigmarMarble.salt.value, SigmarMarble.vitae.value])
+            self.board.set_field_marble(layout_index, marble)
+            self.compact.set_field_marble(layout_index, marble)
+        self.assertSameAsBoard()
+
+    def test_copy_and_to_board(self):
+        """Copies share the layout but not the marbles, and can be written back into a field based board."""
+        clone = self.compact.copy()
+        self.assertIs(self.compact.shape, clone.shape)
+        clone.set_field_marble(self.board.get_field_by_index(*self.board.layout_midpoint).layout_index, None)
+        self.assertEqual(SigmarMarble.gold.value, self.compact.get_marble(*self.board.layout_midpoint))
+        self.assertIsNone(clone.get_marble(*self.board.layout_midpoint))
+
+        other_board = HexSigmarBoard()
+        self.compact.to_board(other_board)
+        self.assertEqual(
+            [(field.marble, field.free) for field in self.board.fields],
+            [(field.marble, field.free) for field in other_board.fields]
+        )
+
+    def test_memory_footprint(self):
+        """Fields have no __dict__, compact board takes a fraction of the memory of the field based one."""
+        self.assertFalse(hasattr(SigmarField(None, 0, 0), "__dict__"))
+
+        def allocated(factory) -> int:
+            tracemalloc.start()
+            boards = [factory() for _ in range(20)]  # noqa: F841
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return size
+
+        row_sizes = HexSigmarBoard.hex_row_sizes(6)
+        self.assertLess(10 * allocated(lambda: CompactSigmarBoard(row_sizes)), allocated(HexSigmarBoard))
+        self.assertLess(10 * allocated(CompactSigmarBoard), allocated(SmallSigmarBoard))
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
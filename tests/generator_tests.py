@@ -0,0 +1,77 @@
+from random import Random
+from unittest import TestCase
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble
+from normal_solver.batch import generate_seed
+from normal_solver.generator import placement_order, generate_solvable_board, generate_boards, GenerationFailed
+from normal_solver.solver import SmallSigmarGame
+
+
+class ReversePlayGeneratorTests(TestCase):
+    def assertWitnessClearsBoard(self, board: SmallSigmarBoard, witness: list[list[tuple[int, int]]]):
+        """Replay the witness solution, every move has to be legal at the time it is made."""
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        for move_coords in witness:
+            legal_moves = {
+                frozenset((field.row_index, field.field_index) for field in move)
+                for move in game.move_index.eligible_moves(game.next_metal_to_clear)
+            }
+            self.assertIn(frozenset(move_coords), legal_moves, f"Illegal move in witness: {move_coords}")
+            game.apply_move(tuple(board.get_field_by_index(*coords) for coords in move_coords))
+        self.assertEqual(0, game.remaining_marbles)
+
+    def test_placement_order(self):
+        """Metal pairs are placed from silver down to lead, other pairs are kept."""
+        items = HexSigmarBoard().initial_items
+        order = placement_order(items, Random(3))
+        self.assertCountEqual(items, order)
+        metals = [pair[1] for pair in order if pair[0] == SigmarMarble.quicksilver]
+        self.assertEqual(
+            [SigmarMarble.silver, SigmarMarble.copper, SigmarMarble.iron, SigmarMarble.tin, SigmarMarble.lead],
+            metals
+        )
+
+    def test_small_board(self):
+        for seed_ in range(20):
+            board = SmallSigmarBoard()
+            witness, attempts = generate_solvable_board(board, Random(seed_))
+            self.assertGreaterEqual(attempts, 1)
+            self.assertTrue(board.initialized_to_play)
+            self.assertEqual(9, len(witness))
+            self.assertEqual([board.layout_midpoint], witness[-1])
+            self.assertWitnessClearsBoard(board, witness)
+
+    def test_real_board(self):
+        for seed_ in range(5):
+            board = HexSigmarBoard()
+            witness, _ = generate_solvable_board(board, Random(seed_))
+            self.assertEqual(55, len(board.text_encoding()) - board.text_encoding().count("_"))
+            self.assertEqual(28, len(witness))
+            self.assertWitnessClearsBoard(board, witness)
+
+    def test_generate_boards(self):
+        """Same seed gives the same boards, stats report the throughput."""
+        boards, stats = generate_boards(5, radius=4, seed_=11)
+        self.assertEqual(boards, generate_boards(5, radius=4, seed_=11)[0])
+        self.assertEqual(5, stats["boards"])
+        self.assertGreaterEqual(stats["attempts"], 5)
+        self.assertGreater(stats["boards_per_second"], 0)
+        self.assertEqual(generate_seed(3, 4)["board"], generate_seed(3, 4)["board"])
+
+    def test_stuck_generation(self):
+        """Too many marbles for the board make the placement get stuck, generator gives up after max attempts."""
+        class CrowdedBoard(SmallSigmarBoard):
+            def init_items(self):
+                super().init_items()
+                self.initial_items = self.initial_items * 3
+
+        board = CrowdedBoard()
+        with self.assertRaises(GenerationFailed):
+            generate_solvable_board(board, Random(0), max_attempts=2)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
@@ -0,0 +1,79 @@
+from random import Random
+from unittest import TestCase
+
+from normal_solver.board import HexSigmarBoard
+from normal_solver.instrumentation import SolveStats
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.symmetry import SolutionCache
+
+
+class SolveStatsTests(TestCase):
+    @staticmethod
+    def game(seed_: int) -> SmallSigmarGame:
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+        return SmallSigmarGame(board=board)
+
+    def test_stats_of_solve(self):
+        game = self.game(9)
+        plain_strategy = game.solve()
+        plain_nodes = game.nodes_searched
+        self.assertIsNone(game.stats)
+
+        game = self.game(9)
+        stats = SolveStats()
+        self.assertEqual(plain_strategy, game.solve(stats=stats))
+        self.assertIs(stats, game.stats)
+        self.assertEqual(plain_nodes, stats.nodes)
+        self.assertEqual(stats.nodes, sum(stats.branching.values()))
+        self.assertEqual(stats.moves_generated, sum(moves * count for moves, count in stats.branching.items()))
+        self.assertLessEqual(stats.moves_tried, stats.moves_generated)
+        self.assertGreaterEqual(stats.max_depth, len(plain_strategy))
+        self.assertGreater(stats.pruned + stats.transposition_hits, 0)
+        self.assertTrue(all(seconds > 0 for seconds in stats.timers.values()))
+        self.assertLessEqual(sum(stats.timers.values()), stats.elapsed)
+        self.assertEqual(stats.nodes, stats.as_dict()["nodes"])
+
+    def test_counting_ends_with_solve(self):
+        """Moves made on the game after an instrumented solve are not counted into its stats."""
+        game = self.game(2)
+        stats = SolveStats()
+        strategy = game.solve(stats=stats)
+        counted = stats.as_dict()
+        game.count_marbles()
+        move = tuple(game.board.get_field_by_index(*coords) for coords in strategy[0])
+        game.undo_move(move, game.apply_move(move))
+        self.assertEqual(counted, stats.as_dict())
+
+    def test_stats_of_anytime_solve(self):
+        """Stats add up over all the deepening iterations of solve_anytime."""
+        game = self.game(9)
+        stats = SolveStats()
+        result = game.solve_anytime(discrepancy_limits=(0, 1), stats=stats)
+        self.assertIs(stats, game.stats)
+        self.assertTrue(result.solvable)
+        self.assertEqual(result.nodes, stats.nodes)
+        self.assertEqual(stats.moves_generated, sum(moves * count for moves, count in stats.branching.items()))
+        self.assertGreaterEqual(stats.max_depth, len(result.moves))
+        self.assertTrue(all(seconds > 0 for seconds in stats.timers.values()))
+
+    def test_progress_callback(self):
+        reports = []
+        game = self.game(6)
+        stats = SolveStats(progress_callback=lambda progress: reports.append(progress.nodes), progress_interval=0)
+        game.solve(stats=stats)
+        self.assertEqual(list(range(1, stats.nodes + 1)), reports)
+
+    def test_solution_cache_hit(self):
+        cache = SolutionCache()
+        self.game(2).solve(solution_cache=cache)
+        stats = SolveStats()
+        self.game(2).solve(solution_cache=cache, stats=stats)
+        self.assertTrue(stats.solution_cache_hit)
+        self.assertEqual(0, stats.nodes)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
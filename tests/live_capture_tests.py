@@ -0,0 +1,125 @@
+import os
+from contextlib import redirect_stdout
+from io import StringIO
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble
+from normal_solver.live_capture import LiveBoardTracker, FrameUpdate, main
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.visual_inspector import BoardRecogniser, render_board
+
+
+class LiveBoardTrackerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.recogniser = BoardRecogniser(HexSigmarBoard())
+
+    @staticmethod
+    def recording(board: SmallSigmarBoard, moves: list[list[tuple[int, int]]], rng: np.random.Generator,
+                  size: tuple[int, int] = (1080, 1920)) -> list[np.ndarray]:
+        """
+        Frames of a game played along the moves - every pair disappears one marble after the other, and every
+        position is shown twice, with different noise. Board is left with the moves made.
+        """
+        frames = [render_board(board, size, noise=8.0, rng=rng)]
+        for move_coords in moves:
+            for coords in move_coords:
+                field = board.get_field_by_index(*coords)
+                board.set_field_marble(field.layout_index, None)
+                frames.append(render_board(board, size, noise=8.0, rng=rng))
+            frames.append(render_board(board, size, noise=8.0, rng=rng))
+        return frames
+
+    def test_follow_game(self):
+        """Moves of a recorded game are applied to the board, following the winning strategy without re-solving."""
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(rng=Random(2))
+        tracker = LiveBoardTracker(self.recogniser)
+        tracker.start(render_board(board))
+        first_move = tracker.next_move()
+        strategy = list(tracker.strategy)
+        nodes = tracker.game.nodes_searched
+        self.assertEqual(strategy[0], first_move)
+
+        frames = self.recording(board, strategy[:6], np.random.default_rng(3))
+        updates = list(tracker.replay(frames[1:]))
+        kinds = [update.kind for update in updates]
+        self.assertEqual([FrameUpdate.PENDING, FrameUpdate.MOVE, FrameUpdate.IDLE] * 6, kinds)
+        self.assertEqual(
+            [set(move) for move in strategy[:6]],
+            [set(update.move) for update in updates if update.kind == FrameUpdate.MOVE]
+        )
+        self.assertEqual(board.text_encoding(), tracker.board.text_encoding())
+        self.assertEqual(strategy[6], tracker.next_move())
+        self.assertEqual(nodes, tracker.game.nodes_searched)  # no new solve
+        # first frame classified in full, then only the changed fields
+        self.assertLess(tracker.classified_fields, 91 + 4 * 6 + 1)
+
+        # game state agrees with a game started from the current board
+        fresh_game = SmallSigmarGame(board=board)
+        fresh_game.count_marbles()
+        self.assertEqual(fresh_game.marble_counts, tracker.game.marble_counts)
+        self.assertEqual(fresh_game.next_metal_to_clear, tracker.game.next_metal_to_clear)
+        self.assertEqual(fresh_game.canonical_hash, tracker.game.canonical_hash)
+
+    def test_off_strategy_move(self):
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(rng=Random(2))
+        tracker = LiveBoardTracker(self.recogniser)
+        tracker.start(render_board(board))
+        winning_move = tracker.next_move()
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        other_move = next(
+            [(field.row_index, field.field_index) for field in move]
+            for move in game.move_index.eligible_moves(game.next_metal_to_clear)
+            if {(field.row_index, field.field_index) for field in move} != set(winning_move)
+        )
+        frames = self.recording(board, [other_move], np.random.default_rng(4))
+        self.assertEqual(FrameUpdate.MOVE, tracker.update(frames[-1]).kind)
+        self.assertIsNone(tracker.strategy)
+
+    def test_edit_and_resync(self):
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(rng=Random(5))
+        tracker = LiveBoardTracker(self.recogniser)
+        self.assertEqual(FrameUpdate.RESYNC, tracker.update(render_board(board)).kind)
+        self.assertEqual(FrameUpdate.IDLE, tracker.update(render_board(board)).kind)
+
+        field = next(field for field in board.fields if field.marble == SigmarMarble.salt.value)
+        board.set_field_marble(field.layout_index, SigmarMarble.fire.value)
+        update = tracker.update(render_board(board))
+        self.assertEqual(FrameUpdate.EDIT, update.kind)
+        self.assertEqual([(field.row_index, field.field_index)], update.changed)
+        self.assertEqual(board.text_encoding(), tracker.board.text_encoding())
+        self.assertEqual(board.text_encoding().count("f"), tracker.game.marble_counts[SigmarMarble.fire.value])
+
+        new_board = HexSigmarBoard()
+        new_board.lay_down_marbles_in_wavefront(rng=Random(6))
+        self.assertEqual(FrameUpdate.RESYNC, tracker.update(render_board(new_board)).kind)
+        self.assertEqual(new_board.text_encoding(), tracker.board.text_encoding())
+        self.assertEqual(SigmarMarble.lead.value, tracker.game.next_metal_to_clear)
+
+    def test_main(self):
+        board = SmallSigmarBoard()
+        board.lay_down_marbles_in_wavefront(rng=Random(1))
+        moves = SmallSigmarGame(board=board).solve()
+        frames = self.recording(board, moves[:2], np.random.default_rng(5), size=(360, 480))
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "recording.npy")
+            np.save(path, np.stack(frames))
+            output = StringIO()
+            with redirect_stdout(output):
+                main([path])
+        self.assertEqual(2, output.getvalue().count(": move"))
+        self.assertIn(f"{len(frames)} frames", output.getvalue())
+
+
+if __name__ == '__main__':
+    from unittest import main as unittest_main
+
+    unittest_main()
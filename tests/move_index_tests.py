@@ -0,0 +1,96 @@
+from itertools import combinations
+from random import seed, choice, Random
+from unittest import TestCase
+
+from normal_solver.board import SigmarMarble, SigmarField
+from normal_solver.solver import SmallSigmarGame
+
+
+class EligibleMoveIndexTests(TestCase):
+    metal_states = [
+        SigmarMarble.lead.value, SigmarMarble.tin.value, SigmarMarble.iron.value,
+        SigmarMarble.copper.value, SigmarMarble.silver.value, SigmarMarble.gold.value, None
+    ]
+
+    def setUp(self):
+        seed(19)
+        self.small_game = SmallSigmarGame()
+        self.small_game.count_marbles()
+
+    def reference_moves(self) -> list[tuple]:
+        """Moves found by checking every pair of free marbles, as set_eligible_moves used to do."""
+        self.small_game.set_eligible_fields()
+        fields = [f for f in self.small_game.eligible_fields if f.marble != SigmarMarble.gold.value]
+        moves = [
+            pair for pair in combinations(fields, 2)
+            if self.small_game.test_eligible_move(pair[0].marble, pair[1].marble)
+        ]
+        if self.small_game.next_metal_to_clear == SigmarMarble.gold.value:
+            moves.extend(
+                (field,) for field in self.small_game.eligible_fields if field.marble == SigmarMarble.gold.value
+            )
+        return moves
+
+    def assertMatchesReference(self):
+        """Moves of every metal state match the pairwise check, the next metal to clear is restored after."""
+        next_metal = self.small_game.next_metal_to_clear
+        for metal in self.metal_states:
+            self.small_game.next_metal_to_clear = metal
+            expected = self.reference_moves()
+            moves = self.small_game.move_index.eligible_moves(metal)
+            self.assertCountEqual(expected, moves, f"{metal=}")
+            # moves of the index and of a scan of the board come in the same order
+            self.small_game.set_eligible_fields()
+            self.small_game.set_eligible_moves()
+            self.assertEqual(moves, self.small_game.eligible_moves, f"{metal=}")
+        self.small_game.next_metal_to_clear = next_metal
+
+    def test_random_marbles(self):
+        """
+        Fill the board with random marbles (so that every combination of buckets shows up) and compare moves
+        with the pairwise check for each of the metal states, after rebuilding the index from scratch.
+        """
+        rng = Random(7)
+        marbles = [marble.value for marble in SigmarMarble] + [None] * 6
+        for _ in range(30):
+            for row in self.small_game.board.layout[1:-1]:
+                for field in row[1:-1]:
+                    field.marble = rng.choice(marbles)
+            self.small_game.board.refresh_free_status()
+            self.small_game.move_index.rebuild()
+            self.assertMatchesReference()
+
+    def test_incremental_updates(self):
+        """Index updated only around cleared fields stays equal to the full pairwise check during play."""
+        applied = []
+        while True:
+            self.assertMatchesReference()
+            metal = self.small_game.next_metal_to_clear
+            moves = self.small_game.move_index.eligible_moves(metal)
+            if not moves:
+                break
+            move = choice(moves)
+            applied.append((move, self.small_game.apply_move(move)))
+        for move, undo_info in reversed(applied):
+            self.small_game.undo_move(move, undo_info)
+            self.assertMatchesReference()
+
+    def test_index_buckets(self):
+        """Only free fields holding a marble are indexed, each in the bucket of its marble type, in layout order."""
+        field: SigmarField
+        indexed = {
+            field.layout_index: marble
+            for marble, bucket in self.small_game.move_index.buckets.items() for field in bucket
+        }
+        for bucket in self.small_game.move_index.buckets.values():
+            self.assertEqual(sorted(field.layout_index for field in bucket), [field.layout_index for field in bucket])
+        self.small_game.set_eligible_fields()
+        self.assertEqual(
+            {field.layout_index: field.marble for field in self.small_game.eligible_fields}, indexed
+        )
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
@@ -0,0 +1,74 @@
+from random import Random
+from unittest import TestCase
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble
+from normal_solver.move_ordering import MoveOrdering
+from normal_solver.solver import SmallSigmarGame
+
+
+class MoveOrderingTests(TestCase):
+    @staticmethod
+    def game(board: SmallSigmarBoard, seed_: int) -> SmallSigmarGame:
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        return game
+
+    def assertWinningStrategy(self, board: SmallSigmarBoard, moves: list[list[tuple[int, int]]]):
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        for move_coords in moves:
+            legal_moves = {
+                frozenset((field.row_index, field.field_index) for field in move)
+                for move in game.move_index.eligible_moves(game.next_metal_to_clear)
+            }
+            self.assertIn(frozenset(move_coords), legal_moves)
+            game.apply_move(tuple(board.get_field_by_index(*coords) for coords in move_coords))
+        self.assertEqual(0, game.remaining_marbles)
+
+    def test_same_results(self):
+        """Every ordering finds a winning strategy of the solvable boards, and nothing for the unsolvable ones."""
+        orderings = [(policy,) for policy in MoveOrdering.POLICIES] + [MoveOrdering.POLICIES]
+        for board_type, seeds in ((SmallSigmarBoard, range(20)), (HexSigmarBoard, (2, 3, 4, 9))):
+            for seed_ in seeds:
+                game = self.game(board_type(), seed_)
+                game.solve()
+                for policies in orderings:
+                    ordered_game = self.game(board_type(), seed_)
+                    strategy = ordered_game.solve(move_ordering=policies)
+                    self.assertEqual(game.solvable, ordered_game.solvable, (seed_, policies))
+                    if strategy is not None:
+                        self.assertWinningStrategy(ordered_game.board, strategy)
+
+        game = self.game(HexSigmarBoard(), 2)
+        with self.assertRaises(ValueError):
+            game.solve(move_ordering=("metals_last", "unknown"))
+        result = game.solve_anytime(discrepancy_limits=(0,), move_ordering=("salt_parity", "metals_last"))
+        self.assertTrue(result.solvable)
+
+    def test_policies(self):
+        game = self.game(HexSigmarBoard(), 15)  # a quicksilver move among five
+        board = game.board
+        moves = game.move_index.eligible_moves(game.next_metal_to_clear)
+        ordering = MoveOrdering(board, ("metals_last",))
+        ordered = ordering.order(moves, game.marble_counts)
+        self.assertEqual(sorted(map(id, moves)), sorted(map(id, ordered)))
+        metal_moves = [move for move in moves if SigmarMarble.quicksilver.value in [f.marble for f in move]]
+        self.assertGreater(len(metal_moves), 0)
+        self.assertEqual(metal_moves, ordered[len(moves) - len(metal_moves):])
+        self.assertIs(moves, MoveOrdering(board, ()).order(moves, game.marble_counts))
+
+        game = self.game(HexSigmarBoard(), 7)  # a salt pair among ten moves
+        moves = game.move_index.eligible_moves(game.next_metal_to_clear)
+        salt_parity = MoveOrdering(game.board, ("salt_parity",))
+        ordered = salt_parity.order(moves, game.marble_counts)
+        keys = [salt_parity._salt_parity_key(move, game.marble_counts) for move in ordered]
+        self.assertEqual(sorted(keys), keys)
+        salt = SigmarMarble.salt.value
+        salt_pairs = [key for move, key in zip(ordered, keys) if [field.marble for field in move] == [salt, salt]]
+        self.assertEqual([1], salt_pairs)
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
@@ -0,0 +1,112 @@
+import multiprocessing
+from random import Random
+from unittest import TestCase
+
+from normal_solver.anytime import SolveResult
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble
+from normal_solver.parallel import split_root, solve_parallel, measure_scaling, _init_worker, _solve_subtree
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.transposition import SharedDeadTable
+
+
+class ParallelSolveTests(TestCase):
+    @staticmethod
+    def board(board_type: type, seed_: int) -> SmallSigmarBoard:
+        board = board_type()
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+        return board
+
+    def assertWinningStrategy(self, board: SmallSigmarBoard, moves: list[list[tuple[int, int]]]):
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        made_moves = []
+        for move_coords in moves:
+            legal_moves = {
+                frozenset((field.row_index, field.field_index) for field in move)
+                for move in game.move_index.eligible_moves(game.next_metal_to_clear)
+            }
+            self.assertIn(frozenset(move_coords), legal_moves)
+            move = tuple(board.get_field_by_index(*coords) for coords in move_coords)
+            made_moves.append((move, game.apply_move(move)))
+        self.assertEqual(0, game.remaining_marbles)
+        for move, undo_info in reversed(made_moves):
+            game.undo_move(move, undo_info)
+
+    def test_split_root(self):
+        """Move orders leading to the same position are split off only once."""
+        game = SmallSigmarGame(board=self.board(HexSigmarBoard, 2))
+        game.count_marbles()
+        encoding = game.board.text_encoding()
+        first_moves = game.move_index.eligible_moves(game.next_metal_to_clear)
+        prefixes, winning_strategy = split_root(game, 1)
+        self.assertIsNone(winning_strategy)
+        self.assertLessEqual(len(prefixes), len(first_moves))
+        prefixes, _ = split_root(game, 2)
+        self.assertEqual(len(prefixes), len({tuple(map(frozenset, prefix)) for prefix in prefixes}))
+        self.assertTrue(all(len(prefix) == 2 for prefix in prefixes))
+        self.assertEqual(encoding, game.board.text_encoding())
+
+        board = SmallSigmarBoard()
+        board.reset_board()
+        board.set_field_marble(board.get_field_by_index(*board.layout_midpoint).layout_index, SigmarMarble.gold.value)
+        board.initialized_to_play = True
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        self.assertEqual(([], [[board.layout_midpoint]]), split_root(game, 2))
+        self.assertEqual([[board.layout_midpoint]], solve_parallel(board, processes=1).moves)
+
+    def test_solve_parallel(self):
+        """Parallel solve agrees with the serial one."""
+        for board_type, seeds in ((SmallSigmarBoard, range(8)), (HexSigmarBoard, (2, 4, 9))):
+            for seed_ in seeds:
+                game = SmallSigmarGame(board=self.board(board_type, seed_))
+                game.solve()
+                board = self.board(board_type, seed_)
+                result = solve_parallel(board, processes=2, plies=1 + seed_ % 2, shared_slots=1 << 12)
+                self.assertEqual(SolveResult.COMPLETE, result.status)
+                self.assertEqual(game.solvable, result.solvable)
+                if result.solvable:
+                    self.assertWinningStrategy(board, result.moves)
+
+    def test_time_budget(self):
+        result = solve_parallel(self.board(HexSigmarBoard, 16), processes=2, time_budget=0.3)
+        self.assertEqual(SolveResult.TIMEOUT, result.status)
+        self.assertIsNone(result.solvable)
+        self.assertLess(result.elapsed, 3)
+        self.assertGreater(len(result.best_partial), 2)
+
+    def test_measure_scaling(self):
+        runs = measure_scaling(self.board(HexSigmarBoard, 2), [1, 2], plies=1)
+        self.assertEqual([0, 1, 2], [run["processes"] for run in runs])
+        self.assertEqual(1.0, runs[0]["speedup"])
+        self.assertTrue(all(run["status"] == SolveResult.COMPLETE and run["speedup"] > 0 for run in runs))
+
+    def test_cancelled_subtree(self):
+        """Subtrees handed out after the cancel event are given up before their board is built."""
+        cancel_event = multiprocessing.Event()
+        cancel_event.set()
+        _init_worker(cancel_event, None)
+        result = _solve_subtree(([4, 5], "not an encoding", [[(0, 0), (0, 1)]], None))
+        self.assertEqual(SolveResult.CANCELLED, result["status"])
+        self.assertEqual(0, result["nodes"])
+
+    def test_shared_dead_table(self):
+        slots = SharedDeadTable.allocate(64)
+        first, second = SharedDeadTable(slots), SharedDeadTable(slots)
+        first.mark_dead(12345, 10)
+        self.assertTrue(second.is_dead(12345))
+        self.assertEqual(1, second.stats["shared_hits"])
+        self.assertFalse(second.is_dead(12345 + 64))  # same slot, different position
+        first.mark_dead(12345 + 64, 10)
+        self.assertFalse(second.is_dead(12345))  # overwritten in the shared slots
+        self.assertTrue(first.is_dead(12345))  # still in the local table
+        first.mark_dead(0, 10)
+        self.assertFalse(second.is_dead(0))
+        with self.assertRaises(ValueError):
+            SharedDeadTable.allocate(0)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
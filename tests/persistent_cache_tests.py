@@ -0,0 +1,139 @@
+import os
+import tempfile
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+from unittest import TestCase
+
+from normal_solver.board import HexSigmarBoard, SmallSigmarBoard
+from normal_solver.persistent_cache import PersistentSolutionCache
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.symmetry import canonical_key
+
+
+def _read_entries(task: tuple[str, list[str]]) -> list:
+    path, keys = task
+    with PersistentSolutionCache(path, track_usage=False) as cache:
+        return [cache.get(key) for key in keys]
+
+
+class PersistentSolutionCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "solutions.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_solve_across_runs(self):
+        """Result solved in one run is served from the file in the next one, without searching."""
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(Random(2))
+        with PersistentSolutionCache(self.path) as cache:
+            strategy = SmallSigmarGame(board=board).solve(solution_cache=cache)
+            self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+        with PersistentSolutionCache(self.path) as cache:
+            game = SmallSigmarGame(board=board)
+            self.assertEqual(strategy, game.solve(solution_cache=cache))
+            self.assertEqual(0, game.nodes_searched)
+            self.assertEqual(1, cache.hits)
+
+            key, _ = canonical_key(board, game.next_metal_to_clear)
+            started = perf_counter()
+            for _ in range(1000):
+                cache.get(key)
+            self.assertLess((perf_counter() - started) / 1000, 0.01)  # an indexed lookup, not a search
+
+        unsolvable = SmallSigmarBoard()
+        unsolvable.lay_down_marbles_in_wavefront(Random(3))
+        for _ in range(2):
+            with PersistentSolutionCache(self.path) as cache:
+                game = SmallSigmarGame(board=unsolvable)
+                solvable = game.solve(solution_cache=cache) is not None
+        self.assertEqual(0, game.nodes_searched)
+        self.assertEqual(solvable, game.solvable)
+
+    def test_batching(self):
+        """Entries are written in batches, but visible to their own cache right away."""
+        with PersistentSolutionCache(self.path, batch_size=3, flush_interval=None) as writer, \
+                PersistentSolutionCache(self.path) as reader:
+            writer.put_many([("a:16", True, [[(1, 1), (1, 2)]]), ("b:16", False, None)])
+            self.assertEqual((True, [[(1, 1), (1, 2)]]), writer.get("a:16"))
+            self.assertIsNone(reader.get("a:16"))
+            writer.put("c:16", False, None)
+            self.assertEqual((True, [[(1, 1), (1, 2)]]), reader.get("a:16"))
+            self.assertEqual((False, None), reader.get("b:16"))
+            self.assertEqual(0, writer.stats["pending"])
+            self.assertEqual(3, len(reader))
+
+    def test_flush_interval(self):
+        """Queued entries reach other processes within the flush interval, not only with a full batch."""
+        now = [0.0]
+        with PersistentSolutionCache(self.path, batch_size=100, flush_interval=1.0, clock=lambda: now[0]) as writer, \
+                PersistentSolutionCache(self.path) as reader:
+            writer.put("a:16", False, None)
+            now[0] = 0.5
+            writer.put("b:16", True, [])
+            self.assertEqual(0, len(reader))
+            self.assertEqual(2, writer.stats["pending"])
+            now[0] = 1.0
+            writer.put("c:16", True, [])
+            self.assertEqual(3, len(reader))
+            writer.put("d:16", True, [])
+            self.assertEqual(3, len(writer))  # len only counts the written entries
+            writer.flush()
+            self.assertEqual(4, len(reader))
+
+    def test_read_only(self):
+        """Reader not tracking usage never writes, its reads don't change the eviction order."""
+        now = [0.0]
+        with PersistentSolutionCache(self.path, max_entries=2, batch_size=1, clock=lambda: now[0]) as writer:
+            for key in "ab":
+                now[0] += 1
+                writer.put(key, False, None)
+            with PersistentSolutionCache(self.path, batch_size=1, track_usage=False) as reader:
+                self.assertIsNotNone(reader.get("a"))
+            now[0] += 1
+            writer.put("c", False, None)
+            self.assertIsNone(writer.get("a"))
+            self.assertIsNotNone(writer.get("b"))
+
+    def test_solver_version(self):
+        with PersistentSolutionCache(self.path, solver_version=1) as cache:
+            cache.put("a:16", False, None)
+        with PersistentSolutionCache(self.path, solver_version=2) as cache:
+            self.assertIsNone(cache.get("a:16"))
+            cache.put("a:16", True, [])
+        with PersistentSolutionCache(self.path, solver_version=2) as cache:
+            self.assertEqual((True, []), cache.get("a:16"))
+            self.assertEqual(1, len(cache))
+
+    def test_eviction(self):
+        """Over the cap, least recently used entries go first."""
+        with PersistentSolutionCache(self.path, max_entries=3, batch_size=1) as cache:
+            for key in "abc":
+                cache.put(key, False, None)
+            cache.get("a")
+            cache.put("d", False, None)
+            self.assertEqual(3, len(cache))
+            self.assertEqual(1, cache.evictions)
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("a"))
+        with self.assertRaises(ValueError):
+            PersistentSolutionCache(self.path, max_entries=0)
+
+    def test_concurrent_readers(self):
+        keys = [f"{index}:16" for index in range(50)]
+        with PersistentSolutionCache(self.path) as cache:
+            cache.put_many((key, index % 2 == 0, None) for index, key in enumerate(keys))
+        with Pool(3) as pool:
+            results = pool.map(_read_entries, [(self.path, keys)] * 6)
+        expected = [(index % 2 == 0, None) for index in range(len(keys))]
+        self.assertEqual([expected] * 6, results)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
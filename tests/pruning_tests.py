@@ -0,0 +1,76 @@
+from random import Random
+from unittest import TestCase
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble
+from normal_solver.pruning import InfeasibilityPruner
+from normal_solver.solver import SmallSigmarGame
+
+
+class InfeasibilityPrunerTests(TestCase):
+    def setUp(self):
+        self.board = SmallSigmarBoard()
+        self.board.reset_board()
+        self.pruner = InfeasibilityPruner(self.board)
+
+    def place(self, row_idx: int, field_idx: int, marble: SigmarMarble):
+        self.board.set_field_marble(self.board.get_field_by_index(row_idx, field_idx).layout_index, marble.value)
+
+    def test_count_rules(self):
+        salt, fire, water = SigmarMarble.salt.value, SigmarMarble.fire.value, SigmarMarble.water.value
+        copper, silver, gold = SigmarMarble.copper.value, SigmarMarble.silver.value, SigmarMarble.gold.value
+        quicksilver, mors, vitae = SigmarMarble.quicksilver.value, SigmarMarble.mors.value, SigmarMarble.vitae.value
+        cases = [
+            ({fire: 2, water: 2, salt: 2, gold: 1}, None),
+            ({fire: 1, water: 1, salt: 2, gold: 1}, None),
+            ({fire: 3, salt: 1, gold: 1}, None),
+            ({fire: 1, water: 1, salt: 1, gold: 1}, "element_pairing"),
+            ({fire: 1, water: 1, gold: 1}, "element_pairing"),
+            ({mors: 2, vitae: 1}, "mors_vitae"),
+            ({copper: 1, silver: 1, quicksilver: 1, gold: 1}, "quicksilver_balance"),
+            ({copper: 2, quicksilver: 2, gold: 1}, "metal_order"),
+            ({gold: 1, quicksilver: 0, silver: 1}, "quicksilver_balance"),
+        ]
+        for marble_counts, expected_rule in cases:
+            self.assertEqual(expected_rule, self.pruner.dead_rule(marble_counts, copper), marble_counts)
+        self.assertEqual("metal_order", self.pruner.dead_rule({copper: 1, quicksilver: 1}, silver))
+        self.assertEqual(len(cases) + 1, self.pruner.stats["checks"])
+        self.assertEqual(2, self.pruner.stats["cut_element_pairing"])
+        with self.assertRaises(ValueError):
+            InfeasibilityPruner(self.board, rules=("element_pairing", "unknown"))
+
+    def test_buried_metal(self):
+        """Copper walled in by silver can't become free before silver is cleared, which needs copper first."""
+        self.place(3, 4, SigmarMarble.copper)
+        for neigh in self.board.get_field_by_index(3, 4).get_continuous_neigh_list():
+            self.place(neigh.row_index, neigh.field_index, SigmarMarble.silver)
+        self.place(1, 1, SigmarMarble.quicksilver)
+        counts = {SigmarMarble.copper.value: 1, SigmarMarble.silver.value: 6, SigmarMarble.quicksilver.value: 1}
+        pruner = InfeasibilityPruner(self.board, rules=("buried_metal",))
+        self.assertEqual("buried_metal", pruner.dead_rule(counts, SigmarMarble.copper.value))
+
+        # with salt around instead, the ring can be cleared from the outside first
+        for neigh in self.board.get_field_by_index(3, 4).get_continuous_neigh_list():
+            self.place(neigh.row_index, neigh.field_index, SigmarMarble.salt)
+        counts = {SigmarMarble.copper.value: 1, SigmarMarble.salt.value: 6, SigmarMarble.quicksilver.value: 1}
+        self.assertIsNone(pruner.dead_rule(counts, SigmarMarble.copper.value))
+        self.assertEqual({"checks": 2, "cut_buried_metal": 1}, pruner.stats)
+
+    def test_pruning_keeps_solve_results(self):
+        """Rules are necessary conditions - pruned search finds the same boards solvable, with fewer nodes."""
+        for radius, seeds in ((None, range(40)), (4, range(10))):
+            for seed_ in seeds:
+                results = []
+                for rules in ((), InfeasibilityPruner.RULES):
+                    board = HexSigmarBoard(radius) if radius is not None else SmallSigmarBoard()
+                    board.lay_down_marbles_in_wavefront(Random(seed_))
+                    game = SmallSigmarGame(board=board, pruner=InfeasibilityPruner(board, rules))
+                    results.append((game.solve() is not None, game.nodes_searched))
+                (plain_solvable, plain_nodes), (pruned_solvable, pruned_nodes) = results
+                self.assertEqual(plain_solvable, pruned_solvable)
+                self.assertLessEqual(pruned_nodes, plain_nodes)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
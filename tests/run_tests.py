@@ -1,7 +1,26 @@
 from unittest.suite import TestSuite
 from unittest.result import TestResult
 
-from tests.board_tests import BoardTests, SigmarFieldTests
+from tests.board_tests import BoardTests, HexBoardTests, SigmarFieldTests
+from tests.bitboard_tests import BitboardSigmarBoardTests, BitboardSearchTests
+from tests.transposition_tests import ZobristHasherTests, TranspositionTableTests
+from tests.move_index_tests import EligibleMoveIndexTests
+from tests.batch_tests import BatchSolverTests
+from tests.generator_tests import ReversePlayGeneratorTests
+from tests.vectorised_tests import VectorisedBoardShapeTests
+from tests.compact_tests import CompactSigmarBoardTests
+from tests.symmetry_tests import BoardSymmetryTests
+from tests.pruning_tests import InfeasibilityPrunerTests
+from tests.benchmark_tests import BenchmarkSuiteTests
+from tests.instrumentation_tests import SolveStatsTests
+from tests.serialisation_tests import BoardSerialisationTests
+from tests.anytime_tests import AnytimeSolveTests
+from tests.parallel_tests import ParallelSolveTests
+from tests.server_tests import SolveServerTests
+from tests.persistent_cache_tests import PersistentSolutionCacheTests
+from tests.move_ordering_tests import MoveOrderingTests
+from tests.visual_inspector_tests import BoardRecogniserTests
+from tests.live_capture_tests import LiveBoardTrackerTests
 from tests.solver_tests import SmallSigmarGameTest
 
 
@@ -16,7 +35,12 @@ def main_t_runner():
     all_tests = [
         [UnittestClass(t_name) for t_name in [t_name for t_name in dir(UnittestClass) if t_name.startswith("test")]]
         for UnittestClass in [
-            BoardTests, SigmarFieldTests, SmallSigmarGameTest
+            BoardTests, HexBoardTests, SigmarFieldTests, SmallSigmarGameTest, BitboardSigmarBoardTests,
+            BitboardSearchTests, ZobristHasherTests, TranspositionTableTests, EligibleMoveIndexTests, BatchSolverTests,
+            ReversePlayGeneratorTests, VectorisedBoardShapeTests, CompactSigmarBoardTests, BoardSymmetryTests,
+            InfeasibilityPrunerTests, BenchmarkSuiteTests, SolveStatsTests,
+            BoardSerialisationTests, AnytimeSolveTests, ParallelSolveTests, SolveServerTests,
+            PersistentSolutionCacheTests, MoveOrderingTests, BoardRecogniserTests, LiveBoardTrackerTests,
         ]
     ]
     t_suite = TestSuite(flatten(all_tests))
@@ -0,0 +1,110 @@
+import os
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.serialisation import (
+    board_for_row_sizes, pack_encoding, unpack_record, record_size, write_corpus, CorpusReader
+)
+from normal_solver.vectorised import VectorisedBoardShape
+
+
+class BoardSerialisationTests(TestCase):
+    def setUp(self):
+        self.boards = []
+        for seed_ in range(6):
+            board = HexSigmarBoard(4) if seed_ % 2 else SmallSigmarBoard()
+            board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+            self.boards.append(board)
+        self.tmp_dir = TemporaryDirectory()
+        self.corpus_path = os.path.join(self.tmp_dir.name, "corpus.sgb")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_text_encoding(self):
+        for board in self.boards:
+            loaded = board_for_row_sizes(board.board_row_sizes)
+            loaded.load_text_encoding(board.text_encoding())
+            self.assertTrue(loaded.initialized_to_play)
+            self.assertEqual(board.text_encoding(), loaded.text_encoding())
+            self.assertEqual([field.free for field in board.fields], [field.free for field in loaded.fields])
+        with self.assertRaises(ValueError):
+            SmallSigmarBoard().load_text_encoding("_" * 10)
+        with self.assertRaises(ValueError):
+            SmallSigmarBoard().load_text_encoding("?" * 29)
+        with self.assertRaises(ValueError):
+            board_for_row_sizes([3, 4, 3])
+
+    def test_pack_record(self):
+        """Records take half a byte per field, odd field counts are padded."""
+        for board in self.boards:
+            encoding = board.text_encoding()
+            record = pack_encoding(encoding)
+            self.assertEqual(record_size(len(encoding)), len(record))
+            self.assertEqual(encoding, unpack_record(record, len(encoding)))
+        self.assertEqual(46, record_size(HexSigmarBoard().playable_field_count))
+        self.assertEqual("?", unpack_record(b"\xff", 1))
+        with self.assertRaises(ValueError):
+            pack_encoding("0efx")
+
+    def test_corpus(self):
+        small_boards = [board for board in self.boards if type(board) is SmallSigmarBoard]
+        self.assertEqual(3, write_corpus(
+            self.corpus_path, SmallSigmarBoard.board_row_sizes, (board.text_encoding() for board in small_boards)
+        ))
+        with CorpusReader(self.corpus_path) as reader:
+            self.assertEqual(3, len(reader))
+            self.assertEqual(SmallSigmarBoard.board_row_sizes, reader.row_sizes)
+            self.assertEqual(small_boards[2].text_encoding(), reader[2])
+            self.assertEqual([board.text_encoding() for board in small_boards[1:]], list(reader.encodings(1)))
+            with self.assertRaises(IndexError):
+                reader.record(3)
+
+            loaded = [board.text_encoding() for board in reader.boards()]
+            self.assertEqual([board.text_encoding() for board in small_boards], loaded)
+            reused = SmallSigmarBoard()
+            for board, expected in zip(reader.boards(reused), small_boards):
+                self.assertIs(reused, board)
+                self.assertEqual([field.free for field in expected.fields], [field.free for field in board.fields])
+
+            codes = reader.marble_codes()
+            self.assertTrue(np.array_equal(VectorisedBoardShape(small_boards[0]).encode_boards(small_boards), codes))
+            self.assertEqual((1, 29), reader.marble_codes(2, 10).shape)
+
+        # 16th nibble value in the second record
+        with open(self.corpus_path, "r+b") as corpus:
+            corpus.seek(-record_size(29) - 3, os.SEEK_END)
+            corpus.write(b"\xf0")
+        with CorpusReader(self.corpus_path) as reader:
+            self.assertEqual((1, 29), reader.marble_codes(0, 1).shape)
+            with self.assertRaisesRegex(ValueError, "Record 1 is corrupt"):
+                reader.marble_codes()
+
+    def test_hex_corpus(self):
+        hex_boards = [board for board in self.boards if type(board) is HexSigmarBoard]
+        write_corpus(self.corpus_path, hex_boards[0].board_row_sizes, [board.text_encoding() for board in hex_boards])
+        self.assertEqual(5 + 9 + 3 * record_size(37), os.path.getsize(self.corpus_path))
+        with CorpusReader(self.corpus_path) as reader:
+            boards = list(board.text_encoding() for board in reader.boards())
+        self.assertEqual([board.text_encoding() for board in hex_boards], boards)
+        with self.assertRaises(ValueError):
+            write_corpus(self.corpus_path, hex_boards[0].board_row_sizes, ["_"])
+
+    def test_not_a_corpus(self):
+        with open(self.corpus_path, "wb") as corpus:
+            corpus.write(b"not a corpus")
+        with self.assertRaises(ValueError):
+            CorpusReader(self.corpus_path)
+        open(self.corpus_path, "wb").close()
+        with self.assertRaises(ValueError):
+            CorpusReader(self.corpus_path)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
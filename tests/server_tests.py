@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import tempfile
+from random import Random
+from unittest import IsolatedAsyncioTestCase
+
+from normal_solver.anytime import SolveResult
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.server import SolveServer
+from normal_solver.solver import SmallSigmarGame
+
+
+class SolveServerTests(IsolatedAsyncioTestCase):
+    HARD_SEED = 16  # full board searched for seconds before it's proven unsolvable
+
+    async def asyncSetUp(self):
+        self.server = SolveServer(processes=2)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    @staticmethod
+    def encoding(board: SmallSigmarBoard, seed_: int) -> str:
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+        return board.text_encoding()
+
+    async def request(self, requests: list[dict], address=None) -> list[dict]:
+        """Send all requests over a single connection, return the responses in the order they came."""
+        if isinstance(address or self.server.address, str):
+            reader, writer = await asyncio.open_unix_connection(address)
+        else:
+            reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    async def test_solve(self):
+        """Responses match the serial solve, and are matched to the requests by id."""
+        requests, expected = [], {}
+        for seed_ in range(6):
+            board = SmallSigmarBoard()
+            requests.append({"id": seed_, "board": self.encoding(board, seed_)})
+            game = SmallSigmarGame(board=board)
+            game.solve()
+            expected[seed_] = game.solvable
+        responses = await self.request(requests)
+        self.assertEqual(set(expected), {response["id"] for response in responses})
+        for response in responses:
+            self.assertEqual(SolveResult.COMPLETE, response["status"])
+            self.assertEqual(expected[response["id"]], response["solvable"])
+            self.assertEqual(response["solvable"], response["moves"] is not None)
+
+    async def test_coalescing(self):
+        """Concurrent clients asking for the same board share one solve."""
+        encoding = self.encoding(HexSigmarBoard(), 2)
+        request = {"id": "same", "board": encoding, "radius": HexSigmarBoard.REAL_GAME_RADIUS}
+        responses = await asyncio.gather(*(self.request([request]) for _ in range(5)))
+        responses = [response for client_responses in responses for response in client_responses]
+        self.assertEqual(1, len({json.dumps(response["moves"]) for response in responses}))
+        self.assertEqual(self.server.solves + self.server.coalesced, 5)
+        self.assertEqual(self.server.coalesced, sum(response["coalesced"] for response in responses))
+        self.assertEqual(0, self.server.stats["in_flight"])
+
+    async def test_deadline(self):
+        """A slow solve times out at its own deadline, without holding back the responses of other requests."""
+        hard = {
+            "id": "hard", "board": self.encoding(HexSigmarBoard(), self.HARD_SEED),
+            "radius": HexSigmarBoard.REAL_GAME_RADIUS, "deadline": 0.5
+        }
+        easy = {"id": "easy", "board": self.encoding(SmallSigmarBoard(), 1)}
+        responses = await self.request([hard, easy])
+        self.assertEqual(["easy", "hard"], [response["id"] for response in responses])
+        self.assertEqual(SolveResult.TIMEOUT, responses[1]["status"])
+        self.assertIsNone(responses[1]["solvable"])
+
+        # a request joins a solve running with a longer deadline, but not one with a shorter deadline
+        async def request_after(delay: float, request: dict) -> dict:
+            await asyncio.sleep(delay)
+            return (await self.request([request]))[0]
+
+        impatient = dict(hard, id="impatient", deadline=0.2)
+        _, impatient_response = await asyncio.gather(request_after(0, hard), request_after(0.1, impatient))
+        self.assertEqual(SolveResult.TIMEOUT, impatient_response["status"])
+        self.assertTrue(impatient_response["coalesced"])
+        # partial solution of the shared solve, published before the impatient request gave up on it
+        self.assertGreater(len(impatient_response["best_partial"]), 0)
+        patient = dict(hard, id="patient", deadline=0.4)
+        _, patient_response = await asyncio.gather(request_after(0, impatient), request_after(0.05, patient))
+        self.assertFalse(patient_response["coalesced"])
+        self.assertEqual(1, self.server.coalesced)
+
+    async def test_bad_requests(self):
+        responses = await self.request([
+            {"id": 1, "board": "not a board"},
+            {"id": 2},
+            {"id": 3, "board": self.encoding(SmallSigmarBoard(), 0), "radius": 6},
+            # radius is checked before any board is built
+            {"id": 4, "board": "_", "radius": 10 ** 4},
+            {"id": 5, "board": self.encoding(HexSigmarBoard(), 0), "radius": "6"},
+            {"id": 6, "board": self.encoding(HexSigmarBoard(), 0), "radius": 6.0},
+            {"id": 7, "board": self.encoding(HexSigmarBoard(3), 0), "radius": True},
+        ])
+        self.assertEqual(set(range(1, 8)), {response["id"] for response in responses})
+        self.assertTrue(all("error" in response for response in responses))
+        self.assertIn("Radius", responses[[response["id"] for response in responses].index(4)]["error"])
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(b"[1, 2\n")
+        self.assertIn("error", json.loads(await reader.readline()))
+        # overlong line is answered with an error and skipped, the connection goes on serving requests
+        writer.write(b'{"board": "' + b"_" * (2 * SolveServer.MAX_REQUEST_BYTES) + b'"}\n')
+        writer.write(json.dumps({"id": "after", "board": self.encoding(SmallSigmarBoard(), 0)}).encode() + b"\n")
+        self.assertIn("longer than", json.loads(await reader.readline())["error"])
+        self.assertEqual("after", json.loads(await reader.readline())["id"])
+        writer.close()
+        self.assertEqual(9, self.server.errors)
+
+    async def test_default_deadline(self):
+        """Requests without a deadline, or with a null one, get the default deadline of the server."""
+        server = SolveServer(processes=1, default_deadline=0.3)
+        await server.start()
+        try:
+            hard = {"board": self.encoding(HexSigmarBoard(), self.HARD_SEED), "radius": HexSigmarBoard.REAL_GAME_RADIUS}
+            reader, writer = await asyncio.open_connection(*server.address)
+            writer.write(json.dumps(dict(hard, id="omitted")).encode() + b"\n")
+            writer.write(json.dumps(dict(hard, id="null", deadline=None)).encode() + b"\n")
+            responses = [json.loads(await asyncio.wait_for(reader.readline(), 10)) for _ in range(2)]
+            writer.close()
+        finally:
+            await server.close()
+        self.assertEqual({"omitted", "null"}, {response["id"] for response in responses})
+        self.assertEqual([SolveResult.TIMEOUT] * 2, [response["status"] for response in responses])
+
+    async def test_cancelled_client(self):
+        """Cancelling a client handler (server shutdown) cancels its requests and is not swallowed."""
+        hard = {
+            "id": "hard", "board": self.encoding(HexSigmarBoard(), self.HARD_SEED),
+            "radius": HexSigmarBoard.REAL_GAME_RADIUS, "deadline": 5.0
+        }
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(json.dumps(hard).encode() + b"\n")
+        await writer.drain()
+        while self.server.stats["in_flight"] == 0:
+            await asyncio.sleep(0.01)
+        handler = next(
+            task for task in asyncio.all_tasks() if task.get_coro().__qualname__.endswith("__handle_client")
+        )
+        handler.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await handler
+        self.assertEqual(b"", await reader.read())  # connection closed without a response
+        writer.close()
+
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "solver.sock")
+            server = SolveServer(processes=1)
+            await server.start(unix_path=path)
+            try:
+                responses = await self.request([{"id": 0, "board": self.encoding(SmallSigmarBoard(), 0)}], path)
+            finally:
+                await server.close()
+        self.assertEqual(SolveResult.COMPLETE, responses[0]["status"])
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
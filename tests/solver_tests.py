@@ -3,7 +3,7 @@ from string import ascii_letters
 from typing import Literal
 from unittest import TestCase
 
-from normal_solver.board import SmallSigmarBoard, SigmarMarble, SigmarField
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble, SigmarField
 from normal_solver.solver import SmallSigmarGame
 
 
@@ -50,6 +50,45 @@ class SmallSigmarGameTest(TestCase):
             msg = f"Not false for pair {pair[0]} {pair[1]}"
             self.assertFalse(self.small_game.test_eligible_move(*pair), msg)
 
+    def test_marble_matching_table(self):
+        """
+        Legality table lookup has to agree with the original chain of matching rules for every pair of marbles,
+        as enum members or values (and values that are no marble), in every metal state.
+        """
+        def reference_rules(marble_type_1, marble_type_2, next_metal_to_clear):
+            combinations = SmallSigmarGame.allowed_marble_value_combinations
+            if (marble_type_1, marble_type_2) in combinations or (marble_type_2, marble_type_1) in combinations:
+                if marble_type_1 in SmallSigmarGame.base_marbles:
+                    if marble_type_1 != 0:
+                        return marble_type_2 in (marble_type_1, 0)
+                    return marble_type_2 in SmallSigmarGame.base_marbles
+                elif marble_type_2 in SmallSigmarGame.base_marbles:
+                    if marble_type_2 != 0:
+                        return marble_type_1 in (marble_type_2, 0)
+                    return marble_type_1 in SmallSigmarGame.base_marbles
+                if SmallSigmarGame.QUICKSILVER in (marble_type_1, marble_type_2):
+                    return next_metal_to_clear in (marble_type_1, marble_type_2)
+                return {marble_type_1, marble_type_2} == {64, 65}
+            return False
+
+        values = [marble.value for marble in SigmarMarble] + [5, 99]
+        for next_metal in list(range(SigmarMarble.lead.value, SigmarMarble.gold.value + 1)) + [None]:
+            self.small_game.next_metal_to_clear = next_metal
+            for value_1 in values:
+                for value_2 in values:
+                    expected = reference_rules(value_1, value_2, next_metal)
+                    msg = f"Pair {value_1} {value_2}, next metal {next_metal}"
+                    self.assertEqual(expected, self.small_game.test_eligible_move(value_1, value_2), msg)
+                    if value_1 in SigmarMarble._value2member_map_ and value_2 in SigmarMarble._value2member_map_:
+                        self.assertEqual(
+                            expected, self.small_game.test_eligible_move(SigmarMarble(value_1), value_2), msg
+                        )
+        for invalid in ("water", 1.0, [1], None):
+            with self.assertRaises(ValueError):
+                self.small_game.test_eligible_move(invalid, SigmarMarble.water)
+            with self.assertRaises(ValueError):
+                self.small_game.test_eligible_move(SigmarMarble.salt.value, invalid)
+
     def test_possible_marbles_set(self):
         """
         Test if board has marbles actually correctly set as free or not free (by neighbourhood rules), and also
@@ -113,6 +152,113 @@ class SmallSigmarGameTest(TestCase):
         self.assertEqual(0, len(eligible_moves_for_seed_19))
 
 
+    def __board_snapshot(self):
+        return [(field.marble, field.free) for row in self.small_game.board.layout for field in row]
+
+    def test_apply_and_undo_move(self):
+        """Applying a move and undoing it restores marbles, free status and the next metal to clear."""
+        self.small_game.count_marbles()
+        # small board holds no lead, tin nor iron, so copper is the first metal to clear
+        self.assertEqual(SigmarMarble.copper.value, self.small_game.next_metal_to_clear)
+        snapshot = self.__board_snapshot()
+        self.small_game.set_eligible_fields()
+        self.small_game.set_eligible_moves()
+        for move in self.small_game.eligible_moves:
+            undo_info = self.small_game.apply_move(move)
+            for field in move:
+                self.assertIsNone(field.marble)
+            self.assertEqual(15, self.small_game.remaining_marbles)
+            self.small_game.undo_move(move, undo_info)
+            self.assertEqual(snapshot, self.__board_snapshot())
+            self.assertEqual(SigmarMarble.copper.value, self.small_game.next_metal_to_clear)
+
+    def test_solve(self):
+        """
+        Solver finds a strategy clearing the whole board (8 pairs and the gold marble), and leaves the board
+        as it was. Replaying the strategy move by move on the board must only ever use legal moves.
+        """
+        snapshot = self.__board_snapshot()
+        strategy = self.small_game.solve()
+        self.assertTrue(self.small_game.solvable)
+        self.assertIs(strategy, self.small_game.winning_strategy)
+        self.assertEqual(9, len(strategy))
+        self.assertEqual(snapshot, self.__board_snapshot())
+        self.assertGreater(self.small_game.nodes_searched, 0)
+
+        for move_coords in strategy:
+            self.small_game.set_eligible_fields()
+            self.small_game.set_eligible_moves()
+            legal_moves = {
+                frozenset((field.row_index, field.field_index) for field in move)
+                for move in self.small_game.eligible_moves
+            }
+            self.assertIn(frozenset(move_coords), legal_moves, f"Illegal move in strategy: {move_coords}")
+            self.small_game.apply_move(tuple(self.small_game.board.get_field_by_index(*c) for c in move_coords))
+        self.assertEqual(0, self.small_game.remaining_marbles)
+        self.assertIsNone(self.small_game.next_metal_to_clear)
+
+    def test_solve_moves_for_victory(self):
+        """Old moves_for_victory argument is still accepted, positionally or by keyword, with a deprecation warning."""
+        strategy = self.small_game.solve()
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(strategy, self.small_game.solve(9))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(strategy, self.small_game.solve(moves_for_victory=9))
+
+    def test_solve_unsolvable(self):
+        """Board with two mors marbles and no vitae can't be cleared, solver reports it after full search."""
+        for row in self.small_game.board.layout:
+            for field in row:
+                if field.marble == SigmarMarble.vitae.value:
+                    field.update_field(SigmarMarble.mors.value)
+        self.assertIsNone(self.small_game.solve())
+        self.assertFalse(self.small_game.solvable)
+        self.assertIsNone(self.small_game.winning_strategy)
+        self.assertEqual(0, self.small_game.count_solutions())
+        self.assertEqual([], list(self.small_game.iter_solutions()))
+
+    def test_solve_real_board(self):
+        """Solver handles the real 91-field board the same way, clearing 27 pairs and the gold marble."""
+        seed(2)
+        real_game = SmallSigmarGame(board=HexSigmarBoard())
+        strategy = real_game.solve()
+        self.assertTrue(real_game.solvable)
+        self.assertEqual(28, len(strategy))
+        self.assertEqual([real_game.board.layout_midpoint], strategy[-1])
+
+    def test_iter_solutions(self):
+        """Every enumerated strategy is distinct and clears the board, the first one is the one solve finds."""
+        first_strategy = self.small_game.solve()
+        encoding = self.small_game.board.text_encoding()
+        solutions = list(self.small_game.iter_solutions())
+        self.assertEqual(first_strategy, solutions[0])
+        self.assertEqual(len(solutions), len({str(solution) for solution in solutions}))
+        self.assertEqual(encoding, self.small_game.board.text_encoding())
+        for solution in solutions[::50]:
+            self.small_game.count_marbles()
+            for move_coords in solution:
+                self.small_game.apply_move(tuple(self.small_game.board.get_field_by_index(*c) for c in move_coords))
+            self.assertEqual(0, self.small_game.remaining_marbles)
+            self.small_game.board.load_text_encoding(encoding)
+            self.small_game.next_metal_to_clear = SigmarMarble.lead.value
+
+        solutions = self.small_game.iter_solutions()
+        next(solutions)
+        next(solutions)
+        solutions.close()
+        self.assertEqual(encoding, self.small_game.board.text_encoding())
+
+    def test_count_solutions(self):
+        """Memoised count agrees with the enumeration, also for unsolvable boards."""
+        for seed_ in range(6):
+            seed(seed_)
+            game = SmallSigmarGame()
+            self.assertEqual(sum(1 for _ in game.iter_solutions()), game.count_solutions())
+        seed(2)
+        real_game = SmallSigmarGame(board=HexSigmarBoard())
+        self.assertEqual(224202714, real_game.count_solutions())
+
+
 if __name__ == '__main__':
     from unittest import main
 
@@ -0,0 +1,134 @@
+from random import Random
+from unittest import TestCase
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.symmetry import BoardTransform, board_symmetries, canonicalise, canonical_key, SolutionCache
+from normal_solver.solver import SmallSigmarGame
+
+
+class BoardSymmetryTests(TestCase):
+    @staticmethod
+    def row_sizes(board: SmallSigmarBoard) -> list[int]:
+        return [len(row) for row in board.layout]
+
+    @staticmethod
+    def transformed_board(board: SmallSigmarBoard, transform: BoardTransform) -> SmallSigmarBoard:
+        """Copy of the board with every marble moved to the field the transform maps it to."""
+        copy = type(board)()
+        for row in copy.layout:
+            for field in row:
+                field.marble = None
+        for field_coords in transform.coords:
+            target = copy.get_field_by_index(*transform.map_coords(field_coords))
+            target.marble = board.get_field_by_index(*field_coords).marble
+        copy.refresh_free_status()
+        copy.initialized_to_play = True
+        return copy
+
+    def test_symmetry_counts(self):
+        """Regular hexagon has all 12 symmetries, the small board only the 4 that keep its shape."""
+        self.assertEqual(4, len(board_symmetries(SmallSigmarBoard.board_row_sizes)))
+        for radius in (4, 6):
+            board = HexSigmarBoard(radius)
+            symmetries = board_symmetries(self.row_sizes(board))
+            self.assertEqual(12, len(symmetries))
+            self.assertEqual(list(range(board.playable_field_count)), symmetries[0].permutation)
+            self.assertIs(symmetries, board_symmetries(self.row_sizes(board)))
+
+    def test_transforms_preserve_adjacency(self):
+        for board in (SmallSigmarBoard(), HexSigmarBoard()):
+            for transform in board_symmetries(self.row_sizes(board)):
+                coords = set(transform.coords)
+                for field_coords in transform.coords:
+                    field = board.get_field_by_index(*field_coords)
+                    neighbours = {
+                        (neigh.row_index, neigh.field_index) for neigh in field.get_continuous_neigh_list()
+                    } & coords
+                    mapped_field = board.get_field_by_index(*transform.map_coords(field_coords))
+                    mapped_neighbours = {
+                        (neigh.row_index, neigh.field_index) for neigh in mapped_field.get_continuous_neigh_list()
+                    } & coords
+                    self.assertEqual({transform.map_coords(neigh) for neigh in neighbours}, mapped_neighbours)
+                inverse = transform.inverse()
+                for field_coords in transform.coords:
+                    self.assertEqual(field_coords, inverse.map_coords(transform.map_coords(field_coords)))
+
+    def test_canonical_encoding_is_invariant(self):
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(Random(5))
+        encoding, transform = canonicalise(board)
+        self.assertEqual(encoding, transform.apply_to_encoding(board.text_encoding()))
+        for symmetry in board_symmetries(self.row_sizes(board)):
+            symmetric = self.transformed_board(board, symmetry)
+            self.assertEqual(symmetry.apply_to_encoding(board.text_encoding()), symmetric.text_encoding())
+            self.assertEqual(encoding, canonicalise(symmetric)[0])
+            self.assertEqual(canonical_key(board, 16)[0], canonical_key(symmetric, 16)[0])
+        self.assertNotEqual(canonical_key(board, 16)[0], canonical_key(board, 17)[0])
+
+    def test_canonical_hash(self):
+        """Hashes of symmetric positions differ, their canonical hashes don't - also after moves and undos."""
+        board = SmallSigmarBoard()
+        board.lay_down_marbles_in_wavefront(Random(5))
+        game = SmallSigmarGame(board=board)
+        game.count_marbles()
+        for symmetry in board_symmetries(self.row_sizes(game.board))[1:]:
+            symmetric_game = SmallSigmarGame(board=self.transformed_board(game.board, symmetry))
+            symmetric_game.count_marbles()
+            self.assertEqual(game.canonical_hash, symmetric_game.canonical_hash)
+            self.assertEqual(sorted(game.position_hashes), sorted(symmetric_game.position_hashes))
+
+        initial_hashes = list(game.position_hashes)
+        game.set_eligible_fields()
+        game.set_eligible_moves()
+        move = game.eligible_moves[0]
+        undo_info = game.apply_move(move)
+        self.assertNotEqual(initial_hashes, game.position_hashes)
+        game.undo_move(move, undo_info)
+        self.assertEqual(initial_hashes, game.position_hashes)
+
+    def test_solution_cache(self):
+        """Solution cached for a position is mapped onto its symmetric copy as a legal winning strategy."""
+        cache = SolutionCache()
+        board = HexSigmarBoard()
+        board.lay_down_marbles_in_wavefront(Random(2))
+        strategy = SmallSigmarGame(board=board).solve(solution_cache=cache)
+        self.assertEqual(28, len(strategy))
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+        symmetric_board = self.transformed_board(board, board_symmetries(self.row_sizes(board))[7])
+        symmetric_game = SmallSigmarGame(board=symmetric_board)
+        symmetric_strategy = symmetric_game.solve(solution_cache=cache)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(0, symmetric_game.nodes_searched)
+        self.assertTrue(symmetric_game.solvable)
+
+        symmetric_game.count_marbles()
+        for move_coords in symmetric_strategy:
+            legal_moves = {
+                frozenset((field.row_index, field.field_index) for field in move)
+                for move in symmetric_game.move_index.eligible_moves(symmetric_game.next_metal_to_clear)
+            }
+            self.assertIn(frozenset(move_coords), legal_moves)
+            symmetric_game.apply_move(tuple(symmetric_board.get_field_by_index(*coords) for coords in move_coords))
+        self.assertEqual(0, symmetric_game.remaining_marbles)
+
+    def test_solution_cache_bound(self):
+        """Over the cap, least recently used results go first."""
+        cache = SolutionCache(max_entries=2)
+        cache.put("a:16", True, [])
+        cache.put("b:16", False, None)
+        cache.get("a:16")
+        cache.put("c:16", False, None)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.evictions)
+        self.assertIsNone(cache.get("b:16"))
+        self.assertEqual((True, []), cache.get("a:16"))
+        self.assertEqual(256, SolutionCache.with_memory_limit(1).max_entries)
+        with self.assertRaises(ValueError):
+            SolutionCache(max_entries=0)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
@@ -0,0 +1,90 @@
+from random import seed
+from unittest import TestCase
+
+from normal_solver.board import SigmarMarble
+from normal_solver.pruning import InfeasibilityPruner
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.transposition import ZobristHasher, TranspositionTable
+
+
+class ZobristHasherTests(TestCase):
+    def setUp(self):
+        seed(19)
+        self.small_game = SmallSigmarGame()
+        self.fields = [field for row in self.small_game.board.layout[1:-1] for field in row[1:-1]]
+
+    def test_keys_are_deterministic(self):
+        """Keys do not depend on the global random state, so hashes can be compared between processes."""
+        other_hasher = ZobristHasher(self.fields)
+        self.assertEqual(self.small_game.hasher.field_keys, other_hasher.field_keys)
+        self.assertEqual(self.small_game.hasher.metal_keys, other_hasher.metal_keys)
+        # drawn once per board shape
+        self.assertIs(self.small_game.hasher, SmallSigmarGame().hasher)
+        self.assertIs(self.small_game.symmetric_keys, SmallSigmarGame().symmetric_keys)
+
+    def test_incremental_hash(self):
+        """Hash updated by apply/undo always matches the hash calculated from scratch."""
+        self.small_game.count_marbles()
+        initial_hash = self.small_game.position_hash
+        self.small_game.set_eligible_fields()
+        self.small_game.set_eligible_moves()
+        for move in self.small_game.eligible_moves:
+            undo_info = self.small_game.apply_move(move)
+            self.assertEqual(
+                self.small_game.hasher.hash_position(self.fields, self.small_game.next_metal_to_clear),
+                self.small_game.position_hash
+            )
+            self.assertNotEqual(initial_hash, self.small_game.position_hash)
+            self.small_game.undo_move(move, undo_info)
+            self.assertEqual(initial_hash, self.small_game.position_hash)
+
+    def test_metal_state_changes_hash(self):
+        """The same marbles with a different next metal to clear are different positions."""
+        lead_hash = self.small_game.hasher.hash_position(self.fields, SigmarMarble.lead.value)
+        tin_hash = self.small_game.hasher.hash_position(self.fields, SigmarMarble.tin.value)
+        self.assertNotEqual(lead_hash, tin_hash)
+
+
+class TranspositionTableTests(TestCase):
+    def test_lru_eviction(self):
+        """Least recently used entry is evicted first, hits refresh entries."""
+        table = TranspositionTable(max_entries=2)
+        table.mark_dead(1, 10)
+        table.mark_dead(2, 10)
+        self.assertTrue(table.is_dead(1))  # 2 is now least recently used
+        table.mark_dead(3, 10)
+        self.assertFalse(table.is_dead(2))
+        self.assertTrue(table.is_dead(1))
+        self.assertTrue(table.is_dead(3))
+        self.assertEqual({"entries": 2, "hits": 3, "misses": 1, "evictions": 1}, table.stats)
+
+    def test_memory_limit(self):
+        table = TranspositionTable.with_memory_limit(1)
+        self.assertEqual(1024 * 1024 // TranspositionTable.ENTRY_SIZE_ESTIMATE, table.max_entries)
+        with self.assertRaises(ValueError):
+            TranspositionTable(max_entries=0)
+
+    def test_solver_records_dead_positions(self):
+        """Unsolvable board fills the table, even tiny table (constant eviction) gives the same solve result."""
+        seed(19)
+        small_game = SmallSigmarGame()
+        small_game.pruner = InfeasibilityPruner(small_game.board, rules=())  # mors/vitae imbalance is cut at root
+        for row in small_game.board.layout:
+            for field in row:
+                if field.marble == SigmarMarble.vitae.value:
+                    field.update_field(SigmarMarble.mors.value)
+        self.assertIsNone(small_game.solve())
+        self.assertGreater(len(small_game.transposition_table), 0)
+        self.assertTrue(small_game.transposition_table.is_dead(small_game.canonical_hash))
+
+        seed(19)
+        table = TranspositionTable(max_entries=1)
+        small_game = SmallSigmarGame(transposition_table=table)
+        self.assertEqual(9, len(small_game.solve()))
+        self.assertLessEqual(len(table), 1)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
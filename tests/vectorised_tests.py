@@ -0,0 +1,76 @@
+from random import Random
+from unittest import TestCase
+
+import numpy as np
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard, SigmarMarble
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.vectorised import VectorisedBoardShape, EMPTY
+
+
+class VectorisedBoardShapeTests(TestCase):
+    def collect_positions(self, board_class, radius_args: tuple, games: int = 8):
+        """
+        Play random games move by move, recording each position with its reference free status and
+        number of legal moves taken from SmallSigmarGame.
+        """
+        boards, free_flags, move_counts = [], [], []
+        for seed_ in range(games):
+            rng = Random(seed_)
+            board = board_class(*radius_args)
+            board.lay_down_marbles_in_wavefront(rng=rng)
+            game = SmallSigmarGame(board=board)
+            game.count_marbles()
+            while True:
+                moves = game.move_index.eligible_moves(game.next_metal_to_clear)
+                snapshot = board_class(*radius_args)
+                for field, snapshot_field in zip(board.fields, snapshot.fields):
+                    snapshot_field.marble = field.marble
+                boards.append(snapshot)
+                free_flags.append([field.free for field in board.fields[:-1] if not field.board_edge_field])
+                move_counts.append(len(moves))
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+        return boards, np.array(free_flags), np.array(move_counts)
+
+    def assertMatchesGame(self, board_class, *radius_args):
+        boards, free_flags, move_counts = self.collect_positions(board_class, radius_args)
+        shape = VectorisedBoardShape(boards[0])
+        codes = shape.encode_boards(boards)
+        self.assertEqual((len(boards), shape.cells), codes.shape)
+        np.testing.assert_array_equal(free_flags, shape.free_mask(codes))
+        np.testing.assert_array_equal(move_counts, shape.legal_move_counts(codes))
+
+    def test_small_board(self):
+        self.assertMatchesGame(SmallSigmarBoard)
+
+    def test_real_board(self):
+        self.assertMatchesGame(HexSigmarBoard, 6)
+
+    def test_gather_follows_board_adjacency(self):
+        """Every playable field gathers its six neighbours from the compiled board adjacency."""
+        board = SmallSigmarBoard()
+        shape = VectorisedBoardShape(board)
+        playable = [field for field in board.fields[:-1] if not field.board_edge_field]
+        for column, field in enumerate(playable):
+            for direction, neigh in enumerate(field.get_continuous_neigh_list()[:6]):
+                gathered = shape.neighbour_gather[column, direction]
+                if neigh.board_edge_field:
+                    self.assertEqual(shape.cells, gathered)
+                else:
+                    self.assertIs(neigh, playable[gathered])
+
+    def test_next_metals(self):
+        codes = np.full((3, 4), EMPTY)
+        codes[0, :2] = [SigmarMarble.tin.value, SigmarMarble.silver.value]
+        codes[1, 0] = SigmarMarble.gold.value
+        np.testing.assert_array_equal(
+            [SigmarMarble.tin.value, SigmarMarble.gold.value, EMPTY], VectorisedBoardShape.next_metals(codes)
+        )
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()
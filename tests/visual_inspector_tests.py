@@ -0,0 +1,81 @@
+from random import Random
+from time import perf_counter
+from unittest import TestCase
+
+import numpy as np
+
+from normal_solver.board import SmallSigmarBoard, HexSigmarBoard
+from normal_solver.solver import SmallSigmarGame
+from normal_solver.vectorised import EMPTY
+from normal_solver.visual_inspector import BoardRecogniser, render_board, RENDER_BACKGROUND
+
+
+class BoardRecogniserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.recogniser = BoardRecogniser()
+
+    @staticmethod
+    def board(board: SmallSigmarBoard, seed_: int) -> SmallSigmarBoard:
+        board.lay_down_marbles_in_wavefront(rng=Random(seed_))
+        return board
+
+    def test_recognise(self):
+        """Boards rendered at various scales and positions, with noise, are recovered field for field."""
+        rng = np.random.default_rng(5)
+        for seed_, pitch, centre in ((0, 64.0, None), (1, 52.5, (700.0, 480.0)), (2, 90.0, (1000.0, 560.0))):
+            board = self.board(HexSigmarBoard(), seed_)
+            image = render_board(board, pitch=pitch, centre=centre, noise=10.0, rng=rng)
+            location = self.recogniser.locate(image)
+            self.assertAlmostEqual(pitch, location.pitch, delta=0.02 * pitch)
+            recognised = self.recogniser.recognise(image)
+            self.assertEqual(board.text_encoding(), recognised.text_encoding())
+            self.assertTrue(recognised.initialized_to_play)
+
+        # played out boards too - empty fields inside of the board, and the outer ones that define the box
+        board = self.board(HexSigmarBoard(), 2)
+        game = SmallSigmarGame(board=board)
+        for move_coords in game.solve()[:10]:
+            game.apply_move(tuple(board.get_field_by_index(*coords) for coords in move_coords))
+        reloaded = HexSigmarBoard()
+        self.assertIs(reloaded, self.recogniser.recognise(render_board(board), reloaded))
+        self.assertEqual(board.text_encoding(), reloaded.text_encoding())
+        self.assertIsNotNone(SmallSigmarGame(board=reloaded).solve())
+
+    def test_small_board(self):
+        board = self.board(SmallSigmarBoard(), 3)
+        image = render_board(board, size=(480, 640), pitch=40.0)
+        self.assertEqual(board.text_encoding(), BoardRecogniser(SmallSigmarBoard()).recognise(image).text_encoding())
+
+    def test_calibrate(self):
+        """Templates learned from a known board replace the synthetic ones."""
+        board = self.board(HexSigmarBoard(), 4)
+        image = render_board(board)
+        recogniser = BoardRecogniser(HexSigmarBoard(), templates=np.zeros_like(self.recogniser.templates))
+        codes = np.array([
+            EMPTY if field.marble is None else field.marble for row in board.layout[1:-1] for field in row[1:-1]
+        ])
+        recogniser.calibrate(image, codes)
+        self.assertEqual(board.text_encoding(), recogniser.recognise(image).text_encoding())
+        other_board = self.board(HexSigmarBoard(), 5)
+        self.assertEqual(other_board.text_encoding(), recogniser.recognise(render_board(other_board)).text_encoding())
+
+    def test_speed(self):
+        image = render_board(self.board(HexSigmarBoard(), 6), noise=5.0, rng=np.random.default_rng(0))
+        self.recogniser.recognise(image)
+        started = perf_counter()
+        for _ in range(10):
+            self.recogniser.recognise(image)
+        self.assertLess((perf_counter() - started) / 10, 0.1)
+
+    def test_no_board(self):
+        image = np.empty((1080, 1920, 3), dtype=np.uint8)
+        image[:] = RENDER_BACKGROUND
+        with self.assertRaises(ValueError):
+            self.recogniser.locate(image)
+
+
+if __name__ == '__main__':
+    from unittest import main
+
+    main()